@@ -7,9 +7,25 @@ from plotly.subplots import make_subplots
 import matplotlib.pyplot as plt
 import seaborn as sns
 from scipy import constants
+import os
+import time
 import warnings
+from contextlib import nullcontext
 warnings.filterwarnings('ignore')
 
+from spectral_physics import (build_level_table, build_level_transitions,
+                              evaluate_selection_rules, expand_m_sublevels, zeeman_components,
+                              electron_density_from_width, stark_widths)
+from spectral_analysis import (batch_velocity_search, build_wavelength_index, load_measured_spectrum,
+                               load_spectrum_directory)
+from spectral_atlas import (ECHANTILLONNAGE_ATLAS, LAMBDA_MAX_ATLAS, LAMBDA_MIN_ATLAS, POUVOIR_RESOLUTION_ATLAS,
+                            element_atlas)
+from spectral_cache import CACHE_SPECTRES, catalogue_version, content_key
+from spectral_figures import plotly_chart, visible_window, zoomable_chart
+from spectral_profiling import PerformanceRecorder, count_rows, display_performance_panel, section, timed
+from spectral_synthesis import (convolve_instrument, log_lambda_grid, synthesize_lines, synthesize_window,
+                                wavelength_grid)
+
 # Configuration de la page
 st.set_page_config(
     page_title="Dashboard Spectroscopie Atomique",
@@ -111,12 +127,27 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+# Nombre de réexécutions conservées pour l'export JSON lines du panneau de performance
+TAILLE_HISTORIQUE_PERFORMANCE = 200
+
+# Graine des largeurs Doppler simulées du catalogue
+GRAINE_LARGEURS = 0
+
+# Fenêtres proposées pour l'atlas (nm) et nombre de points visés par vue
+LARGEURS_FENETRE_ATLAS = [0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 50.0, 100.0, 200.0, 500.0, 1000.0, 2000.0, 5000.0,
+                          8000.0]
+POINTS_VUE_ATLAS = 2000
+
+# Points synthétisés sur la fenêtre visible d'un spectre zoomable, quelle que soit sa largeur
+POINTS_FENETRE_SPECTRE = 2000
+
 class AtomicSpectraDashboard:
     def __init__(self):
         self.elements_data = self.define_elements_data()
         self.series_data = self.define_series_data()
         self.transitions_data = self.define_transitions_data()
         self.spectral_lines = self.define_spectral_lines()
+        self.version_catalogue = catalogue_version(self.spectral_lines)
         
     def define_elements_data(self):
         """Définit les données des éléments pour l'analyse spectrale"""
@@ -274,13 +305,13 @@ class AtomicSpectraDashboard:
         
         # Transitions pour d'autres éléments
         autres_transitions = [
-            {'element': 'Na', 'transition': '3p→3s', 'longueur_onde_nm': 589.0, 'energie_eV': 2.11, 'intensite_relative': 0.9, 'serie': 'Principale'},
-            {'element': 'Na', 'transition': '3p→3s', 'longueur_onde_nm': 589.6, 'energie_eV': 2.10, 'intensite_relative': 0.8, 'serie': 'Principale'},
-            {'element': 'Hg', 'transition': '6³P₁→6¹S₀', 'longueur_onde_nm': 253.7, 'energie_eV': 4.89, 'intensite_relative': 0.95, 'serie': 'Résonnante'},
-            {'element': 'Hg', 'transition': '7³S₁→6³P₀', 'longueur_onde_nm': 404.7, 'energie_eV': 3.06, 'intensite_relative': 0.7, 'serie': 'Visible'},
-            {'element': 'He', 'transition': '2¹P→1¹S', 'longueur_onde_nm': 58.4, 'energie_eV': 21.2, 'intensite_relative': 0.6, 'serie': 'Résonnante'},
+            {'element': 'Na', 'transition': '3p→3s', 'longueur_onde_nm': 589.0, 'energie_eV': 2.11, 'intensite_relative': 0.9, 'serie': 'Principale', 'terme_haut': '²P3/2', 'terme_bas': '²S1/2'},
+            {'element': 'Na', 'transition': '3p→3s', 'longueur_onde_nm': 589.6, 'energie_eV': 2.10, 'intensite_relative': 0.8, 'serie': 'Principale', 'terme_haut': '²P1/2', 'terme_bas': '²S1/2'},
+            {'element': 'Hg', 'transition': '6³P₁→6¹S₀', 'longueur_onde_nm': 253.7, 'energie_eV': 4.89, 'intensite_relative': 0.95, 'serie': 'Résonnante', 'terme_haut': '³P₁', 'terme_bas': '¹S₀'},
+            {'element': 'Hg', 'transition': '7³S₁→6³P₀', 'longueur_onde_nm': 404.7, 'energie_eV': 3.06, 'intensite_relative': 0.7, 'serie': 'Visible', 'terme_haut': '³S₁', 'terme_bas': '³P₀'},
+            {'element': 'He', 'transition': '2¹P→1¹S', 'longueur_onde_nm': 58.4, 'energie_eV': 21.2, 'intensite_relative': 0.6, 'serie': 'Résonnante', 'terme_haut': '¹P₁', 'terme_bas': '¹S₀'},
             {'element': 'Ne', 'transition': '3s→2p', 'longueur_onde_nm': 640.2, 'energie_eV': 1.94, 'intensite_relative': 0.8, 'serie': 'Visible'},
-            {'element': 'Ca', 'transition': '4p→4s', 'longueur_onde_nm': 422.7, 'energie_eV': 2.93, 'intensite_relative': 0.7, 'serie': 'Résonnante'}
+            {'element': 'Ca', 'transition': '4p→4s', 'longueur_onde_nm': 422.7, 'energie_eV': 2.93, 'intensite_relative': 0.7, 'serie': 'Résonnante', 'terme_haut': '¹P₁', 'terme_bas': '¹S₀'}
         ]
         
         for trans in autres_transitions:
@@ -294,6 +325,8 @@ class AtomicSpectraDashboard:
     def define_spectral_lines(self):
         """Définit les raies spectrales avec leurs intensités simulées"""
         lines = []
+        # Largeurs tirées d'une graine fixe : catalogue identique d'une exécution à l'autre (clé de cache stable)
+        generateur = np.random.default_rng(GRAINE_LARGEURS)
         
         # Génération de spectres simulés
         for element in self.elements_data:
@@ -307,7 +340,7 @@ class AtomicSpectraDashboard:
                 intensite = line['intensite_relative']
                 
                 # Largeur Doppler simulée
-                largeur = 0.1 + 0.05 * np.random.random()  # nm
+                largeur = 0.1 + 0.05 * generateur.random()  # nm
                 
                 lines.append({
                     'element': element['symbole'],
@@ -315,15 +348,46 @@ class AtomicSpectraDashboard:
                     'intensite': intensite,
                     'largeur': largeur,
                     'serie': line.get('serie', 'Autre'),
-                    'transition': line['transition']
+                    'transition': line['transition'],
+                    'niveau_haut': line['niveau_depart'],
+                    'niveau_bas': line['niveau_arrivee'],
+                    'terme_haut': line.get('terme_haut'),
+                    'terme_bas': line.get('terme_bas')
                 })
         
         return pd.DataFrame(lines)
     
+    def define_level_transitions(self, symboles, n_max=None, regle='E1'):
+        """Construit les transitions permises à partir des niveaux d'énergie des éléments"""
+        noms_series = {serie['niveau_final']: serie['nom'] for serie in self.series_data}
+        transitions = []
+        n_candidats = 0
+        
+        for element in self.elements_data:
+            if element['symbole'] in symboles:
+                niveaux = build_level_table(element['symbole'], element['niveaux_energie'], n_max)
+                transitions_element, candidats = build_level_transitions(
+                    niveaux, regle=regle,
+                    noms_series=noms_series if element['symbole'] == 'H' else None
+                )
+                transitions.append(transitions_element)
+                n_candidats += candidats
+        
+        if not transitions:
+            return self.transitions_data.iloc[0:0], 0
+        return pd.concat(transitions, ignore_index=True), n_candidats
+    
+    def add_level_transitions(self, symboles, n_max=None, regle='E1'):
+        """Ajoute en une passe les transitions construites au tableau des transitions"""
+        nouvelles, n_candidats = self.define_level_transitions(symboles, n_max, regle)
+        self.transitions_data = pd.concat([self.transitions_data, nouvelles], ignore_index=True)
+        return nouvelles, n_candidats
+    
     def calculate_rydberg_formula(self, n1, n2, z=1, rydberg_constant=1.09677576e7):
         """Calcule la longueur d'onde avec la formule de Rydberg"""
         return 1 / (rydberg_constant * z**2 * (1/n1**2 - 1/n2**2)) * 1e9  # nm
     
+    @timed
     def display_header(self):
         """Affiche l'en-tête du dashboard"""
         st.markdown('<h1 class="main-header">🔬 Dashboard Spectroscopie Atomique</h1>', 
@@ -337,6 +401,7 @@ class AtomicSpectraDashboard:
         current_time = pd.Timestamp.now().strftime('%d/%m/%Y %H:%M')
         st.sidebar.markdown(f"**🕐 Session active: {current_time}**")
     
+    @timed
     def display_theory_introduction(self):
         """Affiche la section théorie et introduction"""
         st.markdown('<h3 class="section-header">📚 THÉORIE DES SPECTRES ATOMIQUES</h3>', 
@@ -396,6 +461,7 @@ class AtomicSpectraDashboard:
             </div>
             """, unsafe_allow_html=True)
     
+    @timed
     def create_spectral_calculator(self):
         """Crée un calculateur spectral interactif"""
         st.markdown('<h3 class="section-header">🧮 CALCULATEUR SPECTRAL INTERACTIF</h3>', 
@@ -474,8 +540,9 @@ class AtomicSpectraDashboard:
             height=400
         )
         
-        st.plotly_chart(fig, use_container_width=True)
+        plotly_chart(fig, use_container_width=True)
     
+    @timed
     def create_hydrogen_spectrum_analysis(self):
         """Analyse détaillée du spectre de l'hydrogène"""
         st.markdown('<h3 class="section-header">⚛️ SPECTRE DE L\'HYDROGÈNE</h3>', 
@@ -483,7 +550,7 @@ class AtomicSpectraDashboard:
         
         tab1, tab2, tab3, tab4 = st.tabs(["Séries Spectrales", "Raies Caractéristiques", "Spectre Simulé", "Applications"])
         
-        with tab1:
+        with tab1, section("Séries Spectrales"):
             col1, col2 = st.columns(2)
             
             with col1:
@@ -511,7 +578,7 @@ class AtomicSpectraDashboard:
                     yaxis=dict(title="Intensité relative"),
                     height=500
                 )
-                st.plotly_chart(fig, use_container_width=True)
+                plotly_chart(fig, use_container_width=True)
             
             with col2:
                 # Affichage des séries
@@ -528,7 +595,7 @@ class AtomicSpectraDashboard:
                     </div>
                     """, unsafe_allow_html=True)
         
-        with tab2:
+        with tab2, section("Raies Caractéristiques"):
             # Raies caractéristiques de Balmer
             raies_balmer = self.transitions_data[
                 (self.transitions_data['element'] == 'H') & 
@@ -560,22 +627,18 @@ class AtomicSpectraDashboard:
                             title="Raies de la série de Balmer - Longueurs d'onde",
                             color_continuous_scale='Viridis')
                 fig.update_layout(xaxis_title="Transition", yaxis_title="Longueur d'onde (nm)")
-                st.plotly_chart(fig, use_container_width=True)
+                plotly_chart(fig, use_container_width=True)
         
-        with tab3:
+        with tab3, section("Spectre Simulé"):
             # Spectre simulé de l'hydrogène
             st.subheader("Spectre simulé de l'atome d'hydrogène")
             
-            # Génération du spectre simulé
-            lambda_range = np.linspace(100, 1000, 2000)
-            spectre_total = np.zeros_like(lambda_range)
-            
+            # Génération du spectre simulé sur la seule fenêtre visible, resynthétisé à chaque zoom
             raies_h = self.spectral_lines[self.spectral_lines['element'] == 'H']
-            
-            for _, raie in raies_h.iterrows():
-                # Profil gaussien pour chaque raie
-                spectre_raie = raie['intensite'] * np.exp(-0.5 * ((lambda_range - raie['longueur_onde']) / raie['largeur'])**2)
-                spectre_total += spectre_raie
+            lambda_min_vue, lambda_max_vue = visible_window("spectre_hydrogene", 100.0, 1000.0)
+            lambda_range, spectre_total, _ = synthesize_window(
+                lambda_min_vue, lambda_max_vue, POINTS_FENETRE_SPECTRE, build_wavelength_index(raies_h),
+                raies_h['intensite'].to_numpy(), raies_h['largeur'].to_numpy())
             
             fig = go.Figure()
             fig.add_trace(go.Scatter(
@@ -586,7 +649,7 @@ class AtomicSpectraDashboard:
             ))
             
             # Ajout des raies identifiées
-            for _, raie in raies_h[raies_h['longueur_onde'] <= 1000].iterrows():
+            for _, raie in raies_h[raies_h['longueur_onde'].between(lambda_min_vue, lambda_max_vue)].iterrows():
                 fig.add_trace(go.Scatter(
                     x=[raie['longueur_onde'], raie['longueur_onde']],
                     y=[0, raie['intensite']],
@@ -601,9 +664,66 @@ class AtomicSpectraDashboard:
                 yaxis=dict(title="Intensité relative"),
                 height=400
             )
-            st.plotly_chart(fig, use_container_width=True)
+            zoomable_chart(fig, "spectre_hydrogene", use_container_width=True)
+            st.caption("Sélectionnez une zone du graphique pour zoomer : seule la fenêtre visible est resynthétisée.")
+            
+            # Élargissement Stark des raies de Balmer et Paschen
+            st.subheader("Élargissement Stark et diagnostic du plasma")
+            
+            col1, col2 = st.columns([1, 3])
+            
+            with col1:
+                log_densite = st.slider("log₁₀ densité électronique (cm⁻³):", 14.0, 18.0, 16.0, 0.05)
+                temperature_stark = st.slider("Température électronique (K):", 2500, 40000, 10000, 500)
+                
+                largeurs_stark = stark_widths(raies_h['niveau_haut'], raies_h['niveau_bas'],
+                                              10 ** log_densite, temperature_stark)
+                
+                for nom, n_haut, n_bas in [('Hα', 3, 2), ('Hβ', 4, 2)]:
+                    largeur = stark_widths([n_haut], [n_bas], 10 ** log_densite, temperature_stark)[0]
+                    st.metric(f"Largeur Stark {nom}", f"{largeur:.3f} nm")
+            
+            with col2:
+                lambda_stark = wavelength_grid(350.0, 1900.0, 12000)
+                spectre_stark = synthesize_lines(lambda_stark, raies_h['longueur_onde'], raies_h['intensite'],
+                                                 raies_h['largeur'], gammas=largeurs_stark / 2)
+                
+                fig = go.Figure()
+                fig.add_trace(go.Scatter(
+                    x=lambda_stark, y=spectre_stark,
+                    mode='lines',
+                    line=dict(color='#2575FC', width=2),
+                    name=f'Ne = 10^{log_densite:.2f} cm⁻³'
+                ))
+                fig.update_layout(
+                    title="Raies de Balmer et Paschen élargies par effet Stark",
+                    xaxis=dict(title="Longueur d'onde (nm)"),
+                    yaxis=dict(title="Intensité relative"),
+                    height=400
+                )
+                plotly_chart(fig, use_container_width=True)
+            
+            # Diagnostic : densité électronique à partir des largeurs mesurées
+            st.markdown("**Diagnostic à partir des largeurs mesurées (FWHM Stark, nm)**")
+            col1, col2, col3 = st.columns(3)
+            
+            with col1:
+                largeur_h_alpha = st.number_input("Largeur Hα mesurée (nm):", min_value=0.001, value=0.2, format="%.3f")
+                densite_h_alpha = electron_density_from_width(largeur_h_alpha, 3, 2, temperature_stark)
+                st.metric("Ne d'après Hα", f"{densite_h_alpha:.2e} cm⁻³")
+            
+            with col2:
+                largeur_h_beta = st.number_input("Largeur Hβ mesurée (nm):", min_value=0.001, value=0.8, format="%.3f")
+                densite_h_beta = electron_density_from_width(largeur_h_beta, 4, 2, temperature_stark)
+                st.metric("Ne d'après Hβ", f"{densite_h_beta:.2e} cm⁻³")
+            
+            with col3:
+                ecart = abs(np.log10(densite_h_alpha) - np.log10(densite_h_beta))
+                st.metric("Écart Hα / Hβ", f"{ecart:.2f} dex")
+                if ecart > 0.3:
+                    st.warning("Les deux raies donnent des densités incompatibles (auto-absorption ?).")
         
-        with tab4:
+        with tab4, section("Applications"):
             st.subheader("Applications et Importance")
             
             col1, col2 = st.columns(2)
@@ -643,15 +763,109 @@ class AtomicSpectraDashboard:
                 </span>
                 </div>
                 """, unsafe_allow_html=True)
+            
+            # Mesure du décalage spectral par corrélation croisée en ln λ
+            st.subheader("Mesure du décalage spectral (redshift) et de la vitesse radiale")
+            
+            col1, col2 = st.columns([1, 3])
+            
+            with col1:
+                fichiers_decalage = st.file_uploader("Spectres observés (CSV : λ en nm, intensité):",
+                                                     type=['csv', 'txt'], accept_multiple_files=True)
+                repertoire_decalage = st.text_input("Ou répertoire de spectres (lot, fichiers *.csv):", "")
+                elements_gabarits = st.multiselect(
+                    "Gabarits (éléments du catalogue):",
+                    [e['symbole'] for e in self.elements_data],
+                    default=['H']
+                )
+                st.caption("Un gabarit à une ou deux raies s'aligne sur n'importe quelle raie intense : "
+                           "le décalage n'est fiable qu'avec plusieurs raies communes.")
+                vitesse_max = st.slider("Vitesse maximale recherchée (km/s):", 100, 150000, 100000, 100)
+                
+                if repertoire_decalage.strip():
+                    # Lot sur disque : fichiers lus en parallèle
+                    fichiers_lot, spectres_observes, erreurs_lot = load_spectrum_directory(repertoire_decalage.strip())
+                    noms_spectres = [os.path.basename(fichier) for fichier in fichiers_lot]
+                    for fichier, erreur in erreurs_lot:
+                        st.error(f"{os.path.basename(fichier)} : {erreur}")
+                    if not fichiers_lot and not erreurs_lot:
+                        st.warning(f"Aucun fichier *.csv dans {repertoire_decalage}.")
+                elif not fichiers_decalage:
+                    # Spectre de démonstration : hydrogène décalé vers le rouge, bruité
+                    z_demo = st.slider("Décalage z du spectre de démonstration:", 0.0, 0.3, 0.05, 0.001, format="%.3f")
+                    lambda_observe = wavelength_grid(350.0, 1200.0, 8500)
+                    intensite_observee = synthesize_lines(lambda_observe, raies_h['longueur_onde'] * (1 + z_demo),
+                                                          raies_h['intensite'], raies_h['largeur'] * (1 + z_demo))
+                    intensite_observee = intensite_observee + np.random.default_rng(1).normal(0, 0.02, len(lambda_observe))
+                    spectres_observes, noms_spectres = [(lambda_observe, intensite_observee)], [f"Démonstration (z = {z_demo:.3f})"]
+                else:
+                    spectres_observes, noms_spectres = [], []
+                    for fichier in fichiers_decalage:
+                        try:
+                            spectres_observes.append(load_measured_spectrum(fichier))
+                            noms_spectres.append(fichier.name)
+                        except ValueError as erreur:
+                            st.error(f"{fichier.name} : {erreur}")
+            
+            with col2:
+                if spectres_observes and elements_gabarits:
+                    # Gabarits au repos synthétisés sur la grille commune en ln λ
+                    grille_log = log_lambda_grid(100.0, 2000.0, 5000.0)
+                    gabarits = []
+                    for symbole in elements_gabarits:
+                        raies_gabarit = self.spectral_lines[self.spectral_lines['element'] == symbole]
+                        gabarits.append((grille_log, convolve_instrument(grille_log, raies_gabarit['longueur_onde'],
+                                                                        raies_gabarit['intensite'], 'gauss',
+                                                                        pouvoir_resolution=2000.0, log_lambda=True)))
+                    
+                    debut = time.perf_counter()
+                    resultats, correlations = batch_velocity_search(spectres_observes, gabarits, grille_log,
+                                                                    vitesse_max, garder_correlations=True)
+                    duree_ms = (time.perf_counter() - debut) * 1000
+                    
+                    resultats['spectre'] = [noms_spectres[i] for i in resultats['spectre']]
+                    resultats['gabarit'] = [elements_gabarits[i] for i in resultats['gabarit']]
+                    
+                    col_a, col_b, col_c = st.columns(3)
+                    with col_a:
+                        st.metric("Décalage z", f"{resultats['z'].iloc[0]:.5f}")
+                    with col_b:
+                        st.metric("Vitesse radiale", f"{resultats['vitesse_kms'].iloc[0]:,.0f} km/s")
+                    with col_c:
+                        st.metric("Corrélations", f"{len(spectres_observes) * len(gabarits)} en {duree_ms:.0f} ms")
+                    
+                    fig = go.Figure()
+                    for indice, symbole in enumerate(elements_gabarits):
+                        fig.add_trace(go.Scatter(
+                            x=correlations['decalages_z'], y=correlations['correlations'][0, indice],
+                            mode='lines',
+                            name=symbole
+                        ))
+                    fig.update_layout(
+                        title=f"Fonction de corrélation croisée : {noms_spectres[0]}",
+                        xaxis=dict(title="Décalage z"),
+                        yaxis=dict(title="Coefficient de corrélation"),
+                        height=400
+                    )
+                    plotly_chart(fig, use_container_width=True)
+                    
+                    st.dataframe(resultats.rename(columns={
+                        'spectre': 'Spectre', 'gabarit': 'Meilleur gabarit', 'z': 'Décalage z',
+                        'vitesse_kms': 'Vitesse (km/s)', 'correlation': 'Corrélation'
+                    }), use_container_width=True)
+                else:
+                    st.info("Sélectionnez au moins un gabarit et un spectre observé.")
     
+    @timed
     def create_elements_comparison(self):
         """Comparaison des spectres de différents éléments"""
         st.markdown('<h3 class="section-header">⚡ COMPARAISON DES ÉLÉMENTS</h3>', 
                    unsafe_allow_html=True)
         
-        tab1, tab2, tab3 = st.tabs(["Spectres Multi-éléments", "Caractéristiques", "Analyse Quantitative"])
+        tab1, tab2, tab3, tab4 = st.tabs(["Spectres Multi-éléments", "Caractéristiques", "Analyse Quantitative",
+                                          "Atlas Spectral"])
         
-        with tab1:
+        with tab1, section("Spectres Multi-éléments"):
             # Sélection des éléments à comparer
             elements_selectionnes = st.multiselect(
                 "Sélectionnez les éléments à comparer:",
@@ -659,21 +873,24 @@ class AtomicSpectraDashboard:
                 default=['H', 'Na', 'Hg']
             )
             
+            points_comparaison = st.select_slider("Résolution (points de grille):", [1500, 15000, 150000, 1500000],
+                                                  value=1500)
+            
             if elements_selectionnes:
                 fig = go.Figure()
+                lambda_range = wavelength_grid(200.0, 800.0, points_comparaison)
                 
                 for element_symb in elements_selectionnes:
                     element_data = next(e for e in self.elements_data if e['symbole'] == element_symb)
                     raies_element = self.spectral_lines[self.spectral_lines['element'] == element_symb]
+                    count_rows(len(self.spectral_lines))
                     
-                    # Spectre simulé pour l'élément
-                    lambda_range = np.linspace(200, 800, 1500)
-                    spectre_element = np.zeros_like(lambda_range)
-                    
-                    for _, raie in raies_element.iterrows():
-                        if 200 <= raie['longueur_onde'] <= 800:
-                            spectre_raie = raie['intensite'] * np.exp(-0.5 * ((lambda_range - raie['longueur_onde']) / raie['largeur'])**2)
-                            spectre_element += spectre_raie
+                    # Spectre simulé pour l'élément, relu du cache disque s'il a déjà été calculé
+                    cle = content_key(catalogue=self.version_catalogue, elements=[element_symb], modele='gauss',
+                                      grille=[200.0, 800.0, points_comparaison])
+                    spectre_element = CACHE_SPECTRES.get_or_compute(cle, lambda: synthesize_lines(
+                        lambda_range, raies_element['longueur_onde'], raies_element['intensite'],
+                        raies_element['largeur']))
                     
                     fig.add_trace(go.Scatter(
                         x=lambda_range, y=spectre_element,
@@ -688,9 +905,9 @@ class AtomicSpectraDashboard:
                     yaxis=dict(title="Intensité relative"),
                     height=500
                 )
-                st.plotly_chart(fig, use_container_width=True)
+                plotly_chart(fig, use_container_width=True)
         
-        with tab2:
+        with tab2, section("Caractéristiques"):
             # Tableau comparatif des éléments
             st.subheader("Caractéristiques des Éléments")
             
@@ -733,9 +950,9 @@ class AtomicSpectraDashboard:
                                 color_continuous_scale='Viridis'
                             )
                             fig.update_layout(xaxis_title="Niveau", yaxis_title="Énergie (eV)", height=200)
-                            st.plotly_chart(fig, use_container_width=True)
+                            plotly_chart(fig, use_container_width=True)
         
-        with tab3:
+        with tab3, section("Analyse Quantitative"):
             st.subheader("Analyse Quantitative des Spectres")
             
             col1, col2 = st.columns(2)
@@ -761,16 +978,68 @@ class AtomicSpectraDashboard:
                             y='longueur_onde_nm',
                             title="Distribution des longueurs d'onde par élément",
                             color='element')
-                st.plotly_chart(fig, use_container_width=True)
+                plotly_chart(fig, use_container_width=True)
+        
+        with tab4, section("Atlas Spectral"):
+            st.subheader("Atlas Multi-résolution")
+            st.caption(f"Spectre de chaque élément précalculé de {LAMBDA_MIN_ATLAS:.0f} à {LAMBDA_MAX_ATLAS:.0f} nm "
+                       f"(R = {POUVOIR_RESOLUTION_ATLAS:,.0f}) en pyramide d'enveloppes min-max sur disque : "
+                       "seules les tuiles de la fenêtre visible sont lues, au niveau adapté au zoom.")
+            
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                element_atlas_symb = st.selectbox("Élément:", sorted(self.spectral_lines['element'].unique()),
+                                                  key="atlas_element")
+            with col2:
+                centre_atlas = st.number_input("Centre de la fenêtre (nm):", LAMBDA_MIN_ATLAS, LAMBDA_MAX_ATLAS,
+                                               589.3, step=0.1, key="atlas_centre")
+            with col3:
+                largeur_atlas = st.select_slider("Largeur de la fenêtre (nm):", LARGEURS_FENETRE_ATLAS, value=20.0,
+                                                 key="atlas_largeur")
+            
+            lambda_min_vue = max(LAMBDA_MIN_ATLAS, centre_atlas - largeur_atlas / 2)
+            lambda_max_vue = min(LAMBDA_MAX_ATLAS, centre_atlas + largeur_atlas / 2)
+            raies_atlas = self.spectral_lines[self.spectral_lines['element'] == element_atlas_symb]
+            cle_atlas = content_key(catalogue=self.version_catalogue, elements=[element_atlas_symb], modele='gauss',
+                                    atlas=[LAMBDA_MIN_ATLAS, LAMBDA_MAX_ATLAS, POUVOIR_RESOLUTION_ATLAS,
+                                           ECHANTILLONNAGE_ATLAS])
+            with st.spinner("Construction de l'atlas..."):
+                atlas = element_atlas(cle_atlas, raies_atlas)
+            
+            debut = time.perf_counter()
+            vue = atlas.view(lambda_min_vue, lambda_max_vue, POINTS_VUE_ATLAS)
+            duree_lecture_ms = (time.perf_counter() - debut) * 1000
+            
+            col1, col2, col3, col4 = st.columns(4)
+            col1.metric("Niveau de la pyramide", f"{vue['niveau']} / {len(atlas.niveaux) - 1}")
+            col2.metric("Tuiles lues", vue['tuiles'])
+            col3.metric("Données lues", f"{vue['octets'] / 1024:.0f} Kio")
+            col4.metric("Lecture", f"{duree_lecture_ms:.2f} ms")
+            
+            fig = go.Figure()
+            fig.add_trace(go.Scatter(x=vue['longueurs_onde'], y=vue['minimum'], mode='lines',
+                                     line=dict(width=0.5, color='#2575FC'), name='Minimum', showlegend=False))
+            fig.add_trace(go.Scatter(x=vue['longueurs_onde'], y=vue['maximum'], mode='lines', fill='tonexty',
+                                     line=dict(width=1.5, color='#2575FC'), name='Enveloppe'))
+            for _, raie in raies_atlas[raies_atlas['longueur_onde'].between(lambda_min_vue, lambda_max_vue)].iterrows():
+                fig.add_vline(x=raie['longueur_onde'], line_dash="dot", line_color="gray", opacity=0.5)
+            fig.update_layout(
+                title=f"Atlas {element_atlas_symb} : {lambda_min_vue:.1f} – {lambda_max_vue:.1f} nm",
+                xaxis=dict(title="Longueur d'onde (nm)", range=[lambda_min_vue, lambda_max_vue]),
+                yaxis=dict(title="Intensité relative"),
+                height=450
+            )
+            plotly_chart(fig, use_container_width=True)
     
+    @timed
     def create_advanced_analysis(self):
         """Analyse avancée et outils spécialisés"""
         st.markdown('<h3 class="section-header">🔍 ANALYSE AVANCÉE</h3>', 
                    unsafe_allow_html=True)
         
-        tab1, tab2, tab3 = st.tabs(["Modèle de Bohr", "Effets Spectraux", "Simulateur Quantique"])
+        tab1, tab2, tab3, tab4 = st.tabs(["Modèle de Bohr", "Effets Spectraux", "Simulateur Quantique", "Transitions par Niveaux"])
         
-        with tab1:
+        with tab1, section("Modèle de Bohr"):
             st.subheader("Modèle Atomique de Bohr")
             
             col1, col2 = st.columns(2)
@@ -821,9 +1090,9 @@ class AtomicSpectraDashboard:
                     showlegend=True,
                     height=400
                 )
-                st.plotly_chart(fig, use_container_width=True)
+                plotly_chart(fig, use_container_width=True)
         
-        with tab2:
+        with tab2, section("Effets Spectraux"):
             st.subheader("Effets Spectraux et Structure Fine")
             
             col1, col2 = st.columns(2)
@@ -868,22 +1137,77 @@ class AtomicSpectraDashboard:
                 </span>
                 </div>
                 """, unsafe_allow_html=True)
-                
-                # Simulation d'effet Zeeman
-                st.subheader("Simulation d'effet Zeeman")
+            
+            # Simulation d'effet Zeeman anomal sur les raies du catalogue
+            st.subheader("Simulation d'effet Zeeman")
+            
+            col1, col2 = st.columns([1, 3])
+            
+            with col1:
                 champ_magnetique = st.slider("Champ magnétique (T):", 0.0, 5.0, 1.0)
-                separation = champ_magnetique * 0.1  # Séparation simulée
+                observation = st.radio("Observation:", ['transverse', 'longitudinale'])
+                largeur_zeeman = st.slider("Largeur instrumentale (pm):", 0.5, 20.0, 2.0)
                 
-                lambda_centre = 500  # nm
-                lambda_composantes = [lambda_centre - separation, lambda_centre, lambda_centre + separation]
-                intensites = [0.5, 1.0, 0.5]
+                raies_catalogue = self.spectral_lines.reset_index(drop=True)
+                etiquettes = [f"{r['element']} {r['longueur_onde']:.1f} nm ({r['transition']})"
+                              for _, r in raies_catalogue.iterrows()]
+                choix_raie = st.selectbox("Raie:", ["Spectre complet"] + etiquettes,
+                                          index=1 + int(np.argmin(abs(raies_catalogue['longueur_onde'] - 589.0))))
+            
+            # Toutes les composantes de toutes les raies en un seul appel
+            composantes = zeeman_components(
+                raies_catalogue['longueur_onde'], raies_catalogue['intensite'],
+                raies_catalogue['terme_haut'], raies_catalogue['terme_bas'],
+                champ_magnetique, observation
+            )
+            
+            with col2:
+                if choix_raie == "Spectre complet":
+                    lambda_range = wavelength_grid(200.0, 800.0, 60000)
+                    composantes_vues = composantes
+                    titre = f"Spectre complet avec effet Zeeman - B = {champ_magnetique} T"
+                else:
+                    indice = etiquettes.index(choix_raie)
+                    composantes_vues = composantes[composantes['indice_raie'] == indice]
+                    lambda_centre = raies_catalogue.loc[indice, 'longueur_onde']
+                    demi_plage = max(5 * largeur_zeeman * 1e-3,
+                                     2 * (composantes_vues['longueur_onde'] - lambda_centre).abs().max())
+                    lambda_range = wavelength_grid(lambda_centre - demi_plage, lambda_centre + demi_plage, 1000)
+                    titre = f"Effet Zeeman - {choix_raie} - B = {champ_magnetique} T"
                 
-                fig = px.bar(x=lambda_composantes, y=intensites,
-                            title=f"Effet Zeeman simulé - B = {champ_magnetique} T")
-                fig.update_layout(xaxis_title="Longueur d'onde (nm)", yaxis_title="Intensité relative")
-                st.plotly_chart(fig, use_container_width=True)
+                # La largeur ne descend pas sous le pas de la grille pour éviter le repliement
+                pas_grille = lambda_range[1] - lambda_range[0]
+                spectre_zeeman = synthesize_lines(lambda_range, composantes_vues['longueur_onde'],
+                                                  composantes_vues['intensite'],
+                                                  max(largeur_zeeman * 1e-3, 1.5 * pas_grille))
+                
+                fig = go.Figure()
+                fig.add_trace(go.Scatter(
+                    x=lambda_range, y=spectre_zeeman,
+                    mode='lines',
+                    line=dict(color='#2575FC', width=2),
+                    name='Profil synthétisé'
+                ))
+                
+                if choix_raie != "Spectre complet":
+                    couleurs_polarisation = {'π': '#FF6B35', 'σ+': '#4CAF50', 'σ-': '#9C27B0'}
+                    for polarisation, groupe in composantes_vues.groupby('polarisation'):
+                        fig.add_trace(go.Bar(
+                            x=groupe['longueur_onde'], y=groupe['intensite'],
+                            width=largeur_zeeman * 1e-3 / 2,
+                            marker_color=couleurs_polarisation[polarisation],
+                            name=f"Composantes {polarisation}"
+                        ))
+                
+                fig.update_layout(
+                    title=titre,
+                    xaxis=dict(title="Longueur d'onde (nm)"),
+                    yaxis=dict(title="Intensité relative"),
+                    height=400
+                )
+                plotly_chart(fig, use_container_width=True)
         
-        with tab3:
+        with tab3, section("Simulateur Quantique"):
             st.subheader("Simulateur de Transitions Quantiques")
             
             col1, col2 = st.columns(2)
@@ -894,10 +1218,17 @@ class AtomicSpectraDashboard:
                 n_final = st.selectbox("Niveau final:", range(1, n_initial), index=0)
                 l_final = st.selectbox("Nombre quantique orbital final:", range(0, n_final))
             
+            # Niveaux de l'hydrogène jusqu'au niveau initial
+            niveaux_h = next(e['niveaux_energie'] for e in self.elements_data if e['symbole'] == 'H')
+            etats_h = build_level_table('H', niveaux_h, n_initial)
+            etats_initiaux = etats_h[(etats_h['n'] == n_initial) & (etats_h['l'] == l_initial)]
+            etats_finaux = etats_h[(etats_h['n'] == n_final) & (etats_h['l'] == l_final)]
+            
             with col2:
-                # Règles de sélection
-                delta_l = abs(l_initial - l_final)
-                transition_permise = delta_l == 1
+                # Règles de sélection évaluées sur tous les états j des deux niveaux
+                permises = evaluate_selection_rules(etats_initiaux, etats_finaux)
+                types_permis = sorted(permises['type'].unique())
+                transition_permise = 'E1' in types_permis
                 
                 st.markdown(f"""
                 <div class="theory-box">
@@ -906,7 +1237,8 @@ class AtomicSpectraDashboard:
                 <span style="color: #333333;">
                 <strong>Δn</strong> : Quelconque<br>
                 <strong>Δl</strong> = ±1 : {'✅ Permise' if transition_permise else '❌ Interdite'}<br>
-                <strong>Δm</strong> = 0, ±1<br><br>
+                <strong>Δm</strong> = 0, ±1<br>
+                <strong>Multipôles permis</strong> : {', '.join(types_permis) if types_permis else 'aucun'}<br><br>
                 
                 <strong>Transition</strong> :<br>
                 {n_initial}{self.get_orbital_letter(l_initial)} → {n_final}{self.get_orbital_letter(l_final)}
@@ -921,12 +1253,89 @@ class AtomicSpectraDashboard:
                 
                 st.metric("Longueur d'onde approximative", f"{lambda_approx:.1f} nm")
                 st.metric("Énergie de transition", f"{energie_approx:.3f} eV")
+            
+            # Tous les canaux de désexcitation depuis le niveau choisi
+            st.subheader(f"Canaux de désexcitation depuis {n_initial}{self.get_orbital_letter(l_initial)}")
+            resoudre_m = st.checkbox("Résoudre les sous-niveaux m", value=False)
+            
+            etats_bas = etats_h[etats_h['n'] < n_initial]
+            if resoudre_m:
+                canaux = evaluate_selection_rules(expand_m_sublevels(etats_initiaux), expand_m_sublevels(etats_bas))
+            else:
+                canaux = evaluate_selection_rules(etats_initiaux, etats_bas)
+            
+            if not canaux.empty:
+                canaux['canal'] = (canaux['n_final'].astype(str) +
+                                   canaux['l_final'].map(self.get_orbital_letter) +
+                                   ' j=' + canaux['j_final'].astype(str))
+                
+                col1, col2 = st.columns(2)
+                
+                with col1:
+                    fig = px.bar(canaux.groupby(['canal', 'type'], as_index=False)['force_relative'].sum(),
+                                 x='canal', y='force_relative', color='type',
+                                 log_y=True,
+                                 title="Forces relatives par canal et par multipôle")
+                    fig.update_layout(xaxis_title="État final", yaxis_title="Force relative")
+                    plotly_chart(fig, use_container_width=True)
+                
+                with col2:
+                    st.dataframe(canaux.drop(columns='canal').sort_values('force_relative', ascending=False),
+                                 use_container_width=True)
+            else:
+                st.info("Aucun canal de désexcitation permis depuis ce niveau.")
+        
+        with tab4, section("Transitions par Niveaux"):
+            st.subheader("Transitions Construites à partir des Niveaux d'Énergie")
+            
+            col1, col2 = st.columns([1, 2])
+            
+            with col1:
+                elements_niveaux = st.multiselect(
+                    "Éléments à développer:",
+                    [e['symbole'] for e in self.elements_data],
+                    default=['H']
+                )
+                n_max_niveaux = st.slider("Nombre de niveaux n par élément:", 5, 45, 10)
+                
+                debut = time.perf_counter()
+                nouvelles, n_candidats = self.add_level_transitions(elements_niveaux, n_max_niveaux)
+                duree_ms = (time.perf_counter() - debut) * 1000
+                
+                st.metric("Paires candidates", f"{n_candidats:,}")
+                st.metric("Transitions permises (E1)", f"{len(nouvelles):,}")
+                st.metric("Temps de construction", f"{duree_ms:.0f} ms")
+                
+                st.markdown("""
+                <div class="theory-box">
+                <span style="color: #333333;">
+                Niveaux tabulés prolongés par Rydberg-Ritz, sous-niveaux l et j = l ± 1/2
+                (modèle hydrogénoïde), puis règles Δl = ±1, Δj = 0, ±1, changement de parité.
+                </span>
+                </div>
+                """, unsafe_allow_html=True)
+            
+            with col2:
+                if not nouvelles.empty:
+                    raies_fortes = nouvelles.nlargest(2000, 'intensite_relative')
+                    fig = px.scatter(raies_fortes,
+                                     x='longueur_onde_nm',
+                                     y='intensite_relative',
+                                     color='element',
+                                     hover_data=['transition', 'serie', 'energie_eV'],
+                                     log_x=True,
+                                     title="Transitions permises les plus intenses")
+                    fig.update_layout(xaxis_title="Longueur d'onde (nm)", yaxis_title="Intensité relative", height=400)
+                    plotly_chart(fig, use_container_width=True)
+                    
+                    st.dataframe(raies_fortes.head(200), use_container_width=True)
     
     def get_orbital_letter(self, l):
         """Convertit le nombre quantique orbital en lettre"""
         letters = ['s', 'p', 'd', 'f', 'g', 'h', 'i']
         return letters[l] if l < len(letters) else f'({l})'
     
+    @timed
     def create_sidebar(self):
         """Crée la sidebar avec les contrôles"""
         st.sidebar.markdown("## 🎛️ CONTRÔLES D'ANALYSE")
@@ -945,6 +1354,7 @@ class AtomicSpectraDashboard:
         st.sidebar.markdown("### ⚙️ Options d'Affichage")
         show_advanced = st.sidebar.checkbox("Afficher l'analyse avancée", value=False)
         show_simulations = st.sidebar.checkbox("Afficher les simulations", value=True)
+        st.sidebar.checkbox("⏱️ Panneau de performance", value=False, key='panneau_performance')
         
         # Constantes physiques ajustables
         st.sidebar.markdown("### 🔧 Constantes Physiques")
@@ -961,35 +1371,44 @@ class AtomicSpectraDashboard:
     
     def run_dashboard(self):
         """Exécute le dashboard complet"""
-        # Sidebar
-        controls = self.create_sidebar()
-        
-        # Header
-        self.display_header()
-        
-        # Navigation par onglets
-        tab1, tab2, tab3, tab4, tab5 = st.tabs([
-            "📚 Théorie", 
-            "🧮 Calculateur", 
-            "⚛️ Hydrogène", 
-            "⚡ Éléments", 
-            "🔍 Avancé"
-        ])
-        
-        with tab1:
-            self.display_theory_introduction()
-        
-        with tab2:
-            self.create_spectral_calculator()
-        
-        with tab3:
-            self.create_hydrogen_spectrum_analysis()
-        
-        with tab4:
-            self.create_elements_comparison()
+        # Instrumentation de la réexécution seulement si le panneau de performance est affiché
+        enregistreur = PerformanceRecorder() if st.session_state.get('panneau_performance') else None
+        with enregistreur.activate() if enregistreur is not None else nullcontext():
+            # Sidebar
+            controls = self.create_sidebar()
+            
+            # Header
+            self.display_header()
+            
+            # Navigation par onglets
+            tab1, tab2, tab3, tab4, tab5 = st.tabs([
+                "📚 Théorie", 
+                "🧮 Calculateur", 
+                "⚛️ Hydrogène", 
+                "⚡ Éléments", 
+                "🔍 Avancé"
+            ])
+            
+            with tab1:
+                self.display_theory_introduction()
+            
+            with tab2:
+                self.create_spectral_calculator()
+            
+            with tab3:
+                self.create_hydrogen_spectrum_analysis()
+            
+            with tab4:
+                self.create_elements_comparison()
+            
+            with tab5:
+                self.create_advanced_analysis()
         
-        with tab5:
-            self.create_advanced_analysis()
+        if enregistreur is not None:
+            historique = st.session_state.setdefault('historique_performance', [])
+            historique.append(enregistreur.to_record())
+            del historique[:-TAILLE_HISTORIQUE_PERFORMANCE]
+            display_performance_panel(st.sidebar.container(), enregistreur, historique)
 
 # Lancement du dashboard
 if __name__ == "__main__":
@@ -7,9 +7,30 @@ from plotly.subplots import make_subplots
 import matplotlib.pyplot as plt
 import seaborn as sns
 from scipy import constants
+import os
+import time
 import warnings
+from contextlib import nullcontext
 warnings.filterwarnings('ignore')
 
+from spectral_analysis import (best_analytical_lines, build_wavelength_index, detect_peaks, find_blends, fit_spectrum,
+                               identify_peaks, load_measured_spectrum)
+from spectral_basis import (PRECALCULS_BASES, TEMPERATURES_BASES, interpolated_basis, precompute_temperature_bases,
+                            temperature_stack)
+from spectral_cache import CACHE_SPECTRES, catalogue_version, content_key
+from spectral_cube import DOSSIER_CUBES, TAILLE_MAX_CUBE_UNIQUE_OCTETS, HyperspectralCube, build_cube, hot_spot_map
+from spectral_jobs import SynthesisJobManager
+from spectral_figures import downsample_heatmap, plotly_chart, visible_window, zoomable_chart
+from spectral_profiling import PerformanceRecorder, count_rows, display_performance_panel, section, timed
+from spectral_noise import (DETECTEUR_DEFAUT, PROBABILITE_LIMITE, TAUX_FAUSSE_ALARME, Detecteur, detection_limit,
+                            detection_probability)
+from spectral_live import FileTailSource, LiveFeed, SimulatorSource, SpectrumRingBuffer, UnixSocketSource, track_lines
+from spectral_physics import oscillator_strengths, plasma_decay
+from spectral_synthesis import (TEMPERATURE_REFERENCE, boltzmann_factors, bremsstrahlung_emissivity,
+                                convolve_instrument, convolve_spectrum, doppler_scale, line_centre_cross_sections,
+                                log_lambda_grid, lower_level_fractions, planck_radiance, slab_emission,
+                                slab_transmission, synthesize_lines, synthesize_window, wavelength_grid)
+
 # Configuration de la page
 st.set_page_config(
     page_title="Dashboard Spectroscopie Atomique Complète",
@@ -105,12 +126,53 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+# Pouvoir de résolution R = λ/Δλ associé à chaque niveau de résolution du simulateur
+POUVOIRS_RESOLUTION = {"Basse": 500, "Moyenne": 2000, "Haute": 10000}
+
+# Profils instrumentaux du simulateur appliqués par convolution FFT
+PROFILS_FFT = {"Gaussien (FFT)": 'gauss', "Sinc (FFT)": 'sinc', "Mesuré (FFT)": 'mesure'}
+
+# Composantes de continuum du simulateur, évaluées une fois par (T, grille)
+COMPOSANTES_CONTINUUM = {'corps_noir': planck_radiance, 'bremsstrahlung': bremsstrahlung_emissivity}
+
+# Profil instrumental mesuré de démonstration (décalages en nm, réponse) : triangle asymétrique
+NOYAU_MESURE_DEMONSTRATION = (np.array([-0.3, 0.0, 0.6]), np.array([0.0, 1.0, 0.0]))
+
+# Modèles de transfert radiatif du simulateur
+MODES_TRANSFERT = ("Optiquement mince", "Couche épaisse (auto-absorption)", "Absorption (transmission)")
+
+# Au-delà de ce nombre d'évaluations (raies × points), la synthèse part en tâche de fond
+SEUIL_CALCUL_ARRIERE_PLAN = 2e7
+
+# Grille du simulateur dont les bases en température sont précalculées au démarrage, et taille
+# maximale des grilles interpolées en température (une base par nœud et par élément en cache disque)
+GRILLE_SIMULATEUR_DEFAUT = (200.0, 800.0, 2000)
+POINTS_MAX_BASES_TEMPERATURE = 200000
+# Part du cache disque que peuvent occuper les bases aux nœuds des éléments simulés : au-delà, elles
+# s'évinceraient mutuellement d'une réexécution à l'autre et la synthèse exacte est utilisée
+FRACTION_CACHE_BASES_TEMPERATURE = 0.5
+
+# Carte temps × λ de la décroissance du plasma : cellules affichées au plus (lignes × colonnes)
+LIGNES_CARTE_DECROISSANCE = 100
+COLONNES_CARTE_DECROISSANCE = 500
+
+# Nombre de réexécutions conservées pour l'export JSON lines du panneau de performance
+TAILLE_HISTORIQUE_PERFORMANCE = 200
+
+# Graine des largeurs Doppler simulées du catalogue
+GRAINE_LARGEURS = 0
+
+# Points synthétisés sur la fenêtre visible d'un spectre zoomable, quelle que soit sa largeur
+POINTS_FENETRE_SPECTRE = 2000
+
 class CompleteAtomicSpectraDashboard:
     def __init__(self):
         self.elements_data = self.define_all_elements_data()
         self.series_data = self.define_series_data()
         self.transitions_data = self.define_all_transitions_data()
         self.spectral_lines = self.define_complete_spectral_lines()
+        self.version_catalogue = catalogue_version(self.spectral_lines)
+        self.index_elements = {}
         
     def define_all_elements_data(self):
         """Définit les données complètes pour tous les éléments"""
@@ -353,6 +415,8 @@ class CompleteAtomicSpectraDashboard:
     def define_complete_spectral_lines(self):
         """Définit les raies spectrales complètes pour tous les éléments"""
         lines = []
+        # Largeurs tirées d'une graine fixe : catalogue identique d'une exécution à l'autre (clé de cache stable)
+        generateur = np.random.default_rng(GRAINE_LARGEURS)
         
         for element in self.elements_data:
             element_lines = self.transitions_data[
@@ -366,11 +430,11 @@ class CompleteAtomicSpectraDashboard:
                 
                 # Largeur dépendant de l'élément
                 if element['categorie'] == 'Gaz noble':
-                    largeur = 0.05 + 0.02 * np.random.random()
+                    largeur = 0.05 + 0.02 * generateur.random()
                 elif element['categorie'] == 'Métal alcalin':
-                    largeur = 0.1 + 0.05 * np.random.random()
+                    largeur = 0.1 + 0.05 * generateur.random()
                 else:
-                    largeur = 0.08 + 0.03 * np.random.random()
+                    largeur = 0.08 + 0.03 * generateur.random()
                 
                 lines.append({
                     'element': element['symbole'],
@@ -390,6 +454,7 @@ class CompleteAtomicSpectraDashboard:
         """Calcule la longueur d'onde avec la formule de Rydberg"""
         return 1 / (rydberg_constant * z**2 * (1/n1**2 - 1/n2**2)) * 1e9
     
+    @timed
     def display_header(self):
         """Affiche l'en-tête du dashboard"""
         st.markdown('<h1 class="main-header">🔬 Dashboard Spectroscopie Atomique Complète</h1>', 
@@ -400,6 +465,7 @@ class CompleteAtomicSpectraDashboard:
             st.markdown("**<span style='color: #333333'>Spectres complets de tous les atomes - Classification et analyse</span>", 
                        unsafe_allow_html=True)
     
+    @timed
     def create_periodic_table_overview(self):
         """Affiche une vue type tableau périodique"""
         st.markdown('<h3 class="section-header">📊 TABLEAU PÉRIODIQUE DES SPECTRES</h3>', 
@@ -468,14 +534,55 @@ class CompleteAtomicSpectraDashboard:
                 </div>
                 """, unsafe_allow_html=True)
     
+    def element_lines(self, symbole):
+        """Raies d'un élément et leur index trié des longueurs d'onde (construits au premier appel)"""
+        if symbole not in self.index_elements:
+            raies = self.spectral_lines[self.spectral_lines['element'] == symbole].reset_index(drop=True)
+            self.index_elements[symbole] = (raies, build_wavelength_index(raies))
+        return self.index_elements[symbole]
+    
+    def build_spectrum_figure(self, lambda_range, spectre, element_data, raies_principales, height=400):
+        """Figure du spectre d'un élément avec ses raies principales marquées
+        
+        La première trace est le spectre ; le flux en direct ne remplace ensuite
+        que ses ordonnées au lieu de reconstruire la figure.
+        """
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(
+            x=lambda_range, y=spectre,
+            mode='lines',
+            line=dict(color=element_data['couleur_spectre'], width=2),
+            name=f"Spectre {element_data['symbole']}"
+        ))
+        
+        # Marquage des raies principales
+        for _, raie in raies_principales.iterrows():
+            fig.add_trace(go.Scatter(
+                x=[raie['longueur_onde'], raie['longueur_onde']],
+                y=[0, raie['intensite']],
+                mode='lines',
+                line=dict(color='black', width=1, dash='dash'),
+                showlegend=False
+            ))
+        
+        fig.update_layout(
+            title=f"Spectre d'émission de {element_data['nom']}",
+            xaxis=dict(title="Longueur d'onde (nm)"),
+            yaxis=dict(title="Intensité relative"),
+            height=height
+        )
+        return fig
+    
+    @timed
     def create_spectral_library(self):
         """Crée une bibliothèque complète des spectres"""
         st.markdown('<h3 class="section-header">📚 BIBLIOTHÈQUE DES SPECTRES ATOMIQUES</h3>', 
                    unsafe_allow_html=True)
         
-        tab1, tab2, tab3 = st.tabs(["Recherche par Élément", "Par Catégorie", "Spectres Comparés"])
+        tab1, tab2, tab3, tab4 = st.tabs(["Recherche par Élément", "Par Catégorie", "Spectres Comparés",
+                                          "Flux en Direct"])
         
-        with tab1:
+        with tab1, section("Recherche par Élément"):
             # Recherche par élément
             col1, col2 = st.columns([1, 3])
             
@@ -485,46 +592,25 @@ class CompleteAtomicSpectraDashboard:
                 element_symb = element_recherche.split(' - ')[0]
                 
                 element_data = next(e for e in self.elements_data if e['symbole'] == element_symb)
-                raies_element = self.spectral_lines[self.spectral_lines['element'] == element_symb]
+                raies_element, index_element = self.element_lines(element_symb)
             
             with col2:
                 st.subheader(f"Spectre de {element_data['nom']} ({element_data['symbole']})")
                 
-                # Spectre simulé
-                lambda_range = np.linspace(100, 800, 2000)
-                spectre_element = np.zeros_like(lambda_range)
-                
-                for _, raie in raies_element.iterrows():
-                    if 100 <= raie['longueur_onde'] <= 800:
-                        spectre_raie = raie['intensite'] * np.exp(-0.5 * ((lambda_range - raie['longueur_onde']) / raie['largeur'])**2)
-                        spectre_element += spectre_raie
-                
-                fig = go.Figure()
-                fig.add_trace(go.Scatter(
-                    x=lambda_range, y=spectre_element,
-                    mode='lines',
-                    line=dict(color=element_data['couleur_spectre'], width=2),
-                    name=f"Spectre {element_symb}"
-                ))
+                # Spectre simulé sur la seule fenêtre visible, resynthétisé à chaque zoom
+                lambda_min_vue, lambda_max_vue = visible_window("spectre_bibliotheque", 100.0, 800.0)
+                lambda_range, spectre_element, retenues = synthesize_window(
+                    lambda_min_vue, lambda_max_vue, POINTS_FENETRE_SPECTRE, index_element,
+                    raies_element['intensite'].to_numpy(), raies_element['largeur'].to_numpy())
                 
-                # Marquage des raies principales
-                raies_principales = raies_element.nlargest(5, 'intensite')
-                for _, raie in raies_principales.iterrows():
-                    fig.add_trace(go.Scatter(
-                        x=[raie['longueur_onde'], raie['longueur_onde']],
-                        y=[0, raie['intensite']],
-                        mode='lines',
-                        line=dict(color='black', width=1, dash='dash'),
-                        showlegend=False
-                    ))
-                
-                fig.update_layout(
-                    title=f"Spectre d'émission de {element_data['nom']}",
-                    xaxis=dict(title="Longueur d'onde (nm)"),
-                    yaxis=dict(title="Intensité relative"),
-                    height=400
-                )
-                st.plotly_chart(fig, use_container_width=True)
+                raies_visibles = raies_element.iloc[retenues]
+                raies_principales = raies_visibles[raies_visibles['longueur_onde'].between(
+                    lambda_min_vue, lambda_max_vue)].nlargest(5, 'intensite')
+                fig = self.build_spectrum_figure(lambda_range, spectre_element, element_data, raies_principales)
+                zoomable_chart(fig, "spectre_bibliotheque", use_container_width=True)
+                st.caption(f"{len(retenues)} raie(s) synthétisée(s) sur {len(raies_element)} ; "
+                           f"pas de grille {(lambda_max_vue - lambda_min_vue) / (POINTS_FENETRE_SPECTRE - 1) * 1e3:.2f} pm. "
+                           "Sélectionnez une zone du graphique pour zoomer.")
             
             # Détails de l'élément
             col1, col2, col3 = st.columns(3)
@@ -574,7 +660,7 @@ class CompleteAtomicSpectraDashboard:
                     </div>
                     """, unsafe_allow_html=True)
         
-        with tab2:
+        with tab2, section("Par Catégorie"):
             # Recherche par catégorie
             categories = list(set([e['categorie'] for e in self.elements_data]))
             categorie_selectionnee = st.selectbox("Sélectionnez une catégorie:", categories)
@@ -598,7 +684,7 @@ class CompleteAtomicSpectraDashboard:
                         </div>
                         """, unsafe_allow_html=True)
         
-        with tab3:
+        with tab3, section("Spectres Comparés"):
             # Comparaison de spectres multiples
             st.subheader("Comparaison de Spectres Multiples")
             
@@ -640,16 +726,692 @@ class CompleteAtomicSpectraDashboard:
                     yaxis=dict(title="Intensité relative"),
                     height=500
                 )
-                st.plotly_chart(fig, use_container_width=True)
+                plotly_chart(fig, use_container_width=True)
+        
+        with tab4, section("Flux en Direct"):
+            self.create_live_feed()
+    
+    @timed
+    def create_live_feed(self):
+        """Flux en direct d'un spectromètre : acquisition en tâche de fond, affichage à cadence plafonnée"""
+        st.subheader("Flux en direct du spectromètre")
+        
+        col1, col2 = st.columns([1, 3])
+        
+        with col1:
+            type_source = st.radio("Source:", ["Simulateur", "Fichier (ajout continu)", "Socket UNIX"])
+            element_direct = st.selectbox("Élément observé:", [e['symbole'] for e in self.elements_data],
+                                          key="element_direct")
+            if type_source == "Simulateur":
+                chemin_source = None
+                lambda_min, lambda_max, n_points = 100.0, 800.0, 2000
+            else:
+                chemin_source = st.text_input("Chemin de la source:", "/tmp/spectrometre.csv"
+                                              if type_source == "Fichier (ajout continu)" else "/tmp/spectrometre.sock")
+                lambda_min = st.number_input("λ min du détecteur (nm):", value=100.0)
+                lambda_max = st.number_input("λ max du détecteur (nm):", value=800.0)
+                n_points = int(st.number_input("Pixels par trame:", min_value=16, value=2000, step=1))
+            n_trames = st.slider("Taille du tampon (trames):", 10, 1000, 250)
+            cadence_affichage = st.slider("Rafraîchissement maximal (images/s):", 1, 20, 5)
+            demi_fenetre_suivi = st.slider("Demi-fenêtre de suivi des raies (nm):", 0.05, 2.0, 0.3)
+            
+            col_a, col_b = st.columns(2)
+            with col_a:
+                demarrer = st.button("▶️ Démarrer")
+            with col_b:
+                arreter = st.button("⏹️ Arrêter")
+        
+        configuration = (type_source, element_direct, chemin_source, lambda_min, lambda_max, n_points, n_trames)
+        flux = st.session_state.get('flux_direct')
+        # Source ou réglages modifiés : le fil d'acquisition de l'ancienne configuration est arrêté aussitôt
+        if flux is not None and (arreter or flux['configuration'] != configuration):
+            flux['acquisition'].stop()
+            flux = st.session_state['flux_direct'] = None
+        
+        if demarrer and flux is None:
+            grille = wavelength_grid(float(lambda_min), float(lambda_max), n_points)
+            raies_direct = self.spectral_lines[self.spectral_lines['element'] == element_direct]
+            try:
+                if type_source == "Simulateur":
+                    source = SimulatorSource(grille, raies_direct['longueur_onde'], raies_direct['intensite'],
+                                             raies_direct['largeur'])
+                elif type_source == "Fichier (ajout continu)":
+                    source = FileTailSource(chemin_source, n_points)
+                else:
+                    source = UnixSocketSource(chemin_source, n_points)
+            except OSError as erreur:
+                st.error(f"Source indisponible : {erreur}")
+            else:
+                tampon = SpectrumRingBuffer(n_trames, n_points)
+                element_data = next(e for e in self.elements_data if e['symbole'] == element_direct)
+                raies_suivies = raies_direct[raies_direct['longueur_onde'].between(grille[0], grille[-1])].nlargest(5, 'intensite')
+                
+                # Figure construite une fois ; chaque rafraîchissement ne remplace que les ordonnées
+                figure = self.build_spectrum_figure(grille, np.zeros(n_points), element_data, raies_suivies, height=450)
+                figure.data[0].name = "Moyenne glissante"
+                figure.add_trace(go.Scatter(x=grille, y=np.zeros(n_points), mode='lines',
+                                            line=dict(color='gray', width=1), opacity=0.6, name="Dernière trame"))
+                figure.add_trace(go.Scatter(x=raies_suivies['longueur_onde'], y=np.zeros(len(raies_suivies)),
+                                            mode='markers', marker=dict(color='red', size=9, symbol='x'),
+                                            name="Raies suivies"))
+                figure.update_layout(title=f"Flux en direct - {element_data['nom']}")
+                
+                flux = st.session_state['flux_direct'] = {
+                    'configuration': configuration,
+                    'acquisition': LiveFeed(source, tampon).start(),
+                    'tampon': tampon,
+                    'grille': grille,
+                    'raies_suivies': raies_suivies,
+                    'figure': figure,
+                    'affichages': []
+                }
+        
+        with col2:
+            if flux is None:
+                st.info("Choisissez une source puis démarrez l'acquisition. Fichier : une trame par ligne "
+                        "(intensités séparées par des virgules) ; socket : trames float32 de n pixels.")
+            else:
+                # Seul ce fragment est réexécuté à la cadence d'affichage, pas le script entier
+                st.fragment(run_every=1.0 / cadence_affichage)(self.display_live_feed)(flux, demi_fenetre_suivi)
+    
+    @timed
+    def display_live_feed(self, flux, demi_fenetre_suivi):
+        """Rafraîchit la figure du flux en direct à partir du tampon circulaire"""
+        tampon = flux['tampon']
+        derniere, total = tampon.latest()
+        if flux['acquisition'].state == 'erreur':
+            st.error(f"Acquisition interrompue : {flux['acquisition'].erreur}. Redémarrez l'acquisition.")
+        if derniere is None:
+            st.info("En attente des premières trames...")
+            return
+        
+        maintenant = time.monotonic()
+        flux['affichages'] = [t for t in flux['affichages'] if maintenant - t < 2.0] + [maintenant]
+        
+        trames, horodatages = tampon.ordered()
+        raies_suivies = flux['raies_suivies']
+        positions, pics = track_lines(flux['grille'], trames, raies_suivies['longueur_onde'], demi_fenetre_suivi)
+        
+        figure = flux['figure']
+        figure.data[0].y = tampon.mean()
+        figure.data[-2].y = derniere
+        figure.data[-1].x = positions[-1]
+        figure.data[-1].y = pics[-1]
+        
+        col_a, col_b, col_c, col_d = st.columns(4)
+        with col_a:
+            st.metric("Trames reçues", f"{total:,}")
+        with col_b:
+            st.metric("Cadence d'acquisition", f"{tampon.frame_rate():.1f} trames/s")
+        with col_c:
+            st.metric("Cadence d'affichage", f"{(len(flux['affichages']) - 1) / 2.0:.1f} images/s")
+        with col_d:
+            st.metric("Trames dans le tampon", f"{len(tampon)}")
+        
+        plotly_chart(figure, use_container_width=True, key="figure_flux_direct")
+        
+        if len(raies_suivies):
+            st.dataframe(pd.DataFrame({
+                'Raie catalogue (nm)': raies_suivies['longueur_onde'].to_numpy(),
+                'Position mesurée (nm)': positions[-1],
+                'Décalage moyen (pm)': (positions.mean(axis=0) - raies_suivies['longueur_onde'].to_numpy()) * 1e3,
+                'Dispersion (pm)': positions.std(axis=0) * 1e3,
+                'Intensité crête': pics[-1]
+            }).round(3), use_container_width=True)
     
+    def search_lines(self, longueur_onde, tolerance, energie_min, energie_max, raies=None):
+        """Raies à moins de `tolerance` nm de la longueur d'onde recherchée, dans la plage d'énergie"""
+        raies = self.spectral_lines if raies is None else raies
+        count_rows(len(raies))
+        return raies[
+            (abs(raies['longueur_onde'] - longueur_onde) <= tolerance) &
+            (raies['energie_eV'] >= energie_min) &
+            (raies['energie_eV'] <= energie_max)
+        ]
+    
+    def synthesize_composite(self, lambda_range, raies, temperature, profil_instrument, pouvoir_resolution,
+                             noyau_mesure=None, grille_log=False, progression=None):
+        """Spectre composite du simulateur : une gaussienne par raie ou convolution unique par FFT"""
+        if profil_instrument == "Gaussien par raie":
+            # Effet de température sur la largeur
+            return synthesize_lines(lambda_range, raies['longueur_onde'], raies['intensite'],
+                                    raies['largeur'] * doppler_scale(temperature), progression=progression)
+        
+        # Spectre en bâtons convolué une seule fois : O(N log N) quel que soit le nombre de raies
+        spectre = convolve_instrument(lambda_range, raies['longueur_onde'], raies['intensite'],
+                                      PROFILS_FFT[profil_instrument],
+                                      pouvoir_resolution=pouvoir_resolution, noyau_mesure_nm=noyau_mesure,
+                                      log_lambda=grille_log)
+        if progression is not None:
+            progression(1.0)
+        return spectre
+    
+    def basis_key(self, symbole, profil_instrument, temperature, pouvoir_resolution, lambda_range, grille_log,
+                  noyau_mesure=None):
+        """Clé du cache disque du spectre de base d'un élément : tout ce qui le détermine
+
+        La température n'agit que sur le profil par raie, le pouvoir de résolution
+        que sur les profils par FFT ; la pression n'entre pas dans le modèle de synthèse.
+        """
+        par_raie = profil_instrument == "Gaussien par raie"
+        return content_key(
+            catalogue=self.version_catalogue, elements=[symbole], profil=profil_instrument,
+            temperature=temperature if par_raie else None,
+            pouvoir_resolution=None if par_raie else pouvoir_resolution,
+            grille=[float(lambda_range[0]), float(lambda_range[-1]), len(lambda_range), grille_log],
+            noyau_mesure=None if noyau_mesure is None else [np.asarray(v, dtype=float) for v in noyau_mesure]
+        )
+    
+    def synthesize_bases(self, cles, elements, lambda_range, temperature, profil_instrument, pouvoir_resolution,
+                         noyau_mesure=None, grille_log=False, progression=None):
+        """Matrice (éléments × points) des spectres de base, relus du cache disque ou synthétisés puis enregistrés
+        
+        Le simulateur est linéaire en intensités : le spectre composite d'un mélange
+        est le produit des abondances par cette matrice, sans réévaluer aucune raie.
+        """
+        bases = np.empty((len(elements), len(lambda_range)))
+        for i, (cle, symbole) in enumerate(zip(cles, elements)):
+            base = CACHE_SPECTRES.get(cle)
+            if base is None:
+                progression_element = None
+                if progression is not None:
+                    progression_element = lambda fraction, i=i: progression((i + fraction) / len(elements))
+                base = self.synthesize_composite(lambda_range, self.element_lines(symbole)[0], temperature,
+                                                 profil_instrument, pouvoir_resolution, noyau_mesure, grille_log,
+                                                 progression=progression_element)
+                CACHE_SPECTRES.put(cle, base)
+            bases[i] = base
+            if progression is not None:
+                progression((i + 1) / len(elements))
+        return bases
+    
+    def temperature_basis_keys(self, symbole, lambda_range, grille_log):
+        """Clés des bases d'un élément aux nœuds de température (profil par raie) et de leurs erreurs d'interpolation"""
+        cles = [self.basis_key(symbole, "Gaussien par raie", temperature, None, lambda_range, grille_log)
+                for temperature in TEMPERATURES_BASES]
+        return cles, content_key(erreurs_interpolation=cles)
+    
+    def precompute_element_bases(self, elements, lambda_range, grille_log=False):
+        """Bases aux nœuds de température et erreurs d'interpolation des éléments (exécuté en tâche de fond)"""
+        for symbole in elements:
+            raies = self.element_lines(symbole)[0]
+            cles, cle_erreurs = self.temperature_basis_keys(symbole, lambda_range, grille_log)
+            precompute_temperature_bases(
+                lambda temperature: self.synthesize_composite(lambda_range, raies, temperature, "Gaussien par raie",
+                                                              None, grille_log=grille_log),
+                cles, cle_erreurs)
+    
+    def warm_up_key(self):
+        return content_key(demarrage=self.version_catalogue, grille=GRILLE_SIMULATEUR_DEFAUT)
+    
+    def warm_up_temperature_bases(self):
+        """Soumet au démarrage le précalcul des bases en température de tous les éléments (grille par défaut)"""
+        lambda_range = wavelength_grid(*GRILLE_SIMULATEUR_DEFAUT)
+        PRECALCULS_BASES.submit(self.warm_up_key(), self.precompute_element_bases,
+                                sorted(self.spectral_lines['element'].unique()), lambda_range)
+    
+    def temperature_bases_fit(self, elements, lambda_range):
+        """Vrai si les bases aux nœuds de température des éléments tiennent ensemble dans le cache disque"""
+        octets = len(elements) * len(TEMPERATURES_BASES) * len(lambda_range) * np.dtype(float).itemsize
+        return (len(lambda_range) <= POINTS_MAX_BASES_TEMPERATURE and
+                octets <= FRACTION_CACHE_BASES_TEMPERATURE * CACHE_SPECTRES.taille_max_octets)
+    
+    def interpolated_bases(self, elements, lambda_range, temperature, grille_log=False):
+        """Bases des éléments interpolées à la température et erreur relative estimée, sans synthèse
+        
+        Retourne (None, None) si le précalcul d'un élément manque ; il est alors
+        soumis en tâche de fond, sauf sur la grille par défaut tant que le
+        précalcul de démarrage, qui couvre tous les éléments, est en cours.
+        """
+        bases = np.empty((len(elements), len(lambda_range)))
+        erreurs_estimees = []
+        demarrage_en_cours = (not grille_log and PRECALCULS_BASES.is_pending(self.warm_up_key()) and
+                              (lambda_range[0], lambda_range[-1], len(lambda_range)) == GRILLE_SIMULATEUR_DEFAUT)
+        for i, symbole in enumerate(elements):
+            cles, cle_erreurs = self.temperature_basis_keys(symbole, lambda_range, grille_log)
+            resultat = interpolated_basis(cles, cle_erreurs, temperature)
+            if resultat is None:
+                erreurs_estimees = None
+                if demarrage_en_cours:
+                    continue
+                PRECALCULS_BASES.forget(cle_erreurs)
+                PRECALCULS_BASES.submit(cle_erreurs, self.precompute_element_bases, [symbole], lambda_range,
+                                        grille_log)
+            elif erreurs_estimees is not None:
+                bases[i], erreur_estimee = resultat
+                erreurs_estimees.append(erreur_estimee)
+        if erreurs_estimees is None:
+            return None, None
+        return bases, max(erreurs_estimees)
+    
+    def opacity_basis(self, symbole, lambda_range, temperature, grille_log=False):
+        """Section efficace d'absorption d'un atome de l'élément sur la grille (cm²), en cache disque
+        
+        Somme sur les raies de σ₀ (force d'oscillateur tabulée) × fraction du niveau
+        inférieur × profil gaussien à la largeur Doppler de T ; les raies sans force
+        d'oscillateur tabulée n'absorbent pas.
+        """
+        cle = content_key(catalogue=self.version_catalogue, elements=[symbole], grandeur='section_efficace',
+                          temperature=temperature,
+                          grille=[float(lambda_range[0]), float(lambda_range[-1]), len(lambda_range), grille_log])
+        
+        def calcul():
+            raies = self.element_lines(symbole)[0]
+            niveaux = oscillator_strengths(raies).fillna({'f_absorption': 0.0, 'energie_bas_eV': 0.0,
+                                                          'g_bas': 1, 'g_fondamental': 1})
+            largeurs = raies['largeur'].to_numpy() * doppler_scale(temperature)
+            sections = (line_centre_cross_sections(raies['longueur_onde'], niveaux['f_absorption'], largeurs) *
+                        lower_level_fractions(niveaux['energie_bas_eV'], niveaux['g_bas'], niveaux['g_fondamental'],
+                                              temperature))
+            return synthesize_lines(lambda_range, raies['longueur_onde'], sections, largeurs)
+        
+        return CACHE_SPECTRES.get_or_compute(cle, calcul)
+    
+    def slab_spectrum(self, elements, colonnes, lambda_range, temperature, mode_transfert, profil_instrument,
+                      pouvoir_resolution, noyau_mesure=None, grille_log=False):
+        """Spectre d'une couche homogène à l'ETL et profondeur optique maximale
+        
+        τ(λ) est le produit des densités de colonne (cm⁻², une par élément) par les
+        sections efficaces en cache : changer une densité ne réévalue aucune raie.
+        En émission, la fonction source est le corps noir à T, normalisé à son
+        maximum sur la grille ; en absorption, la couche est éclairée par un
+        continuum plat. Les profils FFT convoluent le spectre émergent.
+        """
+        profondeur = np.asarray(colonnes, dtype=float) @ np.array(
+            [self.opacity_basis(symbole, lambda_range, temperature, grille_log) for symbole in elements])
+        if mode_transfert == "Absorption (transmission)":
+            spectre = slab_transmission(profondeur)
+        else:
+            source = planck_radiance(lambda_range, temperature)
+            spectre = slab_emission(profondeur, source / source.max())
+        
+        if profil_instrument in PROFILS_FFT:
+            # En transmission, seule la partie absorbée est convoluée (bords de grille sans artefact)
+            convolution = lambda y: convolve_spectrum(lambda_range, y, PROFILS_FFT[profil_instrument],
+                                                      pouvoir_resolution=pouvoir_resolution,
+                                                      noyau_mesure_nm=noyau_mesure, log_lambda=grille_log)
+            spectre = 1 - convolution(1 - spectre) if mode_transfert == "Absorption (transmission)" else convolution(spectre)
+        return spectre, float(profondeur.max())
+    
+    def continuum_component(self, composante, lambda_range, temperature, grille_log=False):
+        """Composante de continuum sur la grille, en cache disque par (composante, T, grille)
+        
+        Normalisée au maximum sur la grille de la même composante à la température
+        de référence des intensités de raies : son niveau suit T comme les raies.
+        """
+        cle = content_key(grandeur='continuum', composante=composante, temperature=temperature,
+                          grille=[float(lambda_range[0]), float(lambda_range[-1]), len(lambda_range), grille_log])
+        
+        def calcul():
+            calcul_composante = COMPOSANTES_CONTINUUM[composante]
+            return (calcul_composante(lambda_range, temperature) /
+                    calcul_composante(lambda_range, TEMPERATURE_REFERENCE).max())
+        
+        return CACHE_SPECTRES.get_or_compute(cle, calcul)
+    
+    @timed
+    def continuum_spectrum(self, lambda_range, temperature, niveaux, fond=None, grille_log=False):
+        """Continuum total ou None : composantes pondérées par `niveaux` et fond mesuré rééchantillonné
+        
+        `fond` est un triplet (λ, intensité, niveau) ; le fond est normalisé à son
+        maximum et nul hors de son domaine.
+        """
+        continuum = None
+        for composante, niveau in niveaux.items():
+            if niveau > 0:
+                terme = niveau * self.continuum_component(composante, lambda_range, temperature, grille_log)
+                continuum = terme if continuum is None else continuum + terme
+        if fond is not None and fond[2] > 0:
+            longueurs_onde, intensites, niveau = fond
+            echelle = niveau / max(np.max(np.abs(intensites)), np.finfo(float).tiny)
+            terme = echelle * np.interp(lambda_range, longueurs_onde, intensites, left=0.0, right=0.0)
+            continuum = terme if continuum is None else continuum + terme
+        return continuum
+    
+    def build_composite_figure(self, lambda_range, spectre_composite, titre, continuum=None):
+        """Figure du spectre composite simulé, posé sur le continuum s'il est fourni"""
+        fig = go.Figure()
+        if continuum is not None:
+            spectre_composite = spectre_composite + continuum
+            fig.add_trace(go.Scatter(
+                x=lambda_range, y=continuum,
+                mode='lines',
+                line=dict(color='#888888', width=1, dash='dash'),
+                name='Continuum'
+            ))
+        fig.add_trace(go.Scatter(
+            x=lambda_range, y=spectre_composite,
+            mode='lines',
+            line=dict(color='#FF6B6B', width=2),
+            name='Spectre composite'
+        ))
+        
+        fig.update_layout(
+            title=titre,
+            xaxis=dict(title="Longueur d'onde (nm)"),
+            yaxis=dict(title="Intensité relative"),
+            height=400
+        )
+        return fig
+    
+    def cancel_background_synthesis(self):
+        """Annule la synthèse de fond de la session quand le résultat affiché est calculé directement"""
+        gestionnaire = st.session_state.get('taches_synthese')
+        if gestionnaire is not None:
+            gestionnaire.cancel_current()
+    
+    @timed
+    def display_background_synthesis(self, gestionnaire, abondances, reglages_continuum):
+        """Progression de la tâche courante et dernier composite calculé, pondéré par les abondances courantes
+        
+        `reglages_continuum` (niveaux, fond) est appliqué sur la grille du résultat affiché.
+        """
+        courante = gestionnaire.courante
+        if courante.state in ('en_attente', 'en_cours'):
+            st.progress(courante.progression,
+                        text=f"Synthèse en cours... {courante.progression:.0%} ({time.monotonic() - courante.debut:.1f} s)")
+        elif courante.state == 'erreur':
+            st.error(f"Échec de la synthèse : {courante.future.exception()}")
+        elif st.session_state.get('interrogation_synthese'):
+            # Tâche terminée pendant l'interrogation : une réexécution complète redéclare le fragment sans interrogation
+            st.session_state['interrogation_synthese'] = False
+            st.rerun()
+        
+        terminee = gestionnaire.latest()
+        if terminee is None:
+            return
+        if terminee is not courante:
+            st.caption("Résultat précédent affiché pendant le calcul des nouveaux paramètres.")
+        poids = np.array([abondances.get(symbole, 1.0) for symbole in terminee.description['elements']])
+        grille = terminee.description['grille']
+        continuum = self.continuum_spectrum(grille, terminee.description['temperature'], *reglages_continuum,
+                                            grille_log=terminee.description['grille_log'])
+        plotly_chart(self.build_composite_figure(grille, poids @ terminee.result(), terminee.description['titre'],
+                                                 continuum),
+                     use_container_width=True, key="figure_synthese_arriere_plan")
+        st.caption(f"Calcul en tâche de fond : {terminee.duree_s:.2f} s")
+    
+    @timed
+    def display_plasma_decay(self, elements, poids, lambda_range, grille_log=False):
+        """Spectres résolus en temps d'un plasma qui se refroidit, formés à partir des bases interpolées en T
+        
+        La pile complète (instants × λ, float32) est mise dans le cache disque et
+        relue en projection mémoire : la session ne garde que sa clé et la carte
+        réduite, et le curseur de temps ne lit qu'une ligne.
+        """
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            temperature_initiale = st.slider("T initiale (K):", 2000, 10000, 10000, key='decroissance_t_initiale')
+            temperature_finale = st.slider("T finale (K):", 1000, 10000, 3000, key='decroissance_t_finale')
+        with col2:
+            constante_temperature = st.slider("Refroidissement τ_T (µs):", 0.1, 20.0, 2.0, key='decroissance_tau_t')
+            constante_densite = st.slider("Dilution τ_n (µs):", 0.1, 50.0, 5.0, key='decroissance_tau_n')
+        with col3:
+            duree = st.slider("Durée simulée (µs):", 1.0, 100.0, 20.0, key='decroissance_duree')
+            n_instants = st.select_slider("Instants:", [50, 100, 200, 500], value=200, key='decroissance_instants')
+        
+        temps = np.linspace(0.0, duree, n_instants)
+        temperatures, densites = plasma_decay(temps, temperature_initiale, temperature_finale,
+                                              constante_temperature, constante_densite)
+        cles_noeuds = [self.temperature_basis_keys(symbole, lambda_range, grille_log)[0] for symbole in elements]
+        cle = content_key(bases=cles_noeuds, poids=np.asarray(poids, dtype=float), temperatures=temperatures,
+                          densites=densites)
+        pile = CACHE_SPECTRES.get(cle)
+        if pile is None:
+            calculee = temperature_stack(cles_noeuds, poids, temperatures, densites)
+            if calculee is None:
+                st.info("Précalcul des bases en température en cours : la décroissance sera disponible ensuite.")
+                return
+            CACHE_SPECTRES.put(cle, calculee)
+            # Relue en projection mémoire ; gardée en mémoire seulement si elle dépasse la taille du cache
+            pile = CACHE_SPECTRES.get(cle)
+            pile = calculee if pile is None else pile
+        
+        memoire = st.session_state.get('carte_decroissance')
+        if memoire is None or memoire[0] != cle:
+            memoire = (cle, downsample_heatmap(pile, LIGNES_CARTE_DECROISSANCE, COLONNES_CARTE_DECROISSANCE))
+            st.session_state['carte_decroissance'] = memoire
+        
+        st.caption(f"{n_instants} spectres de {len(lambda_range):,} points ({pile.nbytes / 2 ** 20:.1f} Mio), "
+                   f"interpolés entre les bases précalculées.")
+        st.fragment(self.display_decay_frame)(lambda_range, temps, temperatures, pile, memoire[1])
+    
+    def display_decay_frame(self, lambda_range, temps, temperatures, pile, carte):
+        """Carte temps × λ réduite et spectre pleine résolution de l'instant choisi (fragment)"""
+        instant = st.select_slider("Instant (µs):", options=range(len(temps)),
+                                   format_func=lambda i: f"{temps[i]:.2f}", key='decroissance_instant')
+        reduite, debuts_lignes, debuts_colonnes = carte
+        fig = go.Figure(go.Heatmap(z=reduite, x=lambda_range[debuts_colonnes], y=temps[debuts_lignes],
+                                   colorscale='Inferno', colorbar=dict(title="Intensité")))
+        fig.add_hline(y=temps[instant], line=dict(color='white', dash='dash'))
+        fig.update_layout(title="Décroissance du plasma (maximum par bloc)",
+                          xaxis=dict(title="Longueur d'onde (nm)"), yaxis=dict(title="Temps (µs)"), height=400)
+        plotly_chart(fig, use_container_width=True)
+        
+        plotly_chart(self.build_composite_figure(
+            lambda_range, pile[instant], f"t = {temps[instant]:.2f} µs - T = {temperatures[instant]:.0f} K"),
+            use_container_width=True)
+    
+    @timed
+    def display_hyperspectral_cube(self, elements, abondances, lambda_range, grille_log=False):
+        """Cube (y, x, λ) d'une carte de conditions du plasma, généré en tâche de fond puis lu sur disque"""
+        col1, col2 = st.columns(2)
+        with col1:
+            cote = st.select_slider("Pixels par côté:", [32, 64, 128, 256], value=64, key='cube_cote')
+            fichier_carte = st.file_uploader("Carte (.npz : temperature (ny, nx), abondances (ny, nx, éléments)):",
+                                             type=['npz'], key='cube_carte')
+        with col2:
+            temperature_centre = st.slider("T au centre (K):", 1000, 10000, 9000, key='cube_t_centre')
+            temperature_bord = st.slider("T au bord (K):", 1000, 10000, 3000, key='cube_t_bord')
+        
+        if fichier_carte is not None:
+            try:
+                carte = np.load(fichier_carte)
+                temperatures, cartes_abondances = carte['temperature'], carte['abondances']
+            except (ValueError, KeyError, OSError) as erreur:
+                st.error(f"Carte illisible ({erreur}) : fichier .npz avec les tableaux temperature et abondances "
+                         f"attendu.")
+                return
+            if temperatures.ndim != 2 or cartes_abondances.shape != temperatures.shape + (len(elements),):
+                st.error(f"Cartes attendues : temperature (ny, nx) et abondances (ny, nx, {len(elements)}) "
+                         f"dans l'ordre {', '.join(elements)}.")
+                return
+        else:
+            temperatures, cartes_abondances = hot_spot_map(cote, cote, temperature_centre, temperature_bord,
+                                                           [abondances[symbole] for symbole in elements])
+        
+        cles_noeuds = [self.temperature_basis_keys(symbole, lambda_range, grille_log)[0] for symbole in elements]
+        dossier = os.path.join(DOSSIER_CUBES, content_key(bases=cles_noeuds, temperatures=temperatures,
+                                                          abondances=cartes_abondances))
+        taille_octets = temperatures.size * len(lambda_range) * 4
+        st.caption(f"Cube {temperatures.shape[0]} × {temperatures.shape[1]} × {len(lambda_range):,} (float32) : "
+                   f"{taille_octets / 2 ** 30:.2f} Gio sur disque")
+        
+        gestionnaire = st.session_state.setdefault('taches_cube', SynthesisJobManager())
+        if not os.path.exists(os.path.join(dossier, 'cube.npy')):
+            if taille_octets > TAILLE_MAX_CUBE_UNIQUE_OCTETS:
+                st.warning(f"Cube au-delà de {TAILLE_MAX_CUBE_UNIQUE_OCTETS / 2 ** 30:.0f} Gio : "
+                           f"réduire la carte ou la grille.")
+                return
+            if not all(cle in CACHE_SPECTRES for cles in cles_noeuds for cle in cles):
+                st.info("Précalcul des bases en température en cours : la génération sera disponible ensuite.")
+                return
+            if st.button("🛰️ Générer le cube", key='cube_generer'):
+                gestionnaire.submit(dossier, build_cube, dossier, lambda_range, temperatures, cartes_abondances,
+                                    cles_noeuds)
+        
+        st.session_state['interrogation_cube'] = gestionnaire.is_busy()
+        st.fragment(run_every=0.5 if st.session_state['interrogation_cube'] else None)(
+            self.display_cube_viewer)(gestionnaire, dossier)
+    
+    def display_cube_viewer(self, gestionnaire, dossier):
+        """Progression de la génération puis image de bande et spectre d'un pixel, lus sans charger le cube"""
+        courante = gestionnaire.courante
+        if courante is not None and courante.cle == dossier:
+            if courante.state in ('en_attente', 'en_cours'):
+                st.progress(courante.progression, text=f"Génération du cube... {courante.progression:.0%} "
+                                                       f"({time.monotonic() - courante.debut:.1f} s)")
+                return
+            if courante.state == 'erreur':
+                st.error(f"Échec de la génération : {courante.future.exception()}")
+                return
+        if st.session_state.get('interrogation_cube'):
+            # Génération terminée pendant l'interrogation : réexécution complète sans interrogation
+            st.session_state['interrogation_cube'] = False
+            st.rerun()
+        if not os.path.exists(os.path.join(dossier, 'cube.npy')):
+            return
+        
+        cube = HyperspectralCube(dossier)
+        ny, nx, _ = cube.shape
+        lambda_min, lambda_max = float(cube.longueurs_onde[0]), float(cube.longueurs_onde[-1])
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            bande = st.slider("Bande (nm):", lambda_min, lambda_max,
+                              (max(lambda_min, 588.0), min(lambda_max, 591.0)), key='cube_bande')
+        with col2:
+            y = st.slider("Pixel y:", 0, ny - 1, ny // 2, key='cube_y')
+        with col3:
+            x = st.slider("Pixel x:", 0, nx - 1, nx // 2, key='cube_x')
+        
+        debut = time.perf_counter()
+        image = cube.band_image(*bande)
+        spectre = cube.pixel(y, x)
+        duree_ms = (time.perf_counter() - debut) * 1e3
+        
+        fig = go.Figure(go.Heatmap(z=image, colorscale='Viridis', colorbar=dict(title="Intensité")))
+        fig.add_trace(go.Scatter(x=[x], y=[y], mode='markers', marker=dict(color='red', size=10, symbol='x'),
+                                 name='Pixel'))
+        fig.update_layout(title=f"Image de bande {bande[0]:.2f}–{bande[1]:.2f} nm",
+                          xaxis=dict(title="x"), yaxis=dict(title="y", scaleanchor='x'), height=450)
+        plotly_chart(fig, use_container_width=True)
+        plotly_chart(self.build_composite_figure(cube.longueurs_onde, spectre,
+                                                 f"Pixel ({y}, {x}) - T = {cube.temperatures[y, x]:.0f} K"),
+                     use_container_width=True)
+        st.caption(f"Lecture de la bande et du pixel : {duree_ms:.1f} ms (cube projeté en mémoire).")
+    
+    @timed
+    def display_detection_limits(self, elements, poids, bases, continuum, lambda_range, temperature,
+                                 pouvoir_resolution):
+        """Probabilité de détection des raies choisies en fonction de l'abondance, par Monte Carlo du détecteur
+        
+        Pour la raie d'un élément, le signal est la base de l'élément à abondance
+        unité et le fond le reste du composite (autres éléments et continuum), le
+        tout restreint à une fenêtre autour de la raie.
+        """
+        raies = pd.concat([self.element_lines(symbole)[0] for symbole in elements], ignore_index=True)
+        raies = raies[(raies['longueur_onde'] > lambda_range[0]) & (raies['longueur_onde'] < lambda_range[-1])]
+        if raies.empty:
+            st.info("Aucune raie des éléments simulés dans la grille.")
+            return
+        etiquettes = {f"{ligne.element} {ligne.longueur_onde:.2f} nm": i for i, ligne in raies.iterrows()}
+        plus_intenses = raies.loc[raies.groupby('element')['intensite'].idxmax()]
+        choisies = st.multiselect("Raies analysées:", list(etiquettes),
+                                  default=[f"{ligne.element} {ligne.longueur_onde:.2f} nm"
+                                           for ligne in plus_intenses.itertuples()],
+                                  key='detection_raies')
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            flux = st.number_input("Flux (e⁻/s par unité d'intensité):", 1.0, 1e7, DETECTEUR_DEFAUT.flux_e_s,
+                                   key='detection_flux')
+            temps_pose = st.number_input("Temps de pose (s):", 0.001, 100.0, DETECTEUR_DEFAUT.temps_pose_s,
+                                         key='detection_pose')
+        with col2:
+            courant_obscurite = st.number_input("Courant d'obscurité (e⁻/s/pixel):", 0.0, 1e5,
+                                                DETECTEUR_DEFAUT.courant_obscurite_e_s, key='detection_obscurite')
+            bruit_lecture = st.number_input("Bruit de lecture (e⁻):", 0.0, 1000.0, DETECTEUR_DEFAUT.bruit_lecture_e,
+                                            key='detection_lecture')
+        with col3:
+            gain = st.number_input("Gain (e⁻/ADU):", 0.01, 100.0, DETECTEUR_DEFAUT.gain_e_adu, key='detection_gain')
+            n_realisations = st.select_slider("Réalisations:", [1000, 5000, 20000], value=5000,
+                                              key='detection_realisations')
+        detecteur = Detecteur(flux, temps_pose, courant_obscurite, bruit_lecture, gain)
+        concentrations = np.logspace(-4, 1, 26)
+        if not st.toggle("Calculer les courbes de détection", value=False, key='detection_actif'):
+            return
+        
+        composite = poids @ bases + (0.0 if continuum is None else continuum)
+        pas = np.median(np.diff(lambda_range))
+        memoire, courbes = st.session_state.get('courbes_detection', {}), {}
+        fig = go.Figure()
+        resultats = []
+        debut = time.perf_counter()
+        for etiquette in choisies:
+            raie = raies.loc[etiquettes[etiquette]]
+            e = elements.index(raie['element'])
+            demi_largeur = max(3 * raie['largeur'] * doppler_scale(temperature),
+                               1.5 * raie['longueur_onde'] / pouvoir_resolution, 2.5 * pas)
+            fenetre = np.abs(lambda_range - raie['longueur_onde']) <= demi_largeur
+            signal = bases[e, fenetre]
+            fond = composite[fenetre] - poids[e] * signal
+            # Courbes gardées en session : seules les raies dont le signal, le fond ou le détecteur changent sont tirées
+            cle = content_key(signal=signal, fond=fond, detecteur=list(detecteur), realisations=n_realisations)
+            if cle not in memoire:
+                memoire[cle] = detection_probability(signal, fond, concentrations, n_realisations, detecteur,
+                                                     generateur=np.random.default_rng(0))[0]
+            courbes[cle] = probabilites = memoire[cle]
+            limite = detection_limit(concentrations, probabilites)
+            fig.add_trace(go.Scatter(x=concentrations, y=probabilites, mode='lines+markers', name=etiquette))
+            resultats.append({'Raie': etiquette, 'Pixels': int(fenetre.sum()),
+                              'Limite de détection (abondance)': limite,
+                              'Abondance simulée': poids[e],
+                              "Détectée à l'abondance simulée": bool(poids[e] >= limite)})
+        duree = time.perf_counter() - debut
+        st.session_state['courbes_detection'] = courbes
+        
+        if not resultats:
+            return
+        fig.add_hline(y=PROBABILITE_LIMITE, line=dict(color='gray', dash='dash'))
+        fig.update_layout(title=f"Probabilité de détection (fausses alarmes : {TAUX_FAUSSE_ALARME:.0%})",
+                          xaxis=dict(title="Abondance relative", type='log'),
+                          yaxis=dict(title="Probabilité de détection", range=[0, 1.02]), height=400)
+        plotly_chart(fig, use_container_width=True)
+        st.dataframe(pd.DataFrame(resultats), use_container_width=True)
+        st.caption(f"{n_realisations:,} réalisations × {len(concentrations)} abondances × {len(resultats)} raies "
+                   f"en {duree:.2f} s.")
+    
+    @timed
+    def display_line_blends(self, elements, abondances, temperature, pouvoir_resolution):
+        """Raies non résolues entre les éléments simulés et meilleure raie analytique de chaque élément"""
+        raies = pd.concat([self.element_lines(symbole)[0] for symbole in elements], ignore_index=True)
+        melanges = find_blends(raies, pouvoir_resolution, temperature)
+        interferences = melanges[melanges['interference']]
+        meilleures = best_analytical_lines(raies, melanges, abondances)
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Raies examinées", f"{len(raies):,}")
+        with col2:
+            st.metric("Paires non résolues", f"{len(melanges):,}")
+        with col3:
+            st.metric("Interférences entre éléments", f"{len(interferences):,}")
+        
+        st.markdown(f"**Meilleure raie analytique par élément (R = {pouvoir_resolution:,})**")
+        st.dataframe(meilleures.rename(columns={
+            'element': 'Élément', 'longueur_onde': 'λ (nm)', 'intensite': 'Intensité',
+            'interferences': 'Interférences', 'purete': 'Pureté', 'libre': 'Sans interférence'
+        }), use_container_width=True)
+        if interferences.empty:
+            st.success("Aucune raie d'un élément n'est confondue avec celle d'un autre à cette résolution.")
+        else:
+            st.markdown("**Interférences entre éléments**")
+            st.dataframe(interferences[['element_a', 'longueur_onde_a', 'element_b', 'longueur_onde_b', 'ecart_nm',
+                                        'resolution_requise']].rename(columns={
+                'element_a': 'Élément A', 'longueur_onde_a': 'λ A (nm)', 'element_b': 'Élément B',
+                'longueur_onde_b': 'λ B (nm)', 'ecart_nm': 'Écart (nm)', 'resolution_requise': 'R requis'
+            }), use_container_width=True)
+    
+    @timed
     def create_advanced_analysis_tools(self):
         """Crée des outils d'analyse avancée"""
         st.markdown('<h3 class="section-header">🔧 OUTILS D\'ANALYSE AVANCÉE</h3>', 
                    unsafe_allow_html=True)
         
-        tab1, tab2, tab3 = st.tabs(["Simulateur de Spectres", "Base de Données", "Recherche Avancée"])
+        tab1, tab2, tab3, tab4, tab5 = st.tabs(["Simulateur de Spectres", "Base de Données", "Recherche Avancée",
+                                                "Identification de Raies", "Ajustement Inverse"])
         
-        with tab1:
+        with tab1, section("Simulateur de Spectres"):
             st.subheader("Simulateur de Spectres Atomiques")
             
             col1, col2 = st.columns(2)
@@ -665,6 +1427,57 @@ class CompleteAtomicSpectraDashboard:
                     [e['symbole'] for e in self.elements_data],
                     default=['H', 'Na', 'Hg']
                 )
+                # Abondances relatives : appliquées aux spectres de base, sans nouvelle synthèse
+                abondances = {}
+                if elements_simulation:
+                    with st.expander("⚖️ Abondances relatives", expanded=True):
+                        colonnes = st.columns(min(len(elements_simulation), 4))
+                        for i, symbole in enumerate(elements_simulation):
+                            with colonnes[i % len(colonnes)]:
+                                abondances[symbole] = st.slider(symbole, 0.0, 2.0, 1.0, 0.05,
+                                                                key=f"abondance_{symbole}")
+                
+                # Continuum (niveaux relatifs aux raies à la température de référence) et fond mesuré
+                with st.expander("🌡️ Continuum et fond", expanded=False):
+                    niveaux_continuum = {
+                        'corps_noir': st.slider(f"Corps noir (niveau à {TEMPERATURE_REFERENCE:.0f} K):",
+                                                0.0, 1.0, 0.02, 0.01, key='continuum_corps_noir'),
+                        'bremsstrahlung': st.slider("Bremsstrahlung:", 0.0, 1.0, 0.02, 0.01,
+                                                    key='continuum_bremsstrahlung')
+                    }
+                    fond = None
+                    fichier_fond = st.file_uploader("Fond mesuré (CSV : longueur d'onde en nm, intensité):",
+                                                    type=['csv', 'txt'], key='fichier_fond')
+                    if fichier_fond is not None:
+                        try:
+                            fond = (*load_measured_spectrum(fichier_fond),
+                                    st.slider("Niveau du fond mesuré:", 0.0, 1.0, 0.1, 0.01, key='niveau_fond'))
+                        except ValueError as erreur:
+                            st.error(str(erreur))
+                    reglages_continuum = (niveaux_continuum, fond)
+                
+                # Profil instrumental : une gaussienne par raie ou convolution unique par FFT
+                profil_instrument = st.selectbox("Profil instrumental:",
+                                                 ["Gaussien par raie", "Gaussien (FFT)", "Sinc (FFT)", "Mesuré (FFT)"])
+                grille_log = st.checkbox("Grille log-λ (pouvoir de résolution constant)", value=False)
+                if not grille_log:
+                    points_simulation = st.select_slider("Points de grille:", [2000, 20000, 200000, 1000000], value=2000)
+                mode_transfert = st.radio("Transfert radiatif:", MODES_TRANSFERT, horizontal=True)
+                if mode_transfert != "Optiquement mince":
+                    log_colonne = st.slider("log₁₀ densité de colonne (cm⁻²):", 10.0, 18.0, 13.0, 0.1)
+                noyau_mesure = None
+                if profil_instrument == "Mesuré (FFT)":
+                    fichier_noyau = st.file_uploader("Profil instrumental mesuré (CSV : décalage en nm, réponse):",
+                                                     type=['csv', 'txt'], key='fichier_noyau')
+                    if fichier_noyau is not None:
+                        try:
+                            noyau_mesure = load_measured_spectrum(fichier_noyau)
+                        except ValueError as erreur:
+                            st.error(f"{erreur} : profil triangulaire asymétrique de démonstration utilisé.")
+                    else:
+                        st.info("Aucun profil fourni : profil triangulaire asymétrique de démonstration.")
+                    if noyau_mesure is None:
+                        noyau_mesure = NOYAU_MESURE_DEMONSTRATION
             
             with col2:
                 # Effets physiques
@@ -683,38 +1496,107 @@ class CompleteAtomicSpectraDashboard:
                 </div>
                 """, unsafe_allow_html=True)
             
-            # Simulation du spectre composite
-            if elements_simulation:
-                lambda_range = np.linspace(200, 800, 2000)
-                spectre_composite = np.zeros_like(lambda_range)
+            # Simulation du spectre composite (couche optiquement mince)
+            if elements_simulation and mode_transfert == "Optiquement mince":
+                pouvoir_resolution = POUVOIRS_RESOLUTION[resolution]
+                lambda_range = (log_lambda_grid(200.0, 800.0, pouvoir_resolution) if grille_log
+                                else wavelength_grid(200.0, 800.0, points_simulation))
+                titre = f"Spectre composite simulé - T={temperature}K - {profil_instrument}, R = {pouvoir_resolution}"
                 
-                for element_symb in elements_simulation:
-                    raies_element = self.spectral_lines[self.spectral_lines['element'] == element_symb]
+                # Un spectre de base par élément, en cache disque ; le mélange n'est qu'un produit matrice-vecteur
+                cles_bases = [self.basis_key(symbole, profil_instrument, temperature, pouvoir_resolution, lambda_range,
+                                             grille_log, noyau_mesure) for symbole in elements_simulation]
+                arguments = (cles_bases, elements_simulation, lambda_range, temperature, profil_instrument,
+                             pouvoir_resolution, noyau_mesure, grille_log)
+                raies_manquantes = sum(len(self.element_lines(symbole)[0])
+                                       for symbole, cle in zip(elements_simulation, cles_bases)
+                                       if cle not in CACHE_SPECTRES)
+                poids = np.array([abondances[symbole] for symbole in elements_simulation])
+                continuum = self.continuum_spectrum(lambda_range, temperature, *reglages_continuum,
+                                                    grille_log=grille_log)
+                
+                # Profil par raie : bases interpolées en température une fois le précalcul de fond terminé
+                bases_interpolees = None
+                bases_temperature = (profil_instrument == "Gaussien par raie" and
+                                     self.temperature_bases_fit(elements_simulation, lambda_range))
+                if bases_temperature:
+                    bases_interpolees, erreur_estimee = self.interpolated_bases(elements_simulation, lambda_range,
+                                                                                temperature, grille_log)
+                    if bases_interpolees is None:
+                        st.caption("Précalcul des bases en température en cours : synthèse exacte en attendant.")
+                elif profil_instrument == "Gaussien par raie":
+                    st.caption("Grille trop grande pour garder les bases en température de tous les éléments en "
+                               "cache disque : synthèse exacte.")
+                
+                bases_composite = bases_interpolees
+                if bases_interpolees is not None:
+                    self.cancel_background_synthesis()
+                    plotly_chart(self.build_composite_figure(lambda_range, poids @ bases_interpolees, titre, continuum),
+                                 use_container_width=True)
+                    st.caption(f"Bases interpolées en ln T entre {len(TEMPERATURES_BASES)} températures précalculées : "
+                               f"écart estimé à la synthèse exacte ≈ {erreur_estimee:.3%} du maximum "
+                               f"(mesuré au milieu de chaque intervalle).")
+                elif raies_manquantes * len(lambda_range) < SEUIL_CALCUL_ARRIERE_PLAN:
+                    self.cancel_background_synthesis()
+                    bases_composite = self.synthesize_bases(*arguments)
+                    spectre_composite = poids @ bases_composite
+                    plotly_chart(self.build_composite_figure(lambda_range, spectre_composite, titre, continuum),
+                                 use_container_width=True)
+                else:
+                    # Calcul long : soumis au travailleur de la session, la tâche périmée est annulée
+                    gestionnaire = st.session_state.setdefault('taches_synthese', SynthesisJobManager())
+                    gestionnaire.submit(content_key(bases=cles_bases), self.synthesize_bases, *arguments,
+                                        description={'grille': lambda_range, 'titre': titre,
+                                                     'elements': list(elements_simulation),
+                                                     'temperature': temperature, 'grille_log': grille_log})
                     
-                    for _, raie in raies_element.iterrows():
-                        if 200 <= raie['longueur_onde'] <= 800:
-                            # Effet de température sur la largeur
-                            largeur_doppler = raie['largeur'] * np.sqrt(temperature / 300)
-                            spectre_raie = raie['intensite'] * np.exp(-0.5 * ((lambda_range - raie['longueur_onde']) / largeur_doppler)**2)
-                            spectre_composite += spectre_raie
+                    # Seul le graphique est rafraîchi pendant le calcul
+                    st.session_state['interrogation_synthese'] = gestionnaire.is_busy()
+                    st.fragment(run_every=0.25 if st.session_state['interrogation_synthese'] else None)(
+                        self.display_background_synthesis)(gestionnaire, abondances, reglages_continuum)
                 
-                fig = go.Figure()
-                fig.add_trace(go.Scatter(
-                    x=lambda_range, y=spectre_composite,
-                    mode='lines',
-                    line=dict(color='#FF6B6B', width=2),
-                    name='Spectre composite'
-                ))
+                # Spectres résolus en temps et cubes hyperspectraux : mêmes bases interpolées en température
+                if bases_temperature:
+                    with st.expander("⏱️ Décroissance temporelle du plasma", expanded=False):
+                        self.display_plasma_decay(elements_simulation, poids, lambda_range, grille_log)
+                    with st.expander("🛰️ Cube hyperspectral", expanded=False):
+                        self.display_hyperspectral_cube(elements_simulation, abondances, lambda_range, grille_log)
                 
-                fig.update_layout(
-                    title=f"Spectre composite simulé - T={temperature}K",
-                    xaxis=dict(title="Longueur d'onde (nm)"),
-                    yaxis=dict(title="Intensité relative"),
-                    height=400
-                )
-                st.plotly_chart(fig, use_container_width=True)
+                # Limites de détection : bruit du détecteur appliqué aux bases du composite affiché
+                if bases_composite is not None:
+                    with st.expander("🎲 Limites de détection (bruit du détecteur)", expanded=False):
+                        self.display_detection_limits(elements_simulation, poids, bases_composite, continuum,
+                                                      lambda_range, temperature, pouvoir_resolution)
         
-        with tab2:
+            elif elements_simulation:
+                pouvoir_resolution = POUVOIRS_RESOLUTION[resolution]
+                lambda_range = (log_lambda_grid(200.0, 800.0, pouvoir_resolution) if grille_log
+                                else wavelength_grid(200.0, 800.0, points_simulation))
+                titre = f"Spectre simulé - T={temperature}K - {profil_instrument}, R = {pouvoir_resolution}"
+                poids = np.array([abondances[symbole] for symbole in elements_simulation])
+                # Couche épaisse : densités de colonne = densité totale × abondances relatives
+                spectre_couche, profondeur_max = self.slab_spectrum(
+                    elements_simulation, 10 ** log_colonne * poids, lambda_range, temperature, mode_transfert,
+                    profil_instrument, pouvoir_resolution, noyau_mesure, grille_log)
+                if mode_transfert == "Absorption (transmission)":
+                    fig = self.build_composite_figure(lambda_range, spectre_couche, f"{titre} - {mode_transfert}")
+                    fig.update_layout(yaxis=dict(title="Transmission"))
+                else:
+                    continuum = self.continuum_spectrum(lambda_range, temperature, *reglages_continuum,
+                                                        grille_log=grille_log)
+                    fig = self.build_composite_figure(lambda_range, spectre_couche, f"{titre} - {mode_transfert}",
+                                                      continuum)
+                plotly_chart(fig, use_container_width=True)
+                st.caption(f"Profondeur optique maximale τ = {profondeur_max:.3g}"
+                           + (" : raies saturées, auto-absorption marquée." if profondeur_max > 1 else "."))
+            
+            # Mélanges de raies entre éléments simulés à la résolution courante
+            if len(elements_simulation) > 1:
+                with st.expander("🧩 Raies mélangées et raies analytiques", expanded=False):
+                    self.display_line_blends(elements_simulation, abondances, temperature,
+                                             POUVOIRS_RESOLUTION[resolution])
+        
+        with tab2, section("Base de Données"):
             st.subheader("Base de Données des Raies Spectrales")
             
             # Filtres
@@ -748,7 +1630,7 @@ class CompleteAtomicSpectraDashboard:
                 use_container_width=True
             )
         
-        with tab3:
+        with tab3, section("Recherche Avancée"):
             st.subheader("Recherche Avancée par Caractéristiques")
             
             col1, col2 = st.columns(2)
@@ -763,11 +1645,7 @@ class CompleteAtomicSpectraDashboard:
                 energie_max = st.number_input("Énergie maximale (eV):", 0.0, 20.0, 5.0)
             
             # Recherche
-            raies_trouvees = self.spectral_lines[
-                (abs(self.spectral_lines['longueur_onde'] - longueur_onde_recherche) <= tolerance) &
-                (self.spectral_lines['energie_eV'] >= energie_min) &
-                (self.spectral_lines['energie_eV'] <= energie_max)
-            ]
+            raies_trouvees = self.search_lines(longueur_onde_recherche, tolerance, energie_min, energie_max)
             
             if not raies_trouvees.empty:
                 st.subheader(f"Raies trouvées ({len(raies_trouvees)} résultats)")
@@ -786,7 +1664,164 @@ class CompleteAtomicSpectraDashboard:
                     st.markdown("---")
             else:
                 st.info("Aucune raie ne correspond aux critères de recherche.")
+        
+        with tab4, section("Identification de Raies"):
+            st.subheader("Identification Automatique d'un Spectre Mesuré")
+            
+            col1, col2 = st.columns([1, 2])
+            
+            with col1:
+                fichier_spectre = st.file_uploader("Spectre mesuré (CSV : λ en nm, intensité):", type=['csv', 'txt'])
+                tolerance_identification = st.slider("Tolérance d'appariement (nm):", 0.05, 2.0, 0.3)
+                prominence_min = st.slider("Prominence minimale (fraction du maximum):", 0.005, 0.2, 0.05)
+                
+                if fichier_spectre is None:
+                    # Spectre de démonstration synthétisé à partir du catalogue
+                    elements_demo = st.multiselect(
+                        "Éléments du spectre de démonstration:",
+                        [e['symbole'] for e in self.elements_data],
+                        default=['H', 'Na', 'Hg']
+                    )
+                    raies_demo = self.spectral_lines[self.spectral_lines['element'].isin(elements_demo)]
+                    lambda_mesure = wavelength_grid(200.0, 900.0, 7000)
+                    intensite_mesuree = synthesize_lines(lambda_mesure, raies_demo['longueur_onde'],
+                                                         raies_demo['intensite'], raies_demo['largeur'])
+                    intensite_mesuree = intensite_mesuree + np.random.default_rng(0).normal(0, 0.003, len(lambda_mesure))
+                else:
+                    try:
+                        lambda_mesure, intensite_mesuree = load_measured_spectrum(fichier_spectre)
+                    except ValueError as erreur:
+                        st.error(str(erreur))
+                        lambda_mesure, intensite_mesuree = np.array([]), np.array([])
+            
+            # Détection des pics puis appariement en lot contre le catalogue
+            debut = time.perf_counter()
+            pics = detect_peaks(lambda_mesure, intensite_mesuree, prominence_min)
+            candidats, identifications = identify_peaks(pics, self.spectral_lines, tolerance_identification)
+            duree_ms = (time.perf_counter() - debut) * 1000
+            
+            with col1:
+                st.metric("Pics détectés", len(pics))
+                st.metric("Pics identifiés", int(identifications['element'].notna().sum()) if len(pics) else 0)
+                st.metric("Temps d'identification", f"{duree_ms:.1f} ms")
+            
+            with col2:
+                fig = go.Figure()
+                fig.add_trace(go.Scatter(
+                    x=lambda_mesure, y=intensite_mesuree,
+                    mode='lines',
+                    line=dict(color='#2575FC', width=1),
+                    name='Spectre mesuré'
+                ))
+                if len(pics):
+                    fig.add_trace(go.Scatter(
+                        x=identifications['longueur_onde'], y=identifications['intensite'],
+                        mode='markers+text',
+                        marker=dict(color='#FF6B35', size=8),
+                        text=identifications['element'].fillna('?'),
+                        textposition='top center',
+                        name='Pics identifiés'
+                    ))
+                fig.update_layout(
+                    title="Spectre mesuré et identifications",
+                    xaxis=dict(title="Longueur d'onde (nm)"),
+                    yaxis=dict(title="Intensité"),
+                    height=450
+                )
+                plotly_chart(fig, use_container_width=True)
+            
+            if len(pics):
+                col1, col2 = st.columns([2, 1])
+                with col1:
+                    st.dataframe(identifications.round(4), use_container_width=True)
+                with col2:
+                    elements_trouves = identifications.dropna(subset=['element']).groupby('element').agg(
+                        pics=('score', 'size'), score_moyen=('score', 'mean')
+                    ).sort_values('pics', ascending=False)
+                    st.dataframe(elements_trouves.round(3), use_container_width=True)
+        
+        with tab5, section("Ajustement Inverse"):
+            st.subheader("Ajustement de la Température et de la Composition")
+            
+            col1, col2 = st.columns([1, 2])
+            
+            with col1:
+                fichier_ajustement = st.file_uploader("Spectre mesuré (CSV : λ en nm, intensité):",
+                                                      type=['csv', 'txt'], key='fichier_ajustement')
+                elements_ajustement = st.multiselect(
+                    "Éléments à ajuster:",
+                    [e['symbole'] for e in self.elements_data],
+                    default=['H', 'Na', 'Hg'],
+                    key='elements_ajustement'
+                )
+                temperature_initiale = st.slider("Température initiale (K):", 1000, 10000, 5000, key='temperature_initiale')
+                
+                if fichier_ajustement is None:
+                    # Acquisition de démonstration : modèle direct avec paramètres connus et bruit
+                    st.markdown("**Acquisition de démonstration**")
+                    temperature_vraie = st.slider("Température vraie (K):", 1000, 10000, 7200)
+                    elargissement_vrai = st.slider("Élargissement vrai:", 0.5, 3.0, 1.3)
+                    lambda_ajustement = wavelength_grid(200.0, 800.0, 2000)
+                    raies_vraies = self.spectral_lines[self.spectral_lines['element'].isin(elements_ajustement)]
+                    abondances_vraies = np.random.default_rng(1).uniform(0.2, 1.5, len(elements_ajustement))
+                    intensites_vraies = (raies_vraies['intensite'] *
+                                         boltzmann_factors(raies_vraies['energie_eV'], temperature_vraie) *
+                                         raies_vraies['element'].map(dict(zip(elements_ajustement, abondances_vraies))))
+                    intensite_ajustement = synthesize_lines(
+                        lambda_ajustement, raies_vraies['longueur_onde'], intensites_vraies,
+                        raies_vraies['largeur'] * elargissement_vrai * doppler_scale(temperature_vraie)
+                    ) + 0.02 + np.random.default_rng(2).normal(0, 0.01, len(lambda_ajustement))
+                else:
+                    try:
+                        lambda_ajustement, intensite_ajustement = load_measured_spectrum(fichier_ajustement)
+                    except ValueError as erreur:
+                        st.error(str(erreur))
+                        lambda_ajustement, intensite_ajustement = np.array([]), np.array([])
+            
+            if elements_ajustement and len(lambda_ajustement):
+                resultat = fit_spectrum(lambda_ajustement, intensite_ajustement, self.spectral_lines,
+                                        elements_ajustement, temperature_initiale)
+                
+                with col1:
+                    st.metric("Température ajustée", f"{resultat['temperature']:.0f} ± {resultat['incertitudes']['temperature']:.0f} K")
+                    st.metric("Élargissement ajusté", f"{resultat['elargissement']:.3f}")
+                    st.metric("Temps d'ajustement", f"{resultat['duree_s'] * 1000:.0f} ms")
+                    st.metric("Itérations (modèle / jacobien)", f"{resultat['evaluations']} / {resultat['evaluations_jacobien']}")
+                
+                with col2:
+                    fig = go.Figure()
+                    fig.add_trace(go.Scatter(
+                        x=lambda_ajustement, y=intensite_ajustement,
+                        mode='lines',
+                        line=dict(color='#2575FC', width=1),
+                        name='Mesure'
+                    ))
+                    fig.add_trace(go.Scatter(
+                        x=lambda_ajustement, y=resultat['modele'],
+                        mode='lines',
+                        line=dict(color='#FF6B35', width=2, dash='dash'),
+                        name='Modèle ajusté'
+                    ))
+                    fig.update_layout(
+                        title=f"Ajustement - T = {resultat['temperature']:.0f} K, résidu RMS = {resultat['residu_rms']:.4f}",
+                        xaxis=dict(title="Longueur d'onde (nm)"),
+                        yaxis=dict(title="Intensité"),
+                        height=450
+                    )
+                    plotly_chart(fig, use_container_width=True)
+                    
+                    st.dataframe(pd.DataFrame({
+                        'element': elements_ajustement,
+                        'abondance': [resultat['abondances'][e] for e in elements_ajustement],
+                        'incertitude': [resultat['incertitudes'][e] for e in elements_ajustement]
+                    }).round(4), use_container_width=True)
+                    
+                    if not resultat['succes']:
+                        st.warning(f"L'ajustement n'a pas convergé : {resultat['message']}")
+            else:
+                st.info("Sélectionnez au moins un élément et fournissez un spectre.")
     
+    @timed
     def create_sidebar(self):
         """Crée la sidebar avec les contrôles"""
         st.sidebar.markdown("## 🎛️ CONTRÔLES D'ANALYSE")
@@ -808,6 +1843,7 @@ class CompleteAtomicSpectraDashboard:
         st.sidebar.markdown("### ⚙️ Options")
         show_details = st.sidebar.checkbox("Afficher les détails techniques", value=True)
         auto_scale = st.sidebar.checkbox("Échelle automatique des spectres", value=True)
+        st.sidebar.checkbox("⏱️ Panneau de performance", value=False, key='panneau_performance')
         
         return {
             'section': section,
@@ -819,20 +1855,30 @@ class CompleteAtomicSpectraDashboard:
     
     def run_dashboard(self):
         """Exécute le dashboard complet"""
-        # Sidebar
-        controls = self.create_sidebar()
-        
-        # Header
-        self.display_header()
+        # Instrumentation de la réexécution seulement si le panneau de performance est affiché
+        enregistreur = PerformanceRecorder() if st.session_state.get('panneau_performance') else None
+        self.warm_up_temperature_bases()
+        with enregistreur.activate() if enregistreur is not None else nullcontext():
+            # Sidebar
+            controls = self.create_sidebar()
+            
+            # Header
+            self.display_header()
+            
+            # Navigation principale
+            if controls['section'] == "Tableau Périodique":
+                self.create_periodic_table_overview()
+                self.create_spectral_library()
+            elif controls['section'] == "Bibliothèque Spectrale":
+                self.create_spectral_library()
+            elif controls['section'] == "Outils Avancés":
+                self.create_advanced_analysis_tools()
         
-        # Navigation principale
-        if controls['section'] == "Tableau Périodique":
-            self.create_periodic_table_overview()
-            self.create_spectral_library()
-        elif controls['section'] == "Bibliothèque Spectrale":
-            self.create_spectral_library()
-        elif controls['section'] == "Outils Avancés":
-            self.create_advanced_analysis_tools()
+        if enregistreur is not None:
+            historique = st.session_state.setdefault('historique_performance', [])
+            historique.append(enregistreur.to_record())
+            del historique[:-TAILLE_HISTORIQUE_PERFORMANCE]
+            display_performance_panel(st.sidebar.container(), enregistreur, historique)
         
         # Footer
         st.markdown("---")
@@ -0,0 +1,202 @@
+"""Suite de performance : modèle de données, synthèse, recherche et figures
+
+Exécution sans interface (Streamlit en mode nu, son avertissement au lancement
+est sans conséquence), résultats enregistrés en JSON
+et comparaison avec une exécution de référence :
+
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --rapide --sortie apres.json --comparer avant.json
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RACINE)
+
+from Dashboard import AtomicSpectraDashboard  # noqa: E402
+from DashboardPro import CompleteAtomicSpectraDashboard  # noqa: E402
+from spectral_analysis import best_analytical_lines, build_wavelength_index, find_blends  # noqa: E402
+from spectral_synthesis import convolve_instrument, synthesize_lines, synthesize_window, wavelength_grid  # noqa: E402
+
+DOSSIER_RESULTATS = os.path.join(RACINE, 'benchmarks', 'results')
+
+# Tailles étudiées : (raies, points de grille) pour la synthèse raie par raie,
+# raies pour la convolution FFT, taille des catalogues synthétiques
+TAILLES_SYNTHESE = [(100, 2000), (1000, 2000), (10000, 2000), (1000, 20000), (10000, 20000), (1000, 200000)]
+TAILLES_CONVOLUTION = [10 ** 4, 10 ** 5, 10 ** 6]
+TAILLES_CATALOGUE = [10 ** 4, 10 ** 5, 10 ** 6]
+TAILLES_FIGURE = [2000, 20000, 200000]
+
+# Écart relatif au-delà duquel une différence entre deux exécutions est signalée
+# (sur la durée minimale et sur la médiane, pour ne pas signaler le bruit de mesure)
+SEUIL_SIGNIFICATIF = 0.10
+
+
+def measure(fonction, repetitions=5):
+    """Durées minimale et médiane (s) de `fonction()` sur plusieurs répétitions, et son dernier résultat"""
+    durees = []
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        resultat = fonction()
+        durees.append(time.perf_counter() - debut)
+    return min(durees), float(np.median(durees)), resultat
+
+
+def synthetic_catalogue(n_raies, elements_data, graine=0):
+    """Catalogue synthétique au schéma de `define_complete_spectral_lines`"""
+    generateur = np.random.default_rng(graine)
+    indices = generateur.integers(0, len(elements_data), n_raies)
+    longueurs_onde = generateur.uniform(100.0, 1000.0, n_raies)
+    return pd.DataFrame({
+        'element': np.array([e['symbole'] for e in elements_data])[indices],
+        'nom': np.array([e['nom'] for e in elements_data])[indices],
+        'categorie': np.array([e['categorie'] for e in elements_data])[indices],
+        'longueur_onde': longueurs_onde,
+        'intensite': generateur.uniform(0.01, 1.0, n_raies),
+        'largeur': generateur.uniform(0.05, 0.15, n_raies),
+        'serie': 'Synthétique',
+        'transition': 'synthétique',
+        'energie_eV': 1239.84193 / longueurs_onde
+    })
+
+
+def run_suite(rapide=False):
+    """Exécute tous les cas et renvoie la liste des résultats"""
+    repetitions = 2 if rapide else 5
+    resultats = []
+
+    def record(cas, parametres, duree, mediane, **mesures):
+        resultats.append({'cas': cas, 'parametres': parametres, 'duree_s': duree, 'mediane_s': mediane, **mesures})
+        complement = ''.join(f"  {cle}={valeur:,}" for cle, valeur in mesures.items())
+        print(f"{cas:<32} {parametres:<28} {duree * 1e3:>11.3f} ms{complement}")
+
+    # Construction des tableaux de bord et de leurs catalogues
+    for classe in (AtomicSpectraDashboard, CompleteAtomicSpectraDashboard):
+        duree, mediane, _ = measure(classe, repetitions)
+        record('construction', classe.__name__, duree, mediane)
+    simple, complet = AtomicSpectraDashboard(), CompleteAtomicSpectraDashboard()
+    duree, mediane, raies = measure(simple.define_spectral_lines, repetitions)
+    record('define_spectral_lines', f"{len(raies)} raies", duree, mediane)
+    duree, mediane, raies = measure(complet.define_complete_spectral_lines, repetitions)
+    record('define_complete_spectral_lines', f"{len(raies)} raies", duree, mediane)
+
+    # Synthèse raie par raie et convolution unique par FFT
+    generateur = np.random.default_rng(1)
+    for n_raies, n_points in TAILLES_SYNTHESE:
+        if rapide and n_raies * n_points > 2e7:
+            continue
+        grille = wavelength_grid(200.0, 800.0, n_points)
+        centres = generateur.uniform(200.0, 800.0, n_raies)
+        duree, mediane, _ = measure(lambda: synthesize_lines(grille, centres, 1.0, 0.1), repetitions)
+        record('synthesize_lines', f"{n_raies} raies x {n_points} pts", duree, mediane)
+    grille = wavelength_grid(200.0, 800.0, 20000)
+    for n_raies in TAILLES_CONVOLUTION[:2] if rapide else TAILLES_CONVOLUTION:
+        centres = generateur.uniform(200.0, 800.0, n_raies)
+        duree, mediane, _ = measure(lambda: convolve_instrument(grille, centres, 1.0, 'gauss', largeur_nm=0.2),
+                                    repetitions)
+        record('convolve_instrument', f"{n_raies} raies x 20000 pts", duree, mediane)
+
+    # Filtre de la recherche avancée : catalogue fourni puis catalogues synthétiques
+    catalogues = [('fourni', complet.spectral_lines)]
+    catalogues += [(f"{n} raies", synthetic_catalogue(n, complet.elements_data))
+                   for n in (TAILLES_CATALOGUE[:2] if rapide else TAILLES_CATALOGUE)]
+    for nom, catalogue in catalogues:
+        duree, mediane, trouvees = measure(lambda: complet.search_lines(589.0, 1.0, 1.0, 5.0, catalogue), repetitions)
+        record('search_lines', nom, duree, mediane, lignes_parcourues=len(catalogue), resultats=len(trouvees))
+
+    # Resynthèse d'une fenêtre zoomée (doublet du sodium) : raies tirées de l'index trié
+    for nom, catalogue in catalogues:
+        index = build_wavelength_index(catalogue)
+        intensites, largeurs = catalogue['intensite'].to_numpy(), catalogue['largeur'].to_numpy()
+        duree, mediane, (_, _, retenues) = measure(
+            lambda: synthesize_window(588.5, 590.5, 2000, index, intensites, largeurs), repetitions)
+        record('synthesize_window', nom, duree, mediane, lignes_parcourues=len(retenues))
+
+    # Raies mélangées entre éléments (balayage trié) et meilleure raie analytique par élément ;
+    # au-delà de 10^5 raies synthétiques, les paires se comptent par centaines de millions
+    def blends_and_best_lines(catalogue):
+        melanges = find_blends(catalogue, 10000)
+        return melanges, best_analytical_lines(catalogue, melanges)
+
+    for nom, catalogue in catalogues:
+        if len(catalogue) > 10 ** 5:
+            continue
+        duree, mediane, (melanges, _) = measure(lambda: blends_and_best_lines(catalogue), repetitions)
+        record('find_blends', nom, duree, mediane, lignes_parcourues=len(catalogue), paires=len(melanges))
+
+    # Construction et sérialisation des figures
+    element_data = next(e for e in complet.elements_data if e['symbole'] == 'Na')
+    raies_na = complet.spectral_lines[complet.spectral_lines['element'] == 'Na']
+    for n_points in TAILLES_FIGURE[:2] if rapide else TAILLES_FIGURE:
+        grille = wavelength_grid(100.0, 800.0, n_points)
+        spectre = synthesize_lines(grille, raies_na['longueur_onde'], raies_na['intensite'], raies_na['largeur'])
+        duree, mediane, figure = measure(
+            lambda: complet.build_spectrum_figure(grille, spectre, element_data, raies_na.nlargest(5, 'intensite')),
+            repetitions)
+        record('build_spectrum_figure', f"{n_points} pts", duree, mediane)
+        duree, mediane, json_figure = measure(figure.to_json, repetitions)
+        record('figure.to_json', f"{n_points} pts", duree, mediane, octets=len(json_figure.encode()))
+    return resultats
+
+
+def compare(resultats, reference):
+    """Affiche le rapport nouvelle/ancienne durée pour chaque cas commun aux deux exécutions"""
+    anciens = {(r['cas'], r['parametres']): r for r in reference['resultats']}
+    print(f"\n{'cas':<32} {'paramètres':<28} {'référence':>12} {'actuel':>12} {'rapport':>8}")
+    for resultat in resultats:
+        ancien = anciens.get((resultat['cas'], resultat['parametres']))
+        if ancien is None:
+            continue
+        rapport = resultat['duree_s'] / ancien['duree_s'] if ancien['duree_s'] > 0 else float('nan')
+        rapport_median = resultat['mediane_s'] / ancien['mediane_s'] if ancien['mediane_s'] > 0 else float('nan')
+        verdict = ''
+        if max(rapport, rapport_median) < 1 - SEUIL_SIGNIFICATIF:
+            verdict = 'plus rapide'
+        elif min(rapport, rapport_median) > 1 + SEUIL_SIGNIFICATIF:
+            verdict = 'plus lent'
+        print(f"{resultat['cas']:<32} {resultat['parametres']:<28} {ancien['duree_s'] * 1e3:>9.3f} ms "
+              f"{resultat['duree_s'] * 1e3:>9.3f} ms {rapport:>8.2f}  {verdict}")
+
+
+def main():
+    analyseur = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    analyseur.add_argument('--rapide', action='store_true', help="tailles réduites et moins de répétitions")
+    analyseur.add_argument('--sortie', help="fichier JSON des résultats (défaut : benchmarks/results/<date>.json)")
+    analyseur.add_argument('--comparer', help="fichier JSON d'une exécution de référence")
+    arguments = analyseur.parse_args()
+
+    resultats = run_suite(arguments.rapide)
+    execution = {
+        'date': datetime.datetime.now().isoformat(timespec='seconds'),
+        'machine': platform.platform(),
+        'processeur': platform.processor() or platform.machine(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'rapide': arguments.rapide,
+        'resultats': resultats
+    }
+
+    sortie = arguments.sortie
+    if sortie is None:
+        os.makedirs(DOSSIER_RESULTATS, exist_ok=True)
+        sortie = os.path.join(DOSSIER_RESULTATS, f"{datetime.datetime.now():%Y%m%d-%H%M%S}.json")
+    with open(sortie, 'w', encoding='utf-8') as fichier:
+        json.dump(execution, fichier, ensure_ascii=False, indent=1)
+    print(f"\nRésultats enregistrés dans {sortie}")
+
+    if arguments.comparer:
+        with open(arguments.comparer, encoding='utf-8') as fichier:
+            compare(resultats, json.load(fichier))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,460 @@
+"""Analyse de spectres : pics, identification et mélanges de raies, ajustement et vitesses radiales"""
+import glob
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+from scipy import constants
+from scipy.fft import irfft, next_fast_len, rfft
+from scipy.optimize import least_squares, nnls
+from scipy.signal import find_peaks
+
+from spectral_profiling import count_rows, timed
+from spectral_synthesis import (CONSTANTE_BOLTZMANN_EV, FWHM_SUR_SIGMA, boltzmann_factors, doppler_scale,
+                                element_membership, line_profile_matrix)
+
+
+def load_measured_spectrum(fichier):
+    """Lit un spectre mesuré (CSV λ, intensité) et le renvoie trié par longueur d'onde"""
+    donnees = pd.read_csv(fichier, comment='#', sep=None, engine='python')
+    numeriques = donnees.apply(pd.to_numeric, errors='coerce').dropna(axis=1, how='all').dropna()
+    if numeriques.shape[1] < 2:
+        raise ValueError("Le fichier doit contenir deux colonnes numériques : longueur d'onde et intensité")
+    spectre = numeriques.iloc[:, :2].to_numpy(dtype=float)
+    spectre = spectre[np.argsort(spectre[:, 0], kind='stable')]
+    return spectre[:, 0], spectre[:, 1]
+
+
+def detect_peaks(longueurs_onde, intensites, prominence_relative=0.02, distance_nm=None):
+    """Détecte les pics d'un spectre et affine leur position par interpolation parabolique"""
+    longueurs_onde = np.asarray(longueurs_onde, dtype=float)
+    intensites = np.asarray(intensites, dtype=float)
+    amplitude = np.ptp(intensites) if len(intensites) else 0.0
+    distance = None
+    if distance_nm and len(longueurs_onde) > 1:
+        distance = max(1, int(distance_nm / np.median(np.diff(longueurs_onde))))
+    indices, proprietes = find_peaks(intensites, prominence=prominence_relative * amplitude, distance=distance)
+
+    # Sommet de la parabole passant par les trois points autour du maximum
+    interieurs = (indices > 0) & (indices < len(intensites) - 1)
+    decalage = np.zeros(len(indices))
+    i = indices[interieurs]
+    gauche, centre, droite = intensites[i - 1], intensites[i], intensites[i + 1]
+    denominateur = gauche - 2 * centre + droite
+    with np.errstate(divide='ignore', invalid='ignore'):
+        decalage[interieurs] = np.where(denominateur != 0, 0.5 * (gauche - droite) / denominateur, 0.0)
+    pas = np.gradient(longueurs_onde)[indices] if len(longueurs_onde) > 1 else np.zeros(len(indices))
+
+    return pd.DataFrame({
+        'longueur_onde': longueurs_onde[indices] + decalage * pas,
+        'intensite': intensites[indices],
+        'prominence': proprietes['prominences']
+    })
+
+
+def build_wavelength_index(raies):
+    """Index trié des longueurs d'onde du catalogue (valeurs triées et ordre des raies)"""
+    ordre = np.argsort(raies['longueur_onde'].to_numpy(), kind='stable')
+    return raies['longueur_onde'].to_numpy()[ordre], ordre
+
+
+@timed
+def identify_peaks(pics, raies, tolerance_nm=0.5, index=None):
+    """Identifie en lot tous les pics mesurés contre le catalogue de raies
+
+    Les fenêtres de tolérance de tous les pics sont résolues d'un coup par
+    recherche dichotomique dans l'index trié des longueurs d'onde. Chaque paire
+    (pic, raie) reçoit un score produit de trois termes :
+    - proximité en longueur d'onde (gaussienne de largeur tolérance/2) ;
+    - cohérence d'intensité entre pic et raie, chacun normalisé à son maximum
+      (intensité des pics au maximum des pics, raie au maximum de son élément) ;
+    - co-occurrence : part de l'intensité cataloguée d'un élément (dans la plage
+      observée) dont les raies ont trouvé un pic.
+    Retourne toutes les candidates et la meilleure identification par pic.
+    """
+    raies = raies.reset_index(drop=True)
+    count_rows(len(raies))
+    lambdas_tries, ordre = build_wavelength_index(raies) if index is None else index
+    lambdas_pics = pics['longueur_onde'].to_numpy()
+
+    debut = np.searchsorted(lambdas_tries, lambdas_pics - tolerance_nm, side='left')
+    fin = np.searchsorted(lambdas_tries, lambdas_pics + tolerance_nm, side='right')
+    nombres = fin - debut
+
+    # Paires (pic, raie) de toutes les fenêtres, sans boucle par pic
+    indice_pic = np.repeat(np.arange(len(pics)), nombres)
+    rang = np.arange(nombres.sum()) - np.repeat(np.cumsum(nombres) - nombres, nombres)
+    indice_raie = ordre[np.repeat(debut, nombres) + rang]
+
+    candidats = pd.DataFrame({
+        'pic': indice_pic,
+        'longueur_onde_pic': lambdas_pics[indice_pic],
+        'element': raies['element'].to_numpy()[indice_raie],
+        'longueur_onde': raies['longueur_onde'].to_numpy()[indice_raie],
+        'transition': raies['transition'].to_numpy()[indice_raie],
+        'raie': indice_raie
+    })
+    candidats['ecart_nm'] = candidats['longueur_onde_pic'] - candidats['longueur_onde']
+    score_position = np.exp(-0.5 * (candidats['ecart_nm'] / (tolerance_nm / 2)) ** 2)
+
+    intensite_raie = raies['intensite'] / raies.groupby('element')['intensite'].transform('max')
+    intensite_pic = pics['intensite'].to_numpy() / max(pics['intensite'].max(), 1e-300) if len(pics) else np.array([])
+    rapport = intensite_pic[indice_pic] / np.maximum(intensite_raie.to_numpy()[indice_raie], 1e-12)
+    score_intensite = np.exp(-np.abs(np.log(np.maximum(rapport, 1e-12))))
+
+    # Co-occurrence : intensité des raies retrouvées / intensité des raies dans la plage
+    if len(pics):
+        dans_plage = raies['longueur_onde'].between(lambdas_pics.min() - tolerance_nm, lambdas_pics.max() + tolerance_nm)
+        attendue = raies[dans_plage].groupby('element')['intensite'].sum()
+        retrouvees = raies.loc[np.unique(indice_raie)].groupby('element')['intensite'].sum()
+        cooccurrence = (retrouvees / attendue).reindex(candidats['element']).fillna(0).to_numpy()
+    else:
+        cooccurrence = np.zeros(len(candidats))
+
+    candidats['score_position'] = score_position
+    candidats['score_intensite'] = score_intensite
+    candidats['score_cooccurrence'] = cooccurrence
+    candidats['score'] = score_position * score_intensite * cooccurrence
+
+    meilleures = (candidats.sort_values(['pic', 'score'], ascending=[True, False], kind='stable')
+                  .drop_duplicates('pic'))
+    identifications = pics.reset_index(drop=True).join(
+        meilleures.set_index('pic')[['element', 'longueur_onde', 'transition', 'ecart_nm', 'score']],
+        rsuffix='_catalogue')
+    return candidats, identifications
+
+
+@timed
+def find_blends(raies, pouvoir_resolution, temperature=5000.0):
+    """Paires de raies non résolues à la résolution donnée, par balayage trié en O(n log n + paires)
+
+    Chaque raie occupe l'intervalle λ ± FWHM/2, où la FWHM combine la largeur
+    Doppler de la raie à T et l'élément de résolution λ/R. Les intervalles sont
+    triés par début ; les raies qui chevauchent une raie donnée sont les suivantes
+    dont le début précède sa fin, trouvées d'un coup par recherche dichotomique.
+    Retourne une ligne par paire, indices rapportés à `raies` réindexé.
+    """
+    raies = raies.reset_index(drop=True)
+    count_rows(len(raies))
+    centres = raies['longueur_onde'].to_numpy(dtype=float)
+    fwhm_doppler = FWHM_SUR_SIGMA * raies['largeur'].to_numpy(dtype=float) * doppler_scale(temperature)
+    fwhm = np.hypot(fwhm_doppler, centres / pouvoir_resolution)
+    ordre = np.argsort(centres - fwhm / 2, kind='stable')
+    debuts, fins = (centres - fwhm / 2)[ordre], (centres + fwhm / 2)[ordre]
+
+    # Pour chaque intervalle i, les suivants i+1 .. k_i-1 commencent avant sa fin
+    suivants = np.searchsorted(debuts, fins, side='left') - np.arange(len(ordre)) - 1
+    suivants = np.maximum(suivants, 0)
+    premiers = np.repeat(np.arange(len(ordre)), suivants)
+    rangs = np.arange(len(premiers)) - np.repeat(np.cumsum(suivants) - suivants, suivants)
+    a, b = ordre[premiers], ordre[premiers + 1 + rangs]
+
+    ecarts = np.abs(centres[a] - centres[b])
+    largeur_raies = 0.5 * (fwhm_doppler[a] + fwhm_doppler[b])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Résolution séparant la paire : FWHM moyenne (raies ⊕ λ/R) égale à l'écart
+        resolution_requise = np.where(ecarts > largeur_raies,
+                                      0.5 * (centres[a] + centres[b]) / np.sqrt(ecarts ** 2 - largeur_raies ** 2),
+                                      np.inf)
+    codes, elements = pd.factorize(raies['element'])
+    return pd.DataFrame({
+        'indice_a': a, 'indice_b': b,
+        'element_a': pd.Categorical.from_codes(codes[a], elements), 'longueur_onde_a': centres[a],
+        'element_b': pd.Categorical.from_codes(codes[b], elements), 'longueur_onde_b': centres[b],
+        'ecart_nm': ecarts,
+        'resolution_requise': resolution_requise,
+        'interference': codes[a] != codes[b]
+    })
+
+
+def best_analytical_lines(raies, melanges, abondances=None):
+    """Meilleure raie analytique de chaque élément : sans interférence si possible, la plus intense
+
+    La pureté d'une raie est sa part de l'intensité totale de son mélange
+    (interférents d'autres éléments compris), intensités pondérées par les
+    abondances ; elle vaut 1 pour une raie libre. Les raies sont classées par
+    pureté puis par intensité.
+    """
+    raies = raies.reset_index(drop=True)
+    poids = raies['element'].map(abondances or {}).fillna(1.0).to_numpy()
+    intensites = raies['intensite'].to_numpy(dtype=float) * poids
+
+    interferences = melanges[melanges['interference']]
+    cotes = np.concatenate([interferences['indice_a'], interferences['indice_b']])
+    autres = np.concatenate([interferences['indice_b'], interferences['indice_a']])
+    intensite_interferente = np.bincount(cotes, weights=intensites[autres], minlength=len(raies))
+    candidates = raies[['element', 'longueur_onde', 'intensite']].assign(
+        interferences=np.bincount(cotes, minlength=len(raies)),
+        purete=intensites / np.maximum(intensites + intensite_interferente, np.finfo(float).tiny))
+    candidates['libre'] = candidates['interferences'] == 0
+    return (candidates.sort_values(['purete', 'intensite'], ascending=False, kind='stable')
+            .groupby('element', sort=False).head(1).reset_index(drop=True))
+
+
+# Pas en ln w des nœuds de largeur des profils de l'ajustement (écart d'interpolation Hermite ~ 1e-5
+# du maximum d'un profil) et nombre de nœuds gardés en mémoire
+PAS_LARGEUR_AJUSTEMENT = 0.1
+NOEUDS_LARGEUR_MAX = 8
+
+
+@timed
+def fit_spectrum(longueurs_onde, intensites, raies, elements, temperature_initiale=5000.0,
+                 bornes_temperature=(1000.0, 20000.0), bornes_elargissement=(0.1, 20.0)):
+    """Ajuste T, l'élargissement et les abondances élémentaires sur un spectre mesuré
+
+    Modèle : S(λ) = Σₑ aₑ Bₑ(λ; T, w) + c, où la base Bₑ d'un élément est le
+    produit matriciel des poids de raies (intensité × Boltzmann(T)) par la
+    matrice des profils gaussiens de largeur largeur·w, avec w = s·√(T/300).
+    Les profils et leur dérivée en ln w ne sont calculés qu'aux nœuds fixes
+    wₖ = exp(k·PAS_LARGEUR_AJUSTEMENT) et gardés en cache ; à une largeur
+    quelconque, ils sont interpolés (Hermite cubique en ln w) entre les deux
+    nœuds qui l'encadrent. Une itération ne
+    coûte ainsi que des combinaisons et produits matriciels ; un nouveau calcul
+    de profils n'a lieu que lorsque w entre dans un intervalle de nœuds encore
+    non visité. Le jacobien, analytique, dérive ce modèle interpolé.
+    Retourne un dictionnaire de résultats (paramètres, modèle, diagnostic).
+    """
+    debut = time.perf_counter()
+    longueurs_onde = np.asarray(longueurs_onde, dtype=float)
+    intensites = np.asarray(intensites, dtype=float)
+    elements = list(elements)
+    portee = 10 * raies['largeur'].max() * doppler_scale(bornes_temperature[1]) * bornes_elargissement[1]
+    raies = raies[raies['element'].isin(elements) &
+                  raies['longueur_onde'].between(longueurs_onde[0] - portee, longueurs_onde[-1] + portee)]
+    appartenance = element_membership(raies, elements)
+    intensites_raies = raies['intensite'].to_numpy()
+    energies = raies['energie_eV'].to_numpy()
+    noeuds_profils = OrderedDict()
+    calculs_profils = [0]
+
+    def profils_noeud(k):
+        if k in noeuds_profils:
+            noeuds_profils.move_to_end(k)
+        else:
+            noeuds_profils[k] = line_profile_matrix(longueurs_onde, raies['longueur_onde'],
+                                                    raies['largeur'].to_numpy() * np.exp(k * PAS_LARGEUR_AJUSTEMENT),
+                                                    avec_derivee=True)
+            calculs_profils[0] += 1
+            if len(noeuds_profils) > NOEUDS_LARGEUR_MAX:
+                noeuds_profils.popitem(last=False)
+        return noeuds_profils[k]
+
+    def profils(largeur_effective):
+        """Profils interpolés (Hermite cubique en ln w) et leur dérivée w·∂G/∂w"""
+        position = np.log(largeur_effective) / PAS_LARGEUR_AJUSTEMENT
+        k = int(np.floor(position))
+        t = position - k
+        (g0, d0), (g1, d1) = profils_noeud(k), profils_noeud(k + 1)
+        h = PAS_LARGEUR_AJUSTEMENT
+        profil = ((2 * t ** 3 - 3 * t ** 2 + 1) * g0 + (t ** 3 - 2 * t ** 2 + t) * h * d0 +
+                  (3 * t ** 2 - 2 * t ** 3) * g1 + (t ** 3 - t ** 2) * h * d1)
+        derivee = ((6 * t ** 2 - 6 * t) * (g0 - g1) / h + (3 * t ** 2 - 4 * t + 1) * d0 +
+                   (3 * t ** 2 - 2 * t) * d1)
+        return profil, derivee
+
+    def decompose(parametres):
+        temperature, elargissement = parametres[0], parametres[1]
+        largeur_effective = elargissement * doppler_scale(temperature)
+        poids = appartenance * (intensites_raies * boltzmann_factors(energies, temperature))
+        profil, derivee_profil = profils(largeur_effective)
+        return temperature, elargissement, largeur_effective, poids, profil, derivee_profil
+
+    def residus(parametres):
+        _, _, _, poids, profil, _ = decompose(parametres)
+        return parametres[2:-1] @ (poids @ profil) + parametres[-1] - intensites
+
+    def jacobien(parametres):
+        temperature, elargissement, largeur_effective, poids, profil, derivee_profil = decompose(parametres)
+        abondances = parametres[2:-1]
+        bases = poids @ profil
+        variation_largeur = abondances @ (poids @ derivee_profil) / largeur_effective
+        variation_population = abondances @ ((poids * energies / (CONSTANTE_BOLTZMANN_EV * temperature ** 2)) @ profil)
+        colonne_t = variation_population + variation_largeur * largeur_effective / (2 * temperature)
+        colonne_s = variation_largeur * largeur_effective / elargissement
+        return np.column_stack([colonne_t, colonne_s, bases.T, np.ones_like(longueurs_onde)])
+
+    # Abondances initiales par moindres carrés linéaires positifs à T et s initiaux
+    parametres_initiaux = np.concatenate([[temperature_initiale, 1.0], np.ones(len(elements)), [0.0]])
+    _, _, _, poids, profil, _ = decompose(parametres_initiaux)
+    systeme = np.column_stack([(poids @ profil).T, np.ones_like(longueurs_onde)])
+    abondances_initiales, _ = nnls(systeme, intensites - min(intensites.min(), 0))
+    parametres_initiaux[2:] = abondances_initiales
+    parametres_initiaux[-1] += min(intensites.min(), 0)
+
+    bornes_inf = np.concatenate([[bornes_temperature[0], bornes_elargissement[0]], np.zeros(len(elements)), [-np.inf]])
+    bornes_sup = np.concatenate([[bornes_temperature[1], bornes_elargissement[1]], np.full(len(elements), np.inf), [np.inf]])
+    parametres_initiaux = np.clip(parametres_initiaux, bornes_inf, bornes_sup)
+    resultat = least_squares(residus, parametres_initiaux, jac=jacobien,
+                             bounds=(bornes_inf, bornes_sup), x_scale='jac')
+
+    # Incertitudes à 1σ à partir de (JᵀJ)⁻¹ et de la variance résiduelle
+    degres_liberte = max(len(intensites) - len(resultat.x), 1)
+    variance = 2 * resultat.cost / degres_liberte
+    try:
+        covariance = np.linalg.pinv(resultat.jac.T @ resultat.jac) * variance
+        incertitudes = np.sqrt(np.clip(np.diag(covariance), 0, None))
+    except np.linalg.LinAlgError:
+        incertitudes = np.full(len(resultat.x), np.nan)
+
+    return {
+        'temperature': resultat.x[0],
+        'elargissement': resultat.x[1],
+        'abondances': dict(zip(elements, resultat.x[2:-1])),
+        'fond': resultat.x[-1],
+        'incertitudes': dict(zip(['temperature', 'elargissement'] + elements + ['fond'], incertitudes)),
+        'modele': intensites + resultat.fun,
+        'residu_rms': float(np.sqrt(np.mean(resultat.fun ** 2))),
+        'evaluations': resultat.nfev,
+        'evaluations_jacobien': resultat.njev,
+        'calculs_profils': calculs_profils[0],
+        'succes': bool(resultat.success),
+        'message': resultat.message,
+        'duree_s': time.perf_counter() - debut
+    }
+
+
+# Vitesses radiales et décalages spectraux par corrélation croisée en ln λ
+VITESSE_LUMIERE_KMS = constants.c / 1e3
+# Nombre de valeurs de corrélation (spectres × gabarits × points FFT) traitées par bloc
+TAILLE_BLOC_CORRELATIONS = 2 ** 21
+
+
+def resample_log_lambda(longueurs_onde, intensites, grille_log):
+    """Rééchantillonne un spectre sur une grille en ln λ, centré, réduit et apodisé aux bords
+
+    Les points hors de la plage mesurée valent zéro après centrage, ce qui les
+    exclut de la corrélation.
+    """
+    longueurs_onde = np.asarray(longueurs_onde, dtype=float)
+    flux = np.interp(grille_log, longueurs_onde, intensites, left=np.nan, right=np.nan)
+    couverts = ~np.isnan(flux)
+    if not couverts.any():
+        return np.zeros(len(grille_log))
+    flux[couverts] -= flux[couverts].mean()
+    ecart_type = flux[couverts].std()
+    flux[couverts] /= ecart_type if ecart_type > 0 else 1.0
+    flux[~couverts] = 0.0
+
+    # Apodisation en cosinus sur 5 % de chaque bord couvert
+    indices = np.flatnonzero(couverts)
+    bord = max(1, int(0.05 * len(indices)))
+    rampe = 0.5 * (1 - np.cos(np.pi * np.arange(bord) / bord))
+    flux[indices[:bord]] *= rampe
+    flux[indices[-bord:]] *= rampe[::-1]
+    return flux
+
+
+def _parabolic_peak(correlations, indices):
+    """Position sous-pixel et valeur du sommet de parabole autour des maxima (par ligne)"""
+    n = correlations.shape[-1]
+    lignes = np.arange(correlations.shape[0])
+    gauche = correlations[lignes, np.clip(indices - 1, 0, n - 1)]
+    centre = correlations[lignes, indices]
+    droite = correlations[lignes, np.clip(indices + 1, 0, n - 1)]
+    denominateur = gauche - 2 * centre + droite
+    with np.errstate(divide='ignore', invalid='ignore'):
+        decalage = np.where(denominateur < 0, 0.5 * (gauche - droite) / denominateur, 0.0)
+    decalage = np.clip(decalage, -0.5, 0.5)
+    return indices + decalage, centre - 0.25 * (gauche - droite) * decalage
+
+
+def cross_correlate_batch(spectres, gabarits, pas_log, vitesse_max_kms=None, garder_correlations=False):
+    """Corrèle par FFT chaque spectre avec chaque gabarit, tous sur la même grille en ln λ
+
+    `spectres` (M × N) et `gabarits` (K × N) sont les sorties de
+    `resample_log_lambda`. Les transformées sont calculées une fois par spectre et
+    par gabarit ; les corrélations des M × K paires sont des produits terme à
+    terme suivis d'une FFT inverse, par blocs de spectres pour borner la mémoire.
+    Le pic est affiné par interpolation parabolique et converti en décalage
+    z = exp(δ·pas) − 1 et en vitesse (km/s, relativiste). Retourne z, v et le
+    coefficient de corrélation (M × K chacun) ; avec `garder_correlations`, aussi
+    les fonctions de corrélation sur la plage de décalages explorée.
+    """
+    spectres = np.atleast_2d(np.asarray(spectres, dtype=float))
+    gabarits = np.atleast_2d(np.asarray(gabarits, dtype=float))
+    n_points = spectres.shape[1]
+    taille_fft = next_fast_len(2 * n_points, real=True)
+    decalage_max = n_points - 1
+    if vitesse_max_kms is not None:
+        z_max = np.sqrt((1 + vitesse_max_kms / VITESSE_LUMIERE_KMS) / (1 - vitesse_max_kms / VITESSE_LUMIERE_KMS)) - 1
+        decalage_max = min(decalage_max, int(np.ceil(np.log1p(z_max) / pas_log)) + 1)
+    decalages = np.arange(-decalage_max, decalage_max + 1)
+    indices_fft = decalages % taille_fft
+
+    normes_gabarits = np.sqrt((gabarits ** 2).sum(axis=1))
+    transformees_gabarits = np.conj(rfft(gabarits, n=taille_fft, workers=-1))
+
+    positions = np.empty((len(spectres), len(gabarits)))
+    maxima = np.empty((len(spectres), len(gabarits)))
+    correlations = np.empty((len(spectres), len(gabarits), len(decalages))) if garder_correlations else None
+    taille_bloc = max(1, TAILLE_BLOC_CORRELATIONS // (len(gabarits) * taille_fft))
+    for debut in range(0, len(spectres), taille_bloc):
+        bloc = slice(debut, debut + taille_bloc)
+        transformees = rfft(spectres[bloc], n=taille_fft, workers=-1)
+        completes = irfft(transformees[:, None, :] * transformees_gabarits[None, :, :], n=taille_fft, workers=-1)
+        normes = np.sqrt((spectres[bloc] ** 2).sum(axis=1))[:, None] * normes_gabarits[None, :]
+        fenetre = completes[..., indices_fft] / np.where(normes > 0, normes, 1.0)[..., None]
+        if garder_correlations:
+            correlations[bloc] = fenetre
+
+        a_plat = fenetre.reshape(-1, len(decalages))
+        position, maximum = _parabolic_peak(a_plat, np.argmax(a_plat, axis=1))
+        positions[bloc] = position.reshape(fenetre.shape[:2])
+        maxima[bloc] = maximum.reshape(fenetre.shape[:2])
+
+    z = np.expm1((positions - decalage_max) * pas_log)
+    rapport = (1 + z) ** 2
+    return {
+        'z': z,
+        'vitesse_kms': VITESSE_LUMIERE_KMS * (rapport - 1) / (rapport + 1),
+        'correlation': maxima,
+        'decalages_z': np.expm1(decalages * pas_log),
+        'correlations': correlations
+    }
+
+
+def load_spectrum_directory(chemin, motif='*.csv', n_travailleurs=8):
+    """Lit en parallèle (fils d'E/S) tous les spectres d'un répertoire
+
+    Retourne les fichiers lus, leurs spectres et les erreurs (fichier, message)
+    des fichiers illisibles, qui n'interrompent pas la lecture des autres.
+    """
+    def lecture(fichier):
+        try:
+            return load_measured_spectrum(fichier), None
+        except (ValueError, OSError) as erreur:
+            return None, str(erreur)
+
+    fichiers = sorted(glob.glob(os.path.join(chemin, motif)))
+    with ThreadPoolExecutor(max_workers=n_travailleurs) as executeur:
+        lectures = list(executeur.map(lecture, fichiers))
+    lus = [(fichier, spectre) for fichier, (spectre, erreur) in zip(fichiers, lectures) if erreur is None]
+    erreurs = [(fichier, erreur) for fichier, (_, erreur) in zip(fichiers, lectures) if erreur is not None]
+    return [fichier for fichier, _ in lus], [spectre for _, spectre in lus], erreurs
+
+
+@timed
+def batch_velocity_search(spectres, gabarits, grille_log, vitesse_max_kms=None, garder_correlations=False):
+    """Mesure z et v de chaque spectre (λ, I) contre chaque gabarit (λ, I) en une passe
+
+    Retourne un tableau par spectre avec le meilleur gabarit, z, v et la
+    corrélation, ainsi que le résultat complet de `cross_correlate_batch`.
+    """
+    pas_log = np.log(grille_log[1] / grille_log[0])
+    observes = np.array([resample_log_lambda(l, i, grille_log) for l, i in spectres])
+    modeles = np.array([resample_log_lambda(l, i, grille_log) for l, i in gabarits])
+    resultat = cross_correlate_batch(observes, modeles, pas_log, vitesse_max_kms, garder_correlations)
+
+    meilleur = np.argmax(resultat['correlation'], axis=1)
+    lignes = np.arange(len(observes))
+    tableau = pd.DataFrame({
+        'spectre': lignes,
+        'gabarit': meilleur,
+        'z': resultat['z'][lignes, meilleur],
+        'vitesse_kms': resultat['vitesse_kms'][lignes, meilleur],
+        'correlation': resultat['correlation'][lignes, meilleur]
+    })
+    return tableau, resultat
@@ -0,0 +1,140 @@
+"""Atlas spectral multi-résolution : pyramide d'enveloppes (min, max) tuilée sur disque, par élément
+
+Le niveau 0 est le spectre synthétisé sur une grille en ln λ couvrant tout le
+domaine (UV lointain à l'infrarouge moyen) ; chaque niveau suivant réduit le
+précédent d'un facteur 2 en gardant le minimum et le maximum de chaque paire,
+si bien qu'une raie fine reste visible à toutes les échelles. Chaque niveau est
+un fichier .npy (2 × n, float32) relu par projection mémoire ; une vue ne lit que
+les tuiles de TAILLE_TUILE échantillons qui recouvrent la plage demandée, au
+niveau le plus grossier qui fournit encore assez de points pour l'affichage.
+"""
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from spectral_synthesis import synthesize_lines
+
+DOSSIER_ATLAS = os.environ.get(
+    'SPECTRES_ATLAS_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache', 'atlas'))
+
+# Domaine couvert (He I 58.4 nm à la série de Pfund) et résolution du niveau 0
+LAMBDA_MIN_ATLAS = 50.0
+LAMBDA_MAX_ATLAS = 8000.0
+POUVOIR_RESOLUTION_ATLAS = 30000.0
+ECHANTILLONNAGE_ATLAS = 3.0
+
+# Échantillons (min, max) par tuile (8 Kio en float32) et points synthétisés par bloc à la construction
+TAILLE_TUILE = 1024
+TAILLE_BLOC_SYNTHESE = 2 ** 16
+
+
+class SpectralAtlas:
+    """Atlas d'un élément ouvert en lecture (niveaux projetés en mémoire)"""
+
+    def __init__(self, dossier):
+        with open(os.path.join(dossier, 'atlas.json'), encoding='utf-8') as fichier:
+            self.meta = json.load(fichier)
+        self.dossier = dossier
+        self.lambda_min = self.meta['lambda_min']
+        self.pas_log = self.meta['pas_log']
+        self.n_base = self.meta['n_base']
+        self.niveaux = [np.load(os.path.join(dossier, f"niveau_{k}.npy"), mmap_mode='r')
+                        for k in range(self.meta['n_niveaux'])]
+
+    def base_index(self, longueur_onde):
+        """Position (fractionnaire) d'une longueur d'onde sur la grille du niveau 0"""
+        return np.log(np.asarray(longueur_onde, dtype=float) / self.lambda_min) / self.pas_log
+
+    def level_for(self, lambda_min, lambda_max, n_pixels):
+        """Niveau le plus grossier donnant au moins `n_pixels` échantillons sur la plage"""
+        etendue = max(self.base_index(lambda_max) - self.base_index(lambda_min), 1.0)
+        niveau = int(np.floor(np.log2(max(etendue / n_pixels, 1.0))))
+        return min(niveau, len(self.niveaux) - 1)
+
+    def view(self, lambda_min, lambda_max, n_pixels=2000):
+        """Enveloppe (λ, min, max) de la plage à la résolution d'affichage, lue tuile par tuile"""
+        niveau = self.level_for(lambda_min, lambda_max, n_pixels)
+        donnees = self.niveaux[niveau]
+        facteur = 2 ** niveau
+        premier = max(int(np.floor(self.base_index(lambda_min) / facteur)), 0)
+        dernier = min(int(np.ceil(self.base_index(lambda_max) / facteur)), donnees.shape[1] - 1)
+        if dernier < premier:
+            vide = np.array([])
+            return {'longueurs_onde': vide, 'minimum': vide, 'maximum': vide,
+                    'niveau': niveau, 'tuiles': 0, 'octets': 0}
+
+        tuile_debut, tuile_fin = premier // TAILLE_TUILE, dernier // TAILLE_TUILE + 1
+        tuiles = np.array(donnees[:, tuile_debut * TAILLE_TUILE:tuile_fin * TAILLE_TUILE])
+        decalage = tuile_debut * TAILLE_TUILE
+        bloc = tuiles[:, premier - decalage:dernier - decalage + 1]
+
+        # Centre de chaque échantillon : milieu des 2^niveau points de base qu'il couvre
+        centres = (np.arange(premier, dernier + 1) + 0.5) * facteur - 0.5
+        return {
+            'longueurs_onde': self.lambda_min * np.exp(self.pas_log * centres),
+            'minimum': bloc[0],
+            'maximum': bloc[1],
+            'niveau': niveau,
+            'tuiles': tuile_fin - tuile_debut,
+            'octets': tuiles.nbytes
+        }
+
+
+def build_atlas(dossier, centres, intensites, largeurs, lambda_min=LAMBDA_MIN_ATLAS, lambda_max=LAMBDA_MAX_ATLAS,
+                pouvoir_resolution=POUVOIR_RESOLUTION_ATLAS, echantillonnage=ECHANTILLONNAGE_ATLAS):
+    """Synthétise le niveau 0 par blocs puis écrit la pyramide dans `dossier` (doit ne pas exister)"""
+    os.makedirs(dossier)
+    pas_log = 1.0 / (pouvoir_resolution * echantillonnage)
+    n_base = int(np.ceil(np.log(lambda_max / lambda_min) / pas_log)) + 1
+
+    niveau = np.lib.format.open_memmap(os.path.join(dossier, 'niveau_0.npy'), mode='w+',
+                                       dtype=np.float32, shape=(2, n_base))
+    for debut in range(0, n_base, TAILLE_BLOC_SYNTHESE):
+        indices = np.arange(debut, min(debut + TAILLE_BLOC_SYNTHESE, n_base))
+        spectre = synthesize_lines(lambda_min * np.exp(pas_log * indices), centres, intensites, largeurs)
+        niveau[0, indices] = spectre
+        niveau[1, indices] = spectre
+    niveau.flush()
+
+    # Réduction par paires : min des minima, max des maxima
+    n_niveaux = 1
+    while niveau.shape[1] > TAILLE_TUILE:
+        n = niveau.shape[1]
+        paires = np.pad(np.asarray(niveau), ((0, 0), (0, n % 2)), mode='edge').reshape(2, -1, 2)
+        suivant = np.lib.format.open_memmap(os.path.join(dossier, f"niveau_{n_niveaux}.npy"), mode='w+',
+                                            dtype=np.float32, shape=(2, paires.shape[1]))
+        suivant[0] = paires[0].min(axis=1)
+        suivant[1] = paires[1].max(axis=1)
+        suivant.flush()
+        niveau = suivant
+        n_niveaux += 1
+
+    with open(os.path.join(dossier, 'atlas.json'), 'w', encoding='utf-8') as fichier:
+        json.dump({'lambda_min': lambda_min, 'lambda_max': lambda_max, 'pas_log': pas_log,
+                   'n_base': n_base, 'n_niveaux': n_niveaux, 'n_raies': len(centres)}, fichier)
+
+
+def element_atlas(cle, raies, racine=DOSSIER_ATLAS):
+    """Atlas identifié par `cle`, construit au premier appel
+
+    La construction a lieu dans un répertoire temporaire renommé à la fin : si
+    plusieurs processus construisent le même atlas, le premier renommage gagne
+    et les autres abandonnent leur copie.
+    """
+    dossier = os.path.join(racine, cle)
+    if not os.path.exists(os.path.join(dossier, 'atlas.json')):
+        os.makedirs(racine, exist_ok=True)
+        temporaire = tempfile.mkdtemp(dir=racine, prefix='.construction-')
+        try:
+            build_atlas(os.path.join(temporaire, 'atlas'), raies['longueur_onde'].to_numpy(),
+                        raies['intensite'].to_numpy(), raies['largeur'].to_numpy())
+            try:
+                os.rename(os.path.join(temporaire, 'atlas'), dossier)
+            except OSError:
+                pass  # déjà construit par un autre processus
+        finally:
+            shutil.rmtree(temporaire, ignore_errors=True)
+    return SpectralAtlas(dossier)
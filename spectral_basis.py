@@ -0,0 +1,145 @@
+"""Spectres de base par élément interpolés en température, précalculés en tâche de fond
+
+Avec le profil gaussien par raie, la température n'agit que sur les largeurs
+Doppler. Les bases de chaque élément sont calculées une fois aux nœuds d'une
+grille de températures répartie en ln T, puis mises dans le cache disque. Une
+température intermédiaire est servie par interpolation linéaire en ln T entre
+les deux nœuds qui l'encadrent, sans synthèse raie par raie. L'erreur de chaque
+intervalle est mesurée au précalcul, au milieu de l'intervalle en ln T, contre
+une synthèse exacte. Elle est rapportée au maximum du spectre exact. Une suite de
+températures (décroissance d'un plasma) est servie de même, par blocs d'instants.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from spectral_cache import CACHE_SPECTRES
+
+# Nœuds de température (K) couvrant la plage du simulateur
+TEMPERATURES_BASES = tuple(float(t) for t in np.geomspace(1000.0, 10000.0, 25))
+
+# Marge appliquée à l'erreur mesurée au milieu d'un intervalle, dont le maximum peut s'écarter légèrement
+# (estimation, pas une borne garantie : l'écart n'est mesuré qu'au milieu de chaque intervalle)
+MARGE_ERREUR_ESTIMEE = 1.1
+
+
+def temperature_weights(temperature, noeuds=TEMPERATURES_BASES):
+    """Indice du nœud inférieur et poids linéaire en ln T (températures bornées aux nœuds extrêmes)
+
+    Accepte une température ou un tableau de températures.
+    """
+    axe = np.log(noeuds)
+    valeur = np.clip(np.log(temperature), axe[0], axe[-1])
+    i = np.minimum(np.searchsorted(axe, valeur, side='right') - 1, len(axe) - 2)
+    return i, (valeur - axe[i]) / (axe[i + 1] - axe[i])
+
+
+def precompute_temperature_bases(synthese, cles_noeuds, cle_erreurs, noeuds=TEMPERATURES_BASES,
+                                 cache=CACHE_SPECTRES):
+    """Met en cache les bases aux nœuds et l'erreur d'interpolation de chaque intervalle
+
+    `synthese(T)` renvoie le spectre exact de l'élément à la température T.
+    L'erreur d'un intervalle est l'écart maximal, rapporté au maximum du
+    spectre exact, entre synthèse exacte et interpolation au milieu de
+    l'intervalle en ln T, là où l'interpolation linéaire s'écarte le plus.
+    """
+    bases = []
+    for cle, temperature in zip(cles_noeuds, noeuds):
+        base = cache.get(cle)
+        if base is None:
+            base = synthese(temperature)
+            cache.put(cle, base)
+        bases.append(np.asarray(base))
+
+    erreurs = np.empty(len(noeuds) - 1)
+    for i in range(len(noeuds) - 1):
+        exact = synthese(np.sqrt(noeuds[i] * noeuds[i + 1]))
+        ecart = np.max(np.abs(exact - 0.5 * (bases[i] + bases[i + 1])))
+        erreurs[i] = ecart / max(np.max(np.abs(exact)), np.finfo(float).tiny)
+    cache.put(cle_erreurs, erreurs)
+    return erreurs
+
+
+def interpolated_basis(cles_noeuds, cle_erreurs, temperature, noeuds=TEMPERATURES_BASES, cache=CACHE_SPECTRES):
+    """Base interpolée à la température donnée et son erreur relative estimée, ou None si le précalcul manque"""
+    i, poids = temperature_weights(temperature, noeuds)
+    erreurs = cache.get(cle_erreurs)
+    inferieure = cache.get(cles_noeuds[i])
+    superieure = cache.get(cles_noeuds[i + 1])
+    if erreurs is None or inferieure is None or superieure is None:
+        return None
+    # Erreur quasi quadratique sur l'intervalle : nulle aux nœuds, maximale (mesurée) au milieu
+    erreur_estimee = MARGE_ERREUR_ESTIMEE * float(erreurs[i]) * 4 * poids * (1 - poids)
+    return (1 - poids) * inferieure + poids * superieure, erreur_estimee
+
+
+def temperature_stack(cles_noeuds, poids, temperatures, facteurs, noeuds=TEMPERATURES_BASES, cache=CACHE_SPECTRES,
+                      dtype=np.float32, taille_bloc=64):
+    """Pile (instants × λ) des composites interpolés aux températures données, ou None si une base manque
+
+    `cles_noeuds[e]` sont les clés des bases de l'élément e aux nœuds et `poids[e]`
+    son abondance ; chaque instant est multiplié par `facteurs` (densité relative).
+    Seuls les composites des nœuds encadrant les températures sont formés, puis
+    chaque bloc d'instants est une combinaison de deux d'entre eux, en `dtype`.
+    """
+    indices, ponderations = temperature_weights(np.asarray(temperatures, dtype=float), noeuds)
+    utiles = np.unique(np.concatenate([indices, indices + 1]))
+    composites = None
+    for position, k in enumerate(utiles):
+        bases = [cache.get(cles[k]) for cles in cles_noeuds]
+        if any(base is None for base in bases):
+            return None
+        if composites is None:
+            composites = np.empty((len(utiles), len(bases[0])), dtype=dtype)
+        composites[position] = np.asarray(poids, dtype=float) @ np.array(bases)
+
+    inferieurs, superieurs = np.searchsorted(utiles, indices), np.searchsorted(utiles, indices + 1)
+    ponderations = ponderations.astype(dtype)[:, None]
+    facteurs = np.asarray(facteurs, dtype=dtype)[:, None]
+    pile = np.empty((len(indices), composites.shape[1]), dtype=dtype)
+    for debut in range(0, len(indices), taille_bloc):
+        bloc = slice(debut, debut + taille_bloc)
+        pile[bloc] = facteurs[bloc] * ((1 - ponderations[bloc]) * composites[inferieurs[bloc]] +
+                                       ponderations[bloc] * composites[superieurs[bloc]])
+    return pile
+
+
+class BasisPrecomputation:
+    """Précalculs de fond partagés par toutes les sessions du processus, dédoublonnés par clé"""
+
+    def __init__(self, n_travailleurs=2):
+        self.executeur = ThreadPoolExecutor(max_workers=n_travailleurs, thread_name_prefix='bases')
+        self.verrou = threading.Lock()
+        self.taches = {}
+
+    def submit(self, cle, fonction, *args, **kwargs):
+        """Soumet `fonction(*args, **kwargs)` sauf si la même clé est en cours ou déjà réussie"""
+        with self.verrou:
+            tache = self.taches.get(cle)
+            if tache is None or (tache.done() and tache.exception() is not None):
+                tache = self.executeur.submit(fonction, *args, **kwargs)
+                self.taches[cle] = tache
+            return tache
+
+    def forget(self, cle):
+        """Oublie une tâche terminée (ses résultats ont quitté le cache) pour qu'elle puisse être resoumise"""
+        with self.verrou:
+            tache = self.taches.get(cle)
+            if tache is not None and tache.done():
+                del self.taches[cle]
+
+    def is_pending(self, cle):
+        """Vrai si la tâche de cette clé est soumise et non terminée"""
+        with self.verrou:
+            tache = self.taches.get(cle)
+            return tache is not None and not tache.done()
+
+    def pending(self):
+        """Nombre de précalculs soumis non terminés"""
+        with self.verrou:
+            return sum(not tache.done() for tache in self.taches.values())
+
+
+# Précalculs partagés par les tableaux de bord du processus
+PRECALCULS_BASES = BasisPrecomputation()
@@ -0,0 +1,171 @@
+"""Cache disque des spectres synthétisés, adressé par le contenu et relu par projection mémoire
+
+Chaque spectre est un fichier .npy nommé par l'empreinte SHA-256 des paramètres
+qui le déterminent (version du catalogue, éléments, température, grille, modèle
+de profil). Les écritures passent par un fichier temporaire renommé
+atomiquement : plusieurs processus peuvent écrire la même entrée sans qu'un
+lecteur voie jamais un fichier partiel. La date de modification sert d'horodatage
+d'accès ; au-delà de la taille maximale, les entrées les moins récemment lues
+sont supprimées sous un verrou de fichier partagé entre processus.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # Windows : éviction sans verrou inter-processus
+    fcntl = None
+
+DOSSIER_CACHE_SPECTRES = os.environ.get(
+    'SPECTRES_CACHE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache', 'spectres'))
+TAILLE_MAX_CACHE_OCTETS = int(float(os.environ.get('SPECTRES_CACHE_MAX_MO', 512)) * 2 ** 20)
+
+# Fichiers temporaires abandonnés (processus interrompu pendant l'écriture) supprimés après ce délai
+DELAI_TEMPORAIRES_S = 3600
+
+InfosCache = namedtuple('InfosCache', ['hits', 'misses'])
+
+
+def catalogue_version(raies):
+    """Empreinte courte du contenu d'un catalogue de raies (colonnes et valeurs)"""
+    empreinte = hashlib.sha256(','.join(map(str, raies.columns)).encode())
+    empreinte.update(pd.util.hash_pandas_object(raies, index=False).to_numpy().tobytes())
+    return empreinte.hexdigest()[:16]
+
+
+def _canonical(valeur):
+    if isinstance(valeur, np.ndarray):
+        # Type et forme inclus : des octets identiques ne désignent pas forcément le même tableau
+        empreinte = hashlib.sha256(f"{valeur.dtype.str}{valeur.shape}".encode())
+        empreinte.update(np.ascontiguousarray(valeur).tobytes())
+        return empreinte.hexdigest()
+    if isinstance(valeur, np.generic):
+        return valeur.item()
+    if isinstance(valeur, (set, frozenset)):
+        return sorted(valeur)
+    raise TypeError(f"Paramètre non sérialisable pour la clé de cache : {type(valeur)}")
+
+
+def content_key(**parametres):
+    """Clé de cache : empreinte SHA-256 de la forme JSON canonique des paramètres"""
+    texte = json.dumps(parametres, sort_keys=True, default=_canonical, separators=(',', ':'))
+    return hashlib.sha256(texte.encode()).hexdigest()
+
+
+class DiskSpectrumCache:
+    """Spectres sur disque, plafonnés en taille avec éviction LRU"""
+
+    def __init__(self, dossier=DOSSIER_CACHE_SPECTRES, taille_max_octets=TAILLE_MAX_CACHE_OCTETS):
+        self.dossier = dossier
+        self.taille_max_octets = taille_max_octets
+        self.succes = 0
+        self.echecs = 0
+
+    def path(self, cle):
+        return os.path.join(self.dossier, f"{cle}.npy")
+
+    def get(self, cle):
+        """Spectre en lecture seule (projection mémoire) ou None si absent"""
+        chemin = self.path(cle)
+        try:
+            spectre = np.load(chemin, mmap_mode='r')
+        except (FileNotFoundError, ValueError, OSError):
+            self.echecs += 1
+            return None
+        try:
+            os.utime(chemin)
+        except OSError:
+            pass  # entrée évincée entre-temps par un autre processus : la projection reste valide
+        self.succes += 1
+        return spectre
+
+    def put(self, cle, spectre):
+        """Écrit un spectre (renommage atomique) puis fait respecter la taille maximale"""
+        os.makedirs(self.dossier, exist_ok=True)
+        descripteur, temporaire = tempfile.mkstemp(dir=self.dossier, suffix='.tmp')
+        try:
+            with os.fdopen(descripteur, 'wb') as fichier:
+                np.save(fichier, np.asarray(spectre))
+            os.replace(temporaire, self.path(cle))
+        except BaseException:
+            if os.path.exists(temporaire):
+                os.remove(temporaire)
+            raise
+        self.evict()
+
+    def get_or_compute(self, cle, calcul):
+        """Spectre du cache ou, à défaut, calculé par `calcul()` puis enregistré"""
+        spectre = self.get(cle)
+        if spectre is None:
+            spectre = calcul()
+            self.put(cle, spectre)
+        return spectre
+
+    def __contains__(self, cle):
+        return os.path.exists(self.path(cle))
+
+    @contextmanager
+    def _lock(self):
+        with open(os.path.join(self.dossier, '.verrou'), 'a') as verrou:
+            if fcntl is not None:
+                fcntl.flock(verrou, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(verrou, fcntl.LOCK_UN)
+
+    def entries(self):
+        """Entrées (date d'accès, taille, chemin) du cache et fichiers temporaires abandonnés"""
+        entrees, abandonnes = [], []
+        maintenant = time.time()
+        with os.scandir(self.dossier) as iterateur:
+            for entree in iterateur:
+                try:
+                    etat = entree.stat()
+                except FileNotFoundError:
+                    continue
+                if entree.name.endswith('.npy'):
+                    entrees.append((etat.st_mtime, etat.st_size, entree.path))
+                elif entree.name.endswith('.tmp') and maintenant - etat.st_mtime > DELAI_TEMPORAIRES_S:
+                    abandonnes.append(entree.path)
+        return entrees, abandonnes
+
+    def evict(self):
+        """Supprime les entrées les moins récemment utilisées jusqu'à repasser sous la taille maximale"""
+        with self._lock():
+            entrees, abandonnes = self.entries()
+            total = sum(taille for _, taille, _ in entrees)
+            a_supprimer = list(abandonnes)
+            for _, taille, chemin in sorted(entrees):
+                if total <= self.taille_max_octets:
+                    break
+                a_supprimer.append(chemin)
+                total -= taille
+            for chemin in a_supprimer:
+                try:
+                    os.remove(chemin)
+                except FileNotFoundError:
+                    pass
+
+    def size(self):
+        """Nombre d'entrées et taille totale (octets)"""
+        if not os.path.isdir(self.dossier):
+            return 0, 0
+        entrees, _ = self.entries()
+        return len(entrees), sum(taille for _, taille, _ in entrees)
+
+    def cache_info(self):
+        return InfosCache(self.succes, self.echecs)
+
+
+# Cache partagé par les tableaux de bord du processus
+CACHE_SPECTRES = DiskSpectrumCache()
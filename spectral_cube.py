@@ -0,0 +1,185 @@
+"""Cubes hyperspectraux (y, x, λ) synthétisés par blocs de lignes dans des processus, écrits sur disque
+
+Chaque pixel porte une température et les abondances des éléments ; son spectre
+est la somme des bases des éléments interpolées en ln T (voir `spectral_basis`),
+pondérées par les abondances. Les blocs de lignes sont calculés par des
+processus distincts qui écrivent directement dans le fichier .npy projeté en
+mémoire : ni le processus principal ni les travailleurs ne tiennent le cube
+entier. La lecture d'un pixel ou d'une image de bande ne touche que les pages
+concernées. Le dossier des cubes est borné en taille (les moins récemment
+ouverts sont supprimés).
+"""
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from spectral_basis import TEMPERATURES_BASES, temperature_stack
+from spectral_cache import CACHE_SPECTRES, DELAI_TEMPORAIRES_S, DiskSpectrumCache
+
+DOSSIER_CUBES = os.environ.get(
+    'SPECTRES_CUBES_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache', 'cubes'))
+# Taille maximale d'un cube généré (float32 sur disque) : au-delà, la génération est refusée
+TAILLE_MAX_CUBE_UNIQUE_OCTETS = int(float(os.environ.get('SPECTRES_CUBE_UNIQUE_MAX_GO', 8)) * 2 ** 30)
+# Taille totale du dossier des cubes : au-delà, les moins récemment ouverts sont supprimés
+TAILLE_MAX_CUBES_OCTETS = int(float(os.environ.get('SPECTRES_CUBES_MAX_GO', 16)) * 2 ** 30)
+
+# Taille visée d'un bloc de lignes écrit par un travailleur, et nombre de travailleurs par défaut
+TAILLE_BLOC_CUBE_OCTETS = 64 * 2 ** 20
+N_PROCESSUS_CUBE = max(1, min(4, (os.cpu_count() or 1) - 1))
+
+
+class HyperspectralCube:
+    """Cube ouvert en lecture (projection mémoire) avec sa grille et ses cartes de conditions"""
+
+    def __init__(self, dossier):
+        self.dossier = dossier
+        os.utime(dossier)  # date d'accès de l'éviction
+        self.cube = np.load(os.path.join(dossier, 'cube.npy'), mmap_mode='r')
+        self.longueurs_onde = np.load(os.path.join(dossier, 'longueurs_onde.npy'))
+        self.temperatures = np.load(os.path.join(dossier, 'temperatures.npy'))
+
+    @property
+    def shape(self):
+        return self.cube.shape
+
+    def pixel(self, y, x):
+        """Spectre d'un pixel (une lecture contiguë)"""
+        return np.array(self.cube[y, x])
+
+    def band_image(self, lambda_min, lambda_max, lignes_par_bloc=16):
+        """Image moyenne sur la bande [λ min, λ max], lue par blocs de lignes"""
+        debut = int(np.searchsorted(self.longueurs_onde, lambda_min, side='left'))
+        fin = max(int(np.searchsorted(self.longueurs_onde, lambda_max, side='right')), debut + 1)
+        image = np.empty(self.cube.shape[:2])
+        for ligne in range(0, self.cube.shape[0], lignes_par_bloc):
+            image[ligne:ligne + lignes_par_bloc] = self.cube[ligne:ligne + lignes_par_bloc, :, debut:fin].mean(axis=2)
+        return image
+
+
+def _directory_size(dossier):
+    taille = 0
+    with os.scandir(dossier) as iterateur:
+        for entree in iterateur:
+            try:
+                taille += entree.stat().st_size
+            except FileNotFoundError:
+                pass
+    return taille
+
+
+def evict_cubes(racine=DOSSIER_CUBES, taille_max_octets=TAILLE_MAX_CUBES_OCTETS, conserver=None):
+    """Supprime les cubes les moins récemment ouverts jusqu'à repasser sous la taille maximale
+
+    Le cube `conserver` (celui qui vient d'être construit) n'est jamais supprimé ;
+    les constructions abandonnées depuis plus de `DELAI_TEMPORAIRES_S` le sont.
+    Un cube encore projeté en mémoire par une autre session reste lisible par
+    elle jusqu'à sa fermeture (suppression différée par le système de fichiers).
+    """
+    if not os.path.isdir(racine):
+        return
+    cubes, abandonnes = [], []
+    maintenant = time.time()
+    with os.scandir(racine) as iterateur:
+        for entree in iterateur:
+            if not entree.is_dir() or entree.path == conserver:
+                continue
+            try:
+                date = entree.stat().st_mtime
+                if entree.name.startswith('.construction-'):
+                    if maintenant - date > DELAI_TEMPORAIRES_S:
+                        abandonnes.append(entree.path)
+                else:
+                    cubes.append((date, _directory_size(entree.path), entree.path))
+            except FileNotFoundError:
+                continue
+    total = sum(taille for _, taille, _ in cubes)
+    if conserver is not None and os.path.isdir(conserver):
+        total += _directory_size(conserver)
+    a_supprimer = list(abandonnes)
+    for _, taille, chemin in sorted(cubes):
+        if total <= taille_max_octets:
+            break
+        a_supprimer.append(chemin)
+        total -= taille
+    for chemin in a_supprimer:
+        shutil.rmtree(chemin, ignore_errors=True)
+
+
+def hot_spot_map(ny, nx, temperature_centre, temperature_bord, abondances):
+    """Carte de démonstration : point chaud gaussien et gradients de composition
+
+    La température décroît du centre vers le bord ; l'abondance de l'élément k
+    varie entre 0 et `abondances[k]` le long d'une direction tournée de 2πk/E.
+    """
+    y, x = np.mgrid[0:ny, 0:nx]
+    u, v = (x + 0.5) / nx - 0.5, (y + 0.5) / ny - 0.5
+    temperatures = temperature_bord + (temperature_centre - temperature_bord) * np.exp(-(u ** 2 + v ** 2) / 0.045)
+    angles = 2 * np.pi * np.arange(len(abondances)) / max(len(abondances), 1)
+    gradients = 0.5 * (1 + np.cos(2 * np.pi * (u[..., None] * np.cos(angles) + v[..., None] * np.sin(angles))))
+    return temperatures, gradients * np.asarray(abondances, dtype=float)
+
+
+def _fill_rows(chemin, debut, fin, cles_noeuds, temperatures, abondances, noeuds, dossier_cache):
+    """Travailleur : synthétise les lignes [debut, fin) et les écrit dans le cube"""
+    cache = DiskSpectrumCache(dossier_cache)
+    cube = np.load(chemin, mmap_mode='r+')
+    bloc = np.zeros((temperatures.size, cube.shape[2]), dtype=cube.dtype)
+    for e, cles in enumerate(cles_noeuds):
+        pile = temperature_stack([cles], [1.0], temperatures.ravel(), abondances[..., e].ravel(), noeuds, cache,
+                                 dtype=cube.dtype)
+        if pile is None:
+            raise ValueError("Bases en température absentes du cache : précalcul à refaire")
+        bloc += pile
+    cube[debut:fin] = bloc.reshape(fin - debut, cube.shape[1], cube.shape[2])
+    cube.flush()
+    return fin - debut
+
+
+def build_cube(dossier, longueurs_onde, temperatures, abondances, cles_noeuds, noeuds=TEMPERATURES_BASES,
+               cache=CACHE_SPECTRES, n_processus=N_PROCESSUS_CUBE, progression=None):
+    """Synthétise le cube (ny, nx, λ) en float32 dans `dossier` (construit à part puis renommé)
+
+    `temperatures` est la carte (ny, nx), `abondances` la carte (ny, nx, E) et
+    `cles_noeuds[e]` les clés des bases de l'élément e aux nœuds de température.
+    """
+    ny, nx = temperatures.shape
+    lignes_par_bloc = max(1, TAILLE_BLOC_CUBE_OCTETS // (nx * len(longueurs_onde) * 4))
+    racine = os.path.dirname(dossier)
+    os.makedirs(racine, exist_ok=True)
+    temporaire = tempfile.mkdtemp(dir=racine, prefix='.construction-')
+    try:
+        chemin = os.path.join(temporaire, 'cube.npy')
+        np.lib.format.open_memmap(chemin, mode='w+', dtype=np.float32, shape=(ny, nx, len(longueurs_onde))).flush()
+        np.save(os.path.join(temporaire, 'longueurs_onde.npy'), np.asarray(longueurs_onde, dtype=float))
+        np.save(os.path.join(temporaire, 'temperatures.npy'), temperatures)
+
+        # Processus lancés à neuf (spawn) : le processus principal porte des fils d'exécution
+        with ProcessPoolExecutor(max_workers=n_processus,
+                                 mp_context=multiprocessing.get_context('spawn')) as executeur:
+            taches = [executeur.submit(_fill_rows, chemin, debut, min(debut + lignes_par_bloc, ny), cles_noeuds,
+                                       temperatures[debut:debut + lignes_par_bloc],
+                                       abondances[debut:debut + lignes_par_bloc], noeuds, cache.dossier)
+                      for debut in range(0, ny, lignes_par_bloc)]
+            try:
+                faites = 0
+                for tache in as_completed(taches):
+                    faites += tache.result()
+                    if progression is not None:
+                        progression(faites / ny)
+            except BaseException:
+                executeur.shutdown(wait=True, cancel_futures=True)
+                raise
+
+        try:
+            os.rename(temporaire, dossier)
+        except OSError:
+            pass  # déjà construit par une autre session
+    finally:
+        shutil.rmtree(temporaire, ignore_errors=True)
+    evict_cubes(racine, conserver=dossier)
+    return dossier
@@ -0,0 +1,174 @@
+"""Rendu des figures sous budget de charge utile : passage en WebGL et décimation min-max
+
+Chaque figure affichée par les tableaux de bord passe par `plotly_chart`. Au-delà
+d'un nombre de points, les traces en lignes passent en WebGL (Scattergl) ; au-delà
+du budget (points, ou octets estimés d'après le nombre de points), elles sont
+décimées en conservant le minimum et le maximum de chaque intervalle, de sorte
+que les raies fines restent visibles. La figure d'origine n'est pas modifiée.
+Les spectres zoomables (`zoomable_chart`) ne sont pas décimés mais resynthétisés
+sur la seule fenêtre visible (`visible_window`). Les cartes (instants × λ) sont
+réduites par maximum de blocs (`downsample_heatmap`) avant affichage.
+"""
+import numpy as np
+import plotly.graph_objects as go
+import streamlit as st
+
+from spectral_profiling import record_figure
+
+# Budgets par défaut d'une figure et seuil de passage en WebGL (points par trace)
+BUDGET_POINTS_FIGURE = 50000
+BUDGET_OCTETS_FIGURE = 2_000_000
+SEUIL_WEBGL_POINTS = 10000
+
+# Taille JSON moyenne mesurée d'un point (x, y en flottants double précision) et traces jamais décimées
+OCTETS_PAR_POINT = 22
+POINTS_MIN_DECIMATION = 1000
+
+
+def decimate_min_max(y, n_points):
+    """Indices conservés par décimation min-max : environ `n_points` points, extrema de chaque intervalle
+
+    Les intervalles sont de taille égale sur l'indice ; le premier et le dernier
+    point sont toujours gardés.
+    """
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    n_intervalles = max(1, n_points // 2)
+    if n <= n_points:
+        return np.arange(n)
+    taille = int(np.ceil(n / n_intervalles))
+    complement = n_intervalles * taille - n
+    blocs = np.pad(y, (0, complement), mode='edge').reshape(n_intervalles, taille)
+    decalages = np.arange(n_intervalles) * taille
+    indices = np.concatenate([[0, n - 1],
+                              np.minimum(decalages + np.argmin(blocs, axis=1), n - 1),
+                              np.minimum(decalages + np.argmax(blocs, axis=1), n - 1)])
+    return np.unique(indices)
+
+
+def downsample_heatmap(z, n_lignes, n_colonnes):
+    """Carte réduite à au plus (n_lignes, n_colonnes) par maximum de blocs, et indices de début des blocs
+
+    Le maximum garde visibles les raies fines et les instants brefs ; la
+    réduction se fait sans copie remplie de la carte complète.
+    """
+    debuts_lignes = np.unique(np.linspace(0, z.shape[0], min(n_lignes, z.shape[0]), endpoint=False).astype(int))
+    debuts_colonnes = np.unique(np.linspace(0, z.shape[1], min(n_colonnes, z.shape[1]), endpoint=False).astype(int))
+    reduite = np.maximum.reduceat(np.maximum.reduceat(z, debuts_colonnes, axis=1), debuts_lignes, axis=0)
+    return reduite, debuts_lignes, debuts_colonnes
+
+
+def _trace_points(trace):
+    x = getattr(trace, 'x', None)
+    y = getattr(trace, 'y', None)
+    return max(len(x) if x is not None else 0, len(y) if y is not None else 0)
+
+
+def _is_line_trace(trace):
+    return (trace.type in ('scatter', 'scattergl') and trace.x is not None and trace.y is not None
+            and 'lines' in (trace.mode or 'lines'))
+
+
+def enforce_payload_budget(figure, budget_points=BUDGET_POINTS_FIGURE, budget_octets=BUDGET_OCTETS_FIGURE,
+                           seuil_webgl=SEUIL_WEBGL_POINTS):
+    """Figure conforme au budget et rapport de ce qui a été dégradé"""
+    points_par_trace = [_trace_points(trace) for trace in figure.data]
+    points_initiaux = sum(points_par_trace)
+    limite = int(min(budget_points, budget_octets / OCTETS_PAR_POINT))
+
+    # Points répartis entre les grandes traces en lignes, au prorata de leur taille
+    decimables = [i for i, trace in enumerate(figure.data)
+                  if _is_line_trace(trace) and points_par_trace[i] > POINTS_MIN_DECIMATION]
+    points_fixes = points_initiaux - sum(points_par_trace[i] for i in decimables)
+    disponibles = max(limite - points_fixes, POINTS_MIN_DECIMATION * len(decimables))
+    a_decimer = points_initiaux > limite and bool(decimables)
+
+    traces, decimees, webgl = [], [], []
+    for i, trace in enumerate(figure.data):
+        if i in decimables and (a_decimer or points_par_trace[i] > seuil_webgl):
+            proprietes = trace.to_plotly_json()
+            proprietes.pop('type', None)
+            if a_decimer:
+                cible = int(disponibles * points_par_trace[i] / sum(points_par_trace[j] for j in decimables))
+                indices = decimate_min_max(trace.y, cible)
+                proprietes['x'] = np.asarray(trace.x)[indices]
+                proprietes['y'] = np.asarray(trace.y)[indices]
+                decimees.append(i)
+            if len(proprietes['x']) > seuil_webgl or trace.type == 'scattergl':
+                try:
+                    trace = go.Scattergl(proprietes)
+                    webgl.append(i)
+                except ValueError:
+                    trace = go.Scatter(proprietes)
+            else:
+                trace = go.Scatter(proprietes)
+        traces.append(trace)
+
+    if not decimees and not webgl:
+        rendue = figure
+    else:
+        rendue = go.Figure(data=traces, layout=figure.layout)
+    points_rendus = sum(_trace_points(trace) for trace in rendue.data)
+    titre = figure.layout.title.text if figure.layout.title and figure.layout.title.text else ''
+    rapport = {
+        'figure': titre,
+        'traces': len(figure.data),
+        'points_initiaux': points_initiaux,
+        'points_rendus': points_rendus,
+        'octets_estimes_initiaux': points_initiaux * OCTETS_PAR_POINT,
+        'octets_estimes_rendus': points_rendus * OCTETS_PAR_POINT,
+        'traces_decimees': len(decimees),
+        'traces_webgl': len(webgl),
+        'degradee': bool(decimees or webgl)
+    }
+    return rendue, rapport
+
+
+def plotly_chart(figure, budget_points=BUDGET_POINTS_FIGURE, budget_octets=BUDGET_OCTETS_FIGURE, **kwargs):
+    """st.plotly_chart sous budget : figure allégée si nécessaire, rapport transmis à l'instrumentation"""
+    rendue, rapport = enforce_payload_budget(figure, budget_points, budget_octets)
+    record_figure(rendue, rapport)
+    resultat = st.plotly_chart(rendue, **kwargs)
+    if rapport['traces_decimees']:
+        st.caption(f"Affichage allégé : {rapport['points_initiaux']:,} → {rapport['points_rendus']:,} points "
+                   f"(décimation min-max, extrema conservés).")
+    return resultat
+
+
+def _reset_window(cle_curseur, fenetre):
+    st.session_state[cle_curseur] = fenetre
+
+
+def visible_window(cle, lambda_min, lambda_max, pas=0.01):
+    """Fenêtre (λ min, λ max) visible d'un spectre zoomable
+
+    La fenêtre suit un curseur à deux poignées et les sélections rectangulaires
+    faites sur le graphique affiché par `zoomable_chart` avec la même clé : une
+    nouvelle sélection devient la fenêtre de la réexécution suivante.
+    """
+    cle_curseur, cle_boite = f"{cle}_fenetre", f"{cle}_boite"
+    if cle_curseur not in st.session_state:
+        st.session_state[cle_curseur] = (lambda_min, lambda_max)
+
+    etat = st.session_state.get(cle)
+    boites = etat['selection']['box'] if etat and 'selection' in etat else []
+    if boites:
+        x0, x1 = sorted(boites[-1]['x'])
+        if (x0, x1) != st.session_state.get(cle_boite):
+            st.session_state[cle_boite] = (x0, x1)
+            debut = min(max(lambda_min, round(x0 / pas) * pas), lambda_max - pas)
+            st.session_state[cle_curseur] = (debut, min(lambda_max, max(round(x1 / pas) * pas, debut + pas)))
+
+    col1, col2 = st.columns([5, 1])
+    with col1:
+        fenetre = st.slider("Fenêtre visible (nm):", lambda_min, lambda_max, step=pas, key=cle_curseur)
+    with col2:
+        st.button("↺ Vue complète", key=f"{cle}_vue_complete", on_click=_reset_window,
+                  args=(cle_curseur, (lambda_min, lambda_max)))
+    return fenetre
+
+
+def zoomable_chart(figure, cle, **kwargs):
+    """Affiche un spectre dont la sélection rectangulaire horizontale sert de zoom (voir `visible_window`)"""
+    figure.update_layout(dragmode='select', selectdirection='h')
+    return plotly_chart(figure, key=cle, on_select='rerun', selection_mode='box', **kwargs)
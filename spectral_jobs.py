@@ -0,0 +1,106 @@
+"""Calculs longs en tâche de fond : progression, annulation des tâches périmées, dernier résultat"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class TacheAnnulee(Exception):
+    """Levée dans le fil de calcul quand la tâche a été remplacée par une plus récente"""
+
+
+class SynthesisJob:
+    """Tâche de calcul identifiée par une clé (les paramètres qui déterminent son résultat)"""
+
+    def __init__(self, cle, description=None):
+        self.cle = cle
+        self.description = description
+        self.progression = 0.0
+        self.annulation = threading.Event()
+        self.future = None
+        self.debut = time.monotonic()
+        self.duree_s = None
+
+    def report(self, fraction):
+        """Rappel de progression passé au calcul ; interrompt le calcul si la tâche est annulée"""
+        if self.annulation.is_set():
+            raise TacheAnnulee(self.cle)
+        self.progression = fraction
+
+    def cancel(self):
+        self.annulation.set()
+        self.future.cancel()
+
+    @property
+    def done(self):
+        return self.future.done()
+
+    @property
+    def state(self):
+        if self.annulation.is_set():
+            return 'annulee'
+        if not self.future.done():
+            return 'en_cours' if self.future.running() else 'en_attente'
+        return 'erreur' if self.future.exception() is not None else 'terminee'
+
+    def result(self):
+        return self.future.result()
+
+
+class SynthesisJobManager:
+    """File de calcul d'une session : au plus une tâche utile à la fois
+
+    Soumettre une nouvelle clé annule la tâche courante (retirée de la file si
+    elle n'a pas démarré, interrompue au prochain rappel de progression sinon) :
+    déplacer un curseur ne constitue jamais d'arriéré de calculs périmés. Le
+    dernier résultat terminé reste disponible pendant le calcul suivant.
+    """
+
+    def __init__(self, n_travailleurs=1):
+        self.executeur = ThreadPoolExecutor(max_workers=n_travailleurs, thread_name_prefix='synthese')
+        self.verrou = threading.Lock()
+        self.courante = None
+        self.derniere_terminee = None
+
+    def submit(self, cle, fonction, *args, description=None, **kwargs):
+        """Soumet `fonction(*args, progression=..., **kwargs)` sauf si la même clé est déjà courante
+
+        Une tâche courante annulée ou en erreur pour la même clé est resoumise.
+        """
+        with self.verrou:
+            if (self.courante is not None and self.courante.cle == cle and
+                    self.courante.state not in ('annulee', 'erreur')):
+                return self.courante
+            if self.courante is not None and not self.courante.done:
+                self.courante.cancel()
+            tache = SynthesisJob(cle, description)
+            tache.future = self.executeur.submit(self._run, tache, fonction, args, kwargs)
+            self.courante = tache
+            return tache
+
+    def _run(self, tache, fonction, args, kwargs):
+        resultat = fonction(*args, progression=tache.report, **kwargs)
+        tache.progression = 1.0
+        tache.duree_s = time.monotonic() - tache.debut
+        with self.verrou:
+            if not tache.annulation.is_set():
+                self.derniere_terminee = tache
+        return resultat
+
+    def latest(self):
+        """Dernière tâche terminée avec succès (ou None)"""
+        return self.derniere_terminee
+
+    def cancel_current(self):
+        """Annule la tâche courante si elle n'est pas terminée (son résultat n'est plus attendu)"""
+        with self.verrou:
+            if self.courante is not None and not self.courante.done:
+                self.courante.cancel()
+
+    def is_busy(self):
+        tache = self.courante
+        return tache is not None and not tache.done
+
+    def shutdown(self):
+        if self.courante is not None and not self.courante.done:
+            self.courante.cancel()
+        self.executeur.shutdown(wait=False)
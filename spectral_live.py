@@ -0,0 +1,264 @@
+"""Acquisition en direct : tampon circulaire de spectres, sources locales et suivi des raies"""
+import os
+import socket
+import threading
+import time
+
+import numpy as np
+
+from spectral_synthesis import synthesize_lines
+
+# Cadence nominale des spectromètres et pause du fil d'acquisition quand la source est vide
+CADENCE_SPECTROMETRE = 50.0
+PAUSE_ACQUISITION_S = 0.005
+
+
+class SpectrumRingBuffer:
+    """Tampon circulaire de taille fixe (trames × points) avec moyenne glissante
+
+    La somme des trames présentes est mise à jour à chaque ajout (retrait de la
+    trame écrasée, ajout de la nouvelle), de sorte que la moyenne coûte O(points).
+    Elle est recalculée exactement à chaque tour complet pour éviter la dérive
+    numérique. Une moyenne exponentielle est tenue en parallèle.
+    """
+
+    def __init__(self, n_trames, n_points, facteur_exponentiel=0.1):
+        self.trames = np.zeros((n_trames, n_points))
+        self.horodatages = np.full(n_trames, np.nan)
+        self.somme = np.zeros(n_points)
+        self.moyenne_exponentielle = np.zeros(n_points)
+        self.facteur_exponentiel = facteur_exponentiel
+        self.position = 0
+        self.total = 0
+        self.verrou = threading.Lock()
+
+    def __len__(self):
+        return min(self.total, len(self.trames))
+
+    def push(self, trame, horodatage=None):
+        """Ajoute une trame en écrasant la plus ancienne si le tampon est plein"""
+        trame = np.asarray(trame, dtype=float)
+        with self.verrou:
+            if self.total >= len(self.trames):
+                self.somme -= self.trames[self.position]
+            self.trames[self.position] = trame
+            self.horodatages[self.position] = time.monotonic() if horodatage is None else horodatage
+            self.somme += trame
+            if self.total == 0:
+                self.moyenne_exponentielle[:] = trame
+            else:
+                self.moyenne_exponentielle += self.facteur_exponentiel * (trame - self.moyenne_exponentielle)
+            self.position = (self.position + 1) % len(self.trames)
+            self.total += 1
+            if self.position == 0:
+                self.somme = self.trames.sum(axis=0)
+
+    def latest(self):
+        """Dernière trame reçue (copie) et nombre total de trames reçues"""
+        with self.verrou:
+            if self.total == 0:
+                return None, 0
+            return self.trames[self.position - 1].copy(), self.total
+
+    def mean(self):
+        """Moyenne glissante sur les trames présentes dans le tampon"""
+        with self.verrou:
+            return self.somme / max(len(self), 1)
+
+    def ordered(self):
+        """Trames et horodatages présents, de la plus ancienne à la plus récente (copies)"""
+        with self.verrou:
+            n = len(self)
+            indices = (self.position - n + np.arange(n)) % len(self.trames)
+            return self.trames[indices], self.horodatages[indices]
+
+    def frame_rate(self):
+        """Cadence d'acquisition mesurée sur le contenu du tampon (trames/s)"""
+        _, horodatages = self.ordered()
+        if len(horodatages) < 2 or horodatages[-1] <= horodatages[0]:
+            return 0.0
+        return (len(horodatages) - 1) / (horodatages[-1] - horodatages[0])
+
+
+class SimulatorSource:
+    """Spectromètre simulé : trames synthétisées à partir du catalogue à cadence fixe
+
+    Les trames dues depuis le dernier appel sont générées d'un bloc ; les
+    intensités scintillent et les raies dérivent lentement pour exercer le suivi.
+    """
+
+    def __init__(self, grille, centres, intensites, largeurs, cadence=CADENCE_SPECTROMETRE,
+                 bruit=0.01, derive_nm=0.05, graine=None):
+        self.grille = np.asarray(grille, dtype=float)
+        self.centres = np.asarray(centres, dtype=float)
+        self.intensites = np.asarray(intensites, dtype=float)
+        self.largeurs = np.asarray(largeurs, dtype=float)
+        self.cadence = cadence
+        self.bruit = bruit
+        self.derive_nm = derive_nm
+        self.generateur = np.random.default_rng(graine)
+        self.debut = time.monotonic()
+        self.emises = 0
+
+    def read_frames(self):
+        maintenant = time.monotonic()
+        dues = int((maintenant - self.debut) * self.cadence) - self.emises
+        trames = []
+        for k in range(max(dues, 0)):
+            instant = (self.emises + k) / self.cadence
+            derive = self.derive_nm * np.sin(2 * np.pi * instant / 10.0)
+            scintillation = 1 + 0.1 * self.generateur.standard_normal(len(self.centres))
+            trame = synthesize_lines(self.grille, self.centres + derive, self.intensites * scintillation, self.largeurs)
+            trames.append(trame + self.generateur.normal(0, self.bruit, len(self.grille)))
+        self.emises += max(dues, 0)
+        return trames
+
+    def close(self):
+        pass
+
+
+class FileTailSource:
+    """Lit les trames ajoutées à la fin d'un fichier texte (une trame par ligne, valeurs séparées par des virgules)
+
+    La lecture reprend à la dernière position lue ; une ligne incomplète est
+    conservée jusqu'à l'arrivée de sa fin. Les trames de taille inattendue sont ignorées.
+    """
+
+    def __init__(self, chemin, n_points, depuis_debut=False):
+        self.chemin = chemin
+        self.n_points = n_points
+        self.position = 0 if depuis_debut or not os.path.exists(chemin) else os.path.getsize(chemin)
+        self.reste = b''
+
+    def read_frames(self):
+        if not os.path.exists(self.chemin):
+            return []
+        if os.path.getsize(self.chemin) < self.position:
+            # Fichier tronqué ou remplacé : reprise au début
+            self.position, self.reste = 0, b''
+        with open(self.chemin, 'rb') as fichier:
+            fichier.seek(self.position)
+            donnees = fichier.read()
+        self.position += len(donnees)
+        lignes = (self.reste + donnees).split(b'\n')
+        self.reste = lignes.pop()
+
+        trames = []
+        for ligne in lignes:
+            if not ligne.strip() or ligne.startswith(b'#'):
+                continue
+            try:
+                trame = np.array(ligne.decode().split(','), dtype=float)
+            except ValueError:
+                continue
+            if len(trame) == self.n_points:
+                trames.append(trame)
+        return trames
+
+    def close(self):
+        pass
+
+
+class UnixSocketSource:
+    """Reçoit des trames binaires (float32 petit-boutiste, n_points par trame) d'un socket UNIX en flux
+
+    La fermeture du socket par l'émetteur lève `ConnectionError` une fois les
+    trames complètes déjà reçues rendues.
+    """
+
+    def __init__(self, chemin, n_points):
+        self.n_points = n_points
+        self.taille_trame = 4 * n_points
+        self.tampon = bytearray()
+        self.fermee = False
+        self.connexion = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.connexion.connect(chemin)
+        self.connexion.setblocking(False)
+
+    def read_frames(self):
+        while not self.fermee:
+            try:
+                donnees = self.connexion.recv(max(self.taille_trame, 65536))
+            except BlockingIOError:
+                break
+            if not donnees:
+                self.fermee = True
+                break
+            self.tampon.extend(donnees)
+
+        n_trames = len(self.tampon) // self.taille_trame
+        if n_trames == 0:
+            if self.fermee:
+                incomplete = f" ({len(self.tampon)} octets de trame incomplète perdus)" if self.tampon else ""
+                raise ConnectionError(f"socket fermé par l'émetteur{incomplete}")
+            return []
+        bloc = np.frombuffer(bytes(self.tampon[:n_trames * self.taille_trame]), dtype='<f4')
+        del self.tampon[:n_trames * self.taille_trame]
+        return list(bloc.reshape(n_trames, self.n_points).astype(float))
+
+    def close(self):
+        self.connexion.close()
+
+
+class LiveFeed:
+    """Fil d'acquisition qui vide la source dans le tampon, indépendamment du rafraîchissement de l'affichage
+
+    Une erreur de la source (déconnexion comprise) arrête le fil et reste dans `erreur`.
+    """
+
+    def __init__(self, source, tampon):
+        self.source = source
+        self.tampon = tampon
+        self.erreur = None
+        self.arret = threading.Event()
+        self.fil = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self.arret.is_set():
+            try:
+                trames = self.source.read_frames()
+            except OSError as erreur:
+                self.erreur = str(erreur)
+                break
+            for trame in trames:
+                self.tampon.push(trame)
+            if not trames:
+                time.sleep(PAUSE_ACQUISITION_S)
+
+    def start(self):
+        self.fil.start()
+        return self
+
+    @property
+    def state(self):
+        if self.erreur is not None:
+            return 'erreur'
+        return 'en_cours' if self.fil.is_alive() else 'arretee'
+
+    def stop(self):
+        self.arret.set()
+        self.fil.join(timeout=1.0)
+        self.source.close()
+
+
+def track_lines(grille, trames, centres, demi_fenetre_nm):
+    """Position (barycentre) et intensité maximale de chaque raie dans chaque trame
+
+    Les fenêtres autour des centres sont extraites d'un bloc (trames × raies ×
+    points de fenêtre) ; le fond de chaque fenêtre (son minimum) est soustrait
+    avant le calcul du barycentre.
+    """
+    grille = np.asarray(grille, dtype=float)
+    trames = np.atleast_2d(trames)
+    centres = np.asarray(centres, dtype=float)
+    pas = grille[1] - grille[0]
+    largeur = max(1, int(round(demi_fenetre_nm / pas)))
+    premiers = np.searchsorted(grille, centres) - largeur
+    indices = np.clip(premiers[:, None] + np.arange(2 * largeur + 1)[None, :], 0, len(grille) - 1)
+
+    fenetres = trames[:, indices]
+    signal = fenetres - fenetres.min(axis=2, keepdims=True)
+    poids = signal.sum(axis=2)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        positions = np.where(poids > 0, (signal * grille[indices][None]).sum(axis=2) / poids, centres[None, :])
+    return positions, fenetres.max(axis=2)
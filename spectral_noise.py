@@ -0,0 +1,78 @@
+"""Bruit de détecteur et probabilité de détection des raies par Monte Carlo vectorisé
+
+Le modèle de détecteur convertit un spectre attendu (photoélectrons par pixel)
+en comptes numériques : bruit de photons et courant d'obscurité poissoniens,
+bruit de lecture gaussien, gain (e⁻/ADU) et quantification. Toutes les
+réalisations d'un bloc de concentrations sont tirées en une seule opération sur
+un tableau (concentrations × réalisations × pixels), limité aux pixels de la
+fenêtre de la raie : la taille des ensembles ne coûte que du calcul vectoriel.
+"""
+from collections import namedtuple
+
+import numpy as np
+
+from spectral_synthesis import TAILLE_BLOC_ELEMENTS
+
+# Paramètres du détecteur : flux (e⁻/s par unité d'intensité), pose (s), obscurité (e⁻/s/pixel), lecture (e⁻), gain
+Detecteur = namedtuple('Detecteur', ['flux_e_s', 'temps_pose_s', 'courant_obscurite_e_s', 'bruit_lecture_e',
+                                     'gain_e_adu'])
+DETECTEUR_DEFAUT = Detecteur(flux_e_s=2000.0, temps_pose_s=0.1, courant_obscurite_e_s=50.0, bruit_lecture_e=8.0,
+                             gain_e_adu=2.0)
+
+# Taux de fausses alarmes du seuil de détection et probabilité définissant la limite de détection
+TAUX_FAUSSE_ALARME = 0.01
+PROBABILITE_LIMITE = 0.95
+
+
+def expected_electrons(intensites, detecteur=DETECTEUR_DEFAUT):
+    """Photoélectrons attendus par pixel (signal et courant d'obscurité) pour un spectre en intensité relative"""
+    return (np.asarray(intensites, dtype=float) * detecteur.flux_e_s +
+            detecteur.courant_obscurite_e_s) * detecteur.temps_pose_s
+
+
+def detector_counts(electrons, generateur, detecteur=DETECTEUR_DEFAUT):
+    """Comptes (ADU) d'un tableau d'espérances de photoélectrons, toutes réalisations tirées en une fois"""
+    bruts = generateur.poisson(electrons) + generateur.normal(0.0, detecteur.bruit_lecture_e, np.shape(electrons))
+    return np.round(bruts / detecteur.gain_e_adu)
+
+
+def detection_probability(signal, fond, concentrations, n_realisations, detecteur=DETECTEUR_DEFAUT,
+                          taux_fausse_alarme=TAUX_FAUSSE_ALARME, generateur=None):
+    """Probabilité de détecter une raie à chaque concentration, et seuil de la statistique
+
+    `signal` est le profil de la raie (intensité relative par pixel de la fenêtre)
+    à concentration unité, `fond` le spectre des autres contributions sur la même
+    fenêtre. La statistique est le filtre adapté au profil appliqué aux comptes
+    dont on retranche le fond attendu ; le seuil est le quantile 1 − α de la
+    statistique sur des réalisations sans la raie.
+    """
+    generateur = np.random.default_rng() if generateur is None else generateur
+    signal = np.asarray(signal, dtype=float)
+    poids = signal / max(np.sum(signal ** 2), np.finfo(float).tiny) ** 0.5
+    fond_adu = expected_electrons(fond, detecteur) / detecteur.gain_e_adu
+
+    def statistique(concentrations_bloc):
+        electrons = expected_electrons(np.multiply.outer(concentrations_bloc, signal) + fond, detecteur)
+        tirages = np.broadcast_to(electrons[:, None, :], (len(concentrations_bloc), n_realisations, len(signal)))
+        return (detector_counts(tirages, generateur, detecteur) - fond_adu) @ poids
+
+    seuil = np.quantile(statistique(np.zeros(1))[0], 1 - taux_fausse_alarme)
+    taille_bloc = max(1, TAILLE_BLOC_ELEMENTS // (n_realisations * len(signal)))
+    concentrations = np.asarray(concentrations, dtype=float)
+    probabilites = np.concatenate([
+        np.mean(statistique(concentrations[debut:debut + taille_bloc]) > seuil, axis=1)
+        for debut in range(0, len(concentrations), taille_bloc)])
+    return probabilites, seuil
+
+
+def detection_limit(concentrations, probabilites, niveau=PROBABILITE_LIMITE):
+    """Plus petite concentration dont la probabilité de détection atteint `niveau` (interpolée en log), ou NaN"""
+    atteintes = np.flatnonzero(np.asarray(probabilites) >= niveau)
+    if not len(atteintes):
+        return np.nan
+    i = atteintes[0]
+    if i == 0:
+        return float(concentrations[0])
+    p0, p1 = probabilites[i - 1], probabilites[i]
+    fraction = (niveau - p0) / (p1 - p0) if p1 > p0 else 1.0
+    return float(np.exp(np.log(concentrations[i - 1]) + fraction * np.log(concentrations[i] / concentrations[i - 1])))
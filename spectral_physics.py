@@ -0,0 +1,457 @@
+"""Physique atomique vectorisée : niveaux d'énergie et règles de sélection"""
+import os
+import re
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+from scipy import constants
+
+# Constantes utiles (eV, nm)
+ENERGIE_RYDBERG_EV = constants.physical_constants['Rydberg constant times hc in eV'][0]
+HC_EV_NM = constants.h * constants.c / constants.e * 1e9
+
+LETTRES_ORBITALES = np.array(['s', 'p', 'd', 'f', 'g', 'h', 'i', 'k', 'l', 'm', 'n', 'o', 'q', 'r', 't', 'u'])
+
+
+def orbital_letters(l):
+    """Convertit un tableau de nombres quantiques orbitaux en lettres"""
+    l = np.asarray(l, dtype=int)
+    lettres = LETTRES_ORBITALES[np.minimum(l, len(LETTRES_ORBITALES) - 1)]
+    return np.where(l < len(LETTRES_ORBITALES), lettres, np.char.add(np.char.add('(', l.astype(str)), ')'))
+
+
+def format_j(j):
+    """Formate un tableau de j demi-entiers (ex. 1.5 -> '3/2')"""
+    deux_j = np.rint(2 * np.asarray(j)).astype(int)
+    return np.where(deux_j % 2 == 1,
+                    np.char.add(deux_j.astype(str), '/2'),
+                    (deux_j // 2).astype(str))
+
+
+def build_level_table(symbole, niveaux_energie, n_max=None):
+    """Construit la table des niveaux (énergie, n, l, j, parité) d'un élément
+
+    `niveaux_energie` contient les énergies de liaison (eV) des niveaux successifs,
+    le premier étant le fondamental. Au-delà des niveaux tabulés, la série est
+    prolongée par la formule de Rydberg-Ritz avec le défaut quantique du dernier
+    niveau connu. Chaque niveau n est décomposé en sous-niveaux l = 0..n-1 et
+    j = l ± 1/2 (structure fine négligée en énergie).
+    """
+    liaisons = np.asarray(niveaux_energie, dtype=float)
+    n_tab = len(liaisons)
+    n_max = n_tab if n_max is None else int(n_max)
+
+    # Prolongement de Rydberg-Ritz : E_n = R / (n - δ)²
+    n = np.arange(1, n_max + 1)
+    defaut_quantique = n_tab - np.sqrt(ENERGIE_RYDBERG_EV / liaisons[-1])
+    liaison_n = ENERGIE_RYDBERG_EV / (n - defaut_quantique) ** 2
+    liaison_n[:min(n_tab, n_max)] = liaisons[:n_max]
+    excitation_n = liaisons[0] - liaison_n
+
+    # Sous-niveaux (n, l) puis (n, l, j)
+    n_l = np.repeat(n, n)
+    l = np.arange(len(n_l)) - np.repeat(np.cumsum(n) - n, n)
+    n_lj = np.repeat(n_l, 2)
+    l_lj = np.repeat(l, 2)
+    j_lj = l_lj + np.tile([-0.5, 0.5], len(l))
+    garde = j_lj >= 0
+    n_lj, l_lj, j_lj = n_lj[garde], l_lj[garde], j_lj[garde]
+
+    return pd.DataFrame({
+        'element': symbole,
+        'n': n_lj,
+        'l': l_lj,
+        'j': j_lj,
+        'parite': np.where(l_lj % 2 == 0, 1, -1),
+        'energie_eV': excitation_n[n_lj - 1]
+    })
+
+
+# Facteurs d'ordre de grandeur des multipôles par rapport à E1
+CONSTANTE_STRUCTURE_FINE = constants.fine_structure
+FACTEUR_M1 = (CONSTANTE_STRUCTURE_FINE / 2) ** 2
+MULTIPOLES = ('E1', 'M1', 'E2')
+
+
+def selection_rule_mask(l_haut, l_bas, j_haut, j_bas, parite_haut, parite_bas, regle='E1',
+                        m_haut=None, m_bas=None):
+    """Applique les règles de sélection E1, M1 ou E2 sous forme de masque
+
+    Règles appliquées (approximation à un électron actif) :
+    - E1 : Δl = ±1, Δj = 0, ±1 (pas 0↔0), Δm = 0, ±1, changement de parité
+    - M1 : Δl = 0, Δj = 0, ±1 (pas 0↔0), Δm = 0, ±1, même parité
+    - E2 : Δl = 0, ±2, Δj ≤ 2 (pas 0↔0, 0↔1, ½↔½), Δm ≤ 2, même parité
+    Le test sur m n'est effectué que si `m_haut` et `m_bas` sont fournis.
+    """
+    delta_l = np.abs(l_haut - l_bas)
+    delta_j = np.abs(j_haut - j_bas)
+    j_nuls = (j_haut == 0) & (j_bas == 0)
+
+    if regle == 'E1':
+        masque = (delta_l == 1) & (delta_j <= 1) & ~j_nuls & (parite_haut != parite_bas)
+        delta_m_max = 1
+    elif regle == 'M1':
+        masque = (delta_l == 0) & (delta_j <= 1) & ~j_nuls & (parite_haut == parite_bas)
+        delta_m_max = 1
+    elif regle == 'E2':
+        somme_j = j_haut + j_bas
+        masque = (((delta_l == 0) | (delta_l == 2)) & (delta_j <= 2) & (somme_j >= 2) &
+                  (parite_haut == parite_bas))
+        delta_m_max = 2
+    else:
+        raise ValueError(f"Règle de sélection inconnue: {regle}")
+
+    if m_haut is not None and m_bas is not None:
+        masque &= np.abs(m_haut - m_bas) <= delta_m_max
+    return masque
+
+
+def expand_m_sublevels(etats):
+    """Développe chaque état (n, l, j) en ses 2j+1 sous-niveaux m"""
+    deux_j_plus_un = np.rint(2 * etats['j'].to_numpy() + 1).astype(int)
+    repetes = etats.loc[etats.index.repeat(deux_j_plus_un)].reset_index(drop=True)
+    debut = np.repeat(np.cumsum(deux_j_plus_un) - deux_j_plus_un, deux_j_plus_un)
+    rang = np.arange(len(repetes)) - debut
+    repetes['m'] = rang - repetes['j'].to_numpy()
+    return repetes
+
+
+def multipole_strength(regle, delta_e, j_haut, l_haut, l_bas):
+    """Force relative approchée d'une transition selon son type multipolaire"""
+    if regle == 'E1':
+        return delta_e ** 3 * (2 * j_haut + 1) * np.maximum(l_haut, l_bas) / (2 * l_haut + 1)
+    if regle == 'M1':
+        return FACTEUR_M1 * delta_e ** 3 * (2 * j_haut + 1)
+    # E2 : (k a₀)² par rapport à E1, soit un facteur (α ΔE / 2 E_R)² et une loi en ν⁵
+    return (CONSTANTE_STRUCTURE_FINE / (2 * ENERGIE_RYDBERG_EV)) ** 2 * delta_e ** 5 * (2 * j_haut + 1)
+
+
+def evaluate_selection_rules(etats_initiaux, etats_finaux, multipoles=MULTIPOLES, energie_min_eV=1e-3):
+    """Évalue en un appel les règles de sélection entre deux ensembles d'états
+
+    Les états sont des tables (n, l, j, parite, energie_eV) avec une colonne `m`
+    optionnelle. Toutes les paires initial × final de désexcitation
+    (E_initial > E_final) sont testées pour chaque multipôle demandé ; seules les
+    transitions permises sont renvoyées, avec énergie, longueur d'onde et force
+    relative normalisée sur l'ensemble du résultat.
+    """
+    i, f = np.meshgrid(np.arange(len(etats_initiaux)), np.arange(len(etats_finaux)), indexing='ij')
+    i, f = i.ravel(), f.ravel()
+
+    def colonne(etats, nom, indices):
+        return etats[nom].to_numpy()[indices]
+
+    n_i, n_f = colonne(etats_initiaux, 'n', i), colonne(etats_finaux, 'n', f)
+    l_i, l_f = colonne(etats_initiaux, 'l', i), colonne(etats_finaux, 'l', f)
+    j_i, j_f = colonne(etats_initiaux, 'j', i), colonne(etats_finaux, 'j', f)
+    p_i, p_f = colonne(etats_initiaux, 'parite', i), colonne(etats_finaux, 'parite', f)
+    delta_e = colonne(etats_initiaux, 'energie_eV', i) - colonne(etats_finaux, 'energie_eV', f)
+    avec_m = 'm' in etats_initiaux and 'm' in etats_finaux
+    m_i = colonne(etats_initiaux, 'm', i) if avec_m else None
+    m_f = colonne(etats_finaux, 'm', f) if avec_m else None
+
+    resultats = []
+    for regle in multipoles:
+        masque = (delta_e > energie_min_eV) & selection_rule_mask(
+            l_i, l_f, j_i, j_f, p_i, p_f, regle, m_i, m_f)
+        resultat = {
+            'type': regle,
+            'n_initial': n_i[masque], 'l_initial': l_i[masque], 'j_initial': j_i[masque],
+            'n_final': n_f[masque], 'l_final': l_f[masque], 'j_final': j_f[masque],
+            'energie_eV': delta_e[masque],
+            'longueur_onde_nm': HC_EV_NM / delta_e[masque],
+            'force_relative': multipole_strength(regle, delta_e[masque], j_i[masque], l_i[masque], l_f[masque])
+        }
+        if avec_m:
+            resultat['m_initial'] = m_i[masque]
+            resultat['m_final'] = m_f[masque]
+        resultats.append(pd.DataFrame(resultat))
+
+    transitions = pd.concat(resultats, ignore_index=True)
+    if len(transitions):
+        transitions['force_relative'] /= transitions['force_relative'].max()
+    return transitions
+
+
+def build_level_transitions(niveaux, regle='E1', energie_min_eV=1e-3, noms_series=None):
+    """Énumère toutes les paires de niveaux et garde les transitions permises
+
+    Toutes les paires sont générées en tableaux (indices du triangle supérieur),
+    les règles de sélection sont appliquées comme masques vectorisés et les
+    transitions retenues sont renvoyées au format du tableau des transitions.
+    Retourne aussi le nombre de paires candidates examinées.
+    """
+    niveaux = niveaux.sort_values('energie_eV', kind='stable').reset_index(drop=True)
+    energie = niveaux['energie_eV'].to_numpy()
+    n = niveaux['n'].to_numpy()
+    l = niveaux['l'].to_numpy()
+    j = niveaux['j'].to_numpy()
+    parite = niveaux['parite'].to_numpy()
+
+    # Paires (bas, haut) triées par énergie croissante
+    bas, haut = np.triu_indices(len(niveaux), k=1)
+    n_candidats = len(bas)
+
+    delta_e = energie[haut] - energie[bas]
+    masque = (delta_e > energie_min_eV) & selection_rule_mask(
+        l[haut], l[bas], j[haut], j[bas], parite[haut], parite[bas], regle)
+    bas, haut, delta_e = bas[masque], haut[masque], delta_e[masque]
+
+    # Force relative approchée : loi E1 en ν³ atténuée en 1/n³
+    force = multipole_strength(regle, delta_e, j[haut], l[haut], l[bas]) / n[haut] ** 3
+    if len(force):
+        force = force / force.max()
+
+    etiquette_haut = np.char.add(np.char.add(n[haut].astype(str), orbital_letters(l[haut])), format_j(j[haut]))
+    etiquette_bas = np.char.add(np.char.add(n[bas].astype(str), orbital_letters(l[bas])), format_j(j[bas]))
+
+    noms_series = noms_series or {}
+    n_uniques, inverse = np.unique(n[bas], return_inverse=True)
+    series = np.array([noms_series.get(k, f'Niveaux n={k}') for k in n_uniques], dtype=object)[inverse]
+
+    transitions = pd.DataFrame({
+        'element': niveaux['element'].iloc[0] if len(niveaux) else '',
+        'serie': series,
+        'transition': np.char.add(np.char.add(etiquette_haut, '→'), etiquette_bas),
+        'niveau_depart': n[haut],
+        'niveau_arrivee': n[bas],
+        'longueur_onde_nm': HC_EV_NM / delta_e,
+        'energie_eV': delta_e,
+        'intensite_relative': force
+    })
+    return transitions, n_candidats
+
+
+# Effet Zeeman anomal
+MAGNETON_BOHR_EV = constants.physical_constants['Bohr magneton in eV/T'][0]
+EXPOSANTS = str.maketrans('⁰¹²³⁴⁵⁶⁷⁸⁹', '0123456789')
+INDICES = str.maketrans('₀₁₂₃₄₅₆₇₈₉', '0123456789')
+LETTRES_TERMES = 'SPDFGHIK'
+TERME_EXPOSANT = re.compile(r'^\d*([⁰¹²³⁴⁵⁶⁷⁸⁹]+)([SPDFGHIK])(.+)$')
+TERME_ASCII = re.compile(r'^(\d)([SPDFGHIK])(.+)$')
+
+
+def parse_term(terme):
+    """Décompose un terme spectroscopique (ex. '²P3/2', '6³P₁') en (S, L, J)"""
+    if not isinstance(terme, str):
+        return np.nan, np.nan, np.nan
+    correspondance = TERME_EXPOSANT.match(terme.strip()) or TERME_ASCII.match(terme.strip())
+    if correspondance is None:
+        return np.nan, np.nan, np.nan
+    multiplicite, lettre, j = correspondance.groups()
+    try:
+        j = j.translate(INDICES)
+        j = float(j.split('/')[0]) / float(j.split('/')[1]) if '/' in j else float(j)
+    except (ValueError, ZeroDivisionError):
+        return np.nan, np.nan, np.nan
+    s = (int(multiplicite.translate(EXPOSANTS)) - 1) / 2
+    return s, float(LETTRES_TERMES.index(lettre)), j
+
+
+def term_arrays(termes):
+    """Convertit une suite de termes en tableaux (S, L, J), chaque terme distinct étant analysé une fois"""
+    termes = np.asarray(termes, dtype=object)
+    uniques, inverse = np.unique(termes.astype(str), return_inverse=True)
+    analyses = {terme: parse_term(terme) for terme in uniques}
+    valeurs = np.array([analyses[terme] for terme in uniques], dtype=float).reshape(-1, 3)[inverse]
+    # Les valeurs manquantes (None, NaN) ne donnent pas de terme exploitable
+    valeurs[np.array([not isinstance(t, str) for t in termes])] = np.nan
+    return valeurs[:, 0], valeurs[:, 1], valeurs[:, 2]
+
+
+def lande_g(s, l, j):
+    """Facteur de Landé g_J en couplage LS (0 pour J = 0)"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        g = 1 + (j * (j + 1) + s * (s + 1) - l * (l + 1)) / (2 * j * (j + 1))
+    return np.where(j > 0, g, 0.0)
+
+
+def dipole_clebsch_gordan_squared(j_bas, m_haut, q, j_haut):
+    """Carré du coefficient <j_bas, m_haut - q; 1, q | j_haut, m_haut> (composante dipolaire)"""
+    j1, m = j_bas, m_haut
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # j_haut = j_bas + 1
+        plus = np.select(
+            [q == 1, q == 0],
+            [(j1 + m) * (j1 + m + 1) / ((2 * j1 + 1) * (2 * j1 + 2)),
+             (j1 - m + 1) * (j1 + m + 1) / ((2 * j1 + 1) * (j1 + 1))],
+            (j1 - m) * (j1 - m + 1) / ((2 * j1 + 1) * (2 * j1 + 2)))
+        # j_haut = j_bas
+        egal = np.select(
+            [q == 1, q == 0],
+            [(j1 + m) * (j1 - m + 1) / (2 * j1 * (j1 + 1)),
+             m ** 2 / (j1 * (j1 + 1))],
+            (j1 - m) * (j1 + m + 1) / (2 * j1 * (j1 + 1)))
+        # j_haut = j_bas - 1
+        moins = np.select(
+            [q == 1, q == 0],
+            [(j1 - m) * (j1 - m + 1) / (2 * j1 * (2 * j1 + 1)),
+             (j1 - m) * (j1 + m) / (j1 * (2 * j1 + 1))],
+            (j1 + m + 1) * (j1 + m) / (2 * j1 * (2 * j1 + 1)))
+    delta_j = np.rint(j_haut - j_bas)
+    resultat = np.select([delta_j == 1, delta_j == 0, delta_j == -1], [plus, egal, moins], 0.0)
+    return np.nan_to_num(np.clip(resultat, 0.0, None))
+
+
+def zeeman_components(centres, intensites, termes_haut, termes_bas, champ_B, observation='transverse'):
+    """Calcule en bloc les composantes Zeeman π/σ de toutes les raies
+
+    Les positions proviennent des facteurs de Landé des niveaux haut et bas et de
+    tous les sous-niveaux M ; les forces relatives des coefficients de
+    Clebsch-Gordan dipolaires. Les raies sans termes connus reçoivent le triplet
+    normal (¹P₁ → ¹S₀). En observation transverse les composantes σ comptent pour
+    moitié, en observation longitudinale les composantes π disparaissent.
+    L'intensité totale de chaque raie est conservée.
+    """
+    centres = np.asarray(centres, dtype=float)
+    intensites = np.broadcast_to(np.asarray(intensites, dtype=float), centres.shape)
+    s_h, l_h, j_h = term_arrays(termes_haut)
+    s_b, l_b, j_b = term_arrays(termes_bas)
+
+    inconnus = np.isnan(j_h) | np.isnan(j_b) | np.isnan(s_h) | np.isnan(s_b)
+    s_h, l_h, j_h = np.where(inconnus, 0, s_h), np.where(inconnus, 1, l_h), np.where(inconnus, 1, j_h)
+    s_b, l_b, j_b = np.where(inconnus, 0, s_b), np.where(inconnus, 0, l_b), np.where(inconnus, 0, j_b)
+    g_h, g_b = lande_g(s_h, l_h, j_h), lande_g(s_b, l_b, j_b)
+
+    # Tableau (raie, M_haut) complété jusqu'au plus grand J de la liste
+    n_m = int(np.rint(2 * j_h.max() + 1)) if len(centres) else 1
+    m_haut = -j_h[:, None] + np.arange(n_m)[None, :]
+    valide_haut = m_haut <= j_h[:, None] + 1e-9
+
+    q = np.array([-1, 0, 1])[:, None, None]
+    m_bas = m_haut[None, :, :] - q
+    valide = valide_haut[None, :, :] & (np.abs(m_bas) <= j_b[None, :, None] + 1e-9)
+    force = dipole_clebsch_gordan_squared(j_b[None, :, None], m_haut[None, :, :], q, j_h[None, :, None])
+
+    poids_polarisation = {'transverse': [0.5, 1.0, 0.5], 'longitudinale': [1.0, 0.0, 1.0]}[observation]
+    force = force * np.array(poids_polarisation)[:, None, None]
+    valide &= force > 0
+
+    indice_raie = np.broadcast_to(np.arange(len(centres))[None, :, None], valide.shape)[valide]
+    delta_e = MAGNETON_BOHR_EV * champ_B * (g_h[None, :, None] * m_haut[None, :, :] -
+                                            g_b[None, :, None] * m_bas)
+    energie = HC_EV_NM / centres[indice_raie] + delta_e[valide]
+    force = force[valide]
+
+    # Normalisation : la somme des composantes de chaque raie vaut son intensité
+    somme = np.bincount(indice_raie, weights=force, minlength=len(centres))
+    force = intensites[indice_raie] * force / somme[indice_raie]
+
+    polarisation = np.array(['σ-', 'π', 'σ+'])[np.broadcast_to(np.arange(3)[:, None, None], valide.shape)[valide]]
+    return pd.DataFrame({
+        'indice_raie': indice_raie,
+        'longueur_onde': HC_EV_NM / energie,
+        'intensite': force,
+        'polarisation': polarisation,
+        'g_haut': g_h[indice_raie],
+        'g_bas': g_b[indice_raie]
+    })
+
+
+# Élargissement Stark des raies de l'hydrogène
+CHEMIN_TABLES_STARK = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'stark_hydrogene.csv')
+
+
+@lru_cache(maxsize=None)
+def load_stark_tables(chemin=CHEMIN_TABLES_STARK):
+    """Charge une seule fois les tables de largeurs Stark (raies × log Ne × T)
+
+    Retourne les axes log10(Ne) et T, l'index (n_haut, n_bas) -> ligne de table
+    et le tableau log10(largeur) de forme (raies, densités, températures).
+    """
+    table = pd.read_csv(chemin, comment='#')
+    axe_ne = np.sort(table['log10_ne_cm3'].unique())
+    axe_t = np.sort(table['temperature_K'].unique())
+    raies = table[['n_haut', 'n_bas']].drop_duplicates().sort_values(['n_bas', 'n_haut'])
+    index_raies = {(int(h), int(b)): i for i, (h, b) in enumerate(raies.itertuples(index=False))}
+
+    largeurs = np.full((len(index_raies), len(axe_ne), len(axe_t)), np.nan)
+    i_raie = [index_raies[(h, b)] for h, b in zip(table['n_haut'], table['n_bas'])]
+    largeurs[i_raie,
+             np.searchsorted(axe_ne, table['log10_ne_cm3']),
+             np.searchsorted(axe_t, table['temperature_K'])] = np.log10(table['largeur_stark_nm'])
+    for tableau in (axe_ne, axe_t, largeurs):
+        tableau.setflags(write=False)
+    return axe_ne, axe_t, index_raies, largeurs
+
+
+def _bracket(axe, valeur):
+    """Indice inférieur et poids linéaire de `valeur` sur un axe trié (bornée aux extrémités)"""
+    valeur = min(max(valeur, axe[0]), axe[-1])
+    i = int(min(np.searchsorted(axe, valeur, side='right') - 1, len(axe) - 2))
+    return i, (valeur - axe[i]) / (axe[i + 1] - axe[i])
+
+
+@lru_cache(maxsize=4096)
+def stark_interpolation_weights(log_ne, temperature):
+    """Indices et poids bilinéaires (log Ne, T), mis en cache par couple (densité, température)"""
+    axe_ne, axe_t, _, _ = load_stark_tables()
+    i, poids_ne = _bracket(axe_ne, log_ne)
+    k, poids_t = _bracket(axe_t, temperature)
+    return i, k, np.array([(1 - poids_ne) * (1 - poids_t), poids_ne * (1 - poids_t),
+                           (1 - poids_ne) * poids_t, poids_ne * poids_t])
+
+
+def stark_widths(n_haut, n_bas, densite_electronique, temperature):
+    """Largeurs Stark (FWHM, nm) des raies (n_haut → n_bas) pour Ne (cm⁻³) et T (K)
+
+    Les raies absentes des tables (Lyman, Brackett...) reçoivent une largeur nulle.
+    """
+    _, _, index_raies, largeurs = load_stark_tables()
+    i, k, poids = stark_interpolation_weights(round(float(np.log10(densite_electronique)), 4),
+                                              round(float(temperature), 1))
+    coins = largeurs[:, [i, i + 1, i, i + 1], [k, k, k + 1, k + 1]]
+    largeur_table = 10 ** (coins @ poids)
+
+    lignes = np.array([index_raies.get((int(h), int(b)), -1)
+                       for h, b in zip(np.atleast_1d(n_haut), np.atleast_1d(n_bas))])
+    return np.where(lignes >= 0, largeur_table[np.maximum(lignes, 0)], 0.0)
+
+
+def electron_density_from_width(largeur_nm, n_haut, n_bas, temperature):
+    """Densité électronique (cm⁻³) déduite de la largeur Stark mesurée d'une raie"""
+    axe_ne, axe_t, index_raies, largeurs = load_stark_tables()
+    ligne = index_raies[(int(n_haut), int(n_bas))]
+    k, poids_t = _bracket(axe_t, float(temperature))
+    log_largeurs = (1 - poids_t) * largeurs[ligne, :, k] + poids_t * largeurs[ligne, :, k + 1]
+    return 10 ** np.interp(np.log10(largeur_nm), log_largeurs, axe_ne)
+
+
+# Forces d'oscillateur d'absorption (transfert radiatif)
+CHEMIN_TABLE_FORCES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'forces_oscillateur.csv')
+TOLERANCE_FORCES_NM = 0.3
+
+
+@lru_cache(maxsize=None)
+def load_oscillator_table(chemin=CHEMIN_TABLE_FORCES):
+    """Charge une seule fois la table des forces d'oscillateur et des niveaux inférieurs, triée par longueur d'onde"""
+    return pd.read_csv(chemin, comment='#').sort_values('longueur_onde_nm', ignore_index=True)
+
+
+def oscillator_strengths(raies, table=None, tolerance_nm=TOLERANCE_FORCES_NM):
+    """Force d'oscillateur, énergie et poids du niveau inférieur de chaque raie (NaN si non tabulée)
+
+    Chaque raie est associée par jointure ordonnée à l'entrée du même élément la
+    plus proche en longueur d'onde, à moins de `tolerance_nm`. L'ordre des raies
+    est conservé.
+    """
+    table = load_oscillator_table() if table is None else table
+    raies = raies[['element', 'longueur_onde']].reset_index(drop=True).assign(rang=lambda r: np.arange(len(r)))
+    jointes = pd.merge_asof(raies.sort_values('longueur_onde'), table, left_on='longueur_onde',
+                            right_on='longueur_onde_nm', by='element', direction='nearest', tolerance=tolerance_nm)
+    return jointes.sort_values('rang')[['f_absorption', 'energie_bas_eV', 'g_bas', 'g_fondamental']].reset_index(
+        drop=True)
+
+
+# Décroissance d'un plasma transitoire (ablation laser) : refroidissement et dilution exponentiels
+def plasma_decay(temps, temperature_initiale, temperature_finale, constante_temperature, constante_densite):
+    """Température T(t) et densité relative n(t)/n(0) aux instants `temps`
+
+    T relaxe exponentiellement de la valeur initiale vers la valeur finale ;
+    la densité des émetteurs décroît exponentiellement depuis 1.
+    """
+    temps = np.asarray(temps, dtype=float)
+    temperatures = temperature_finale + (temperature_initiale - temperature_finale) * np.exp(-temps /
+                                                                                           constante_temperature)
+    return temperatures, np.exp(-temps / constante_densite)
@@ -0,0 +1,189 @@
+"""Instrumentation légère des réexécutions : durée par section, lignes parcourues, taille des figures, caches
+
+Les crochets ne coûtent qu'un test quand aucun enregistreur n'est actif ; un
+enregistreur n'est activé que pour les réexécutions où le panneau de
+performance est affiché. L'enregistreur courant est propre à chaque fil
+(chaque session Streamlit a le sien) ; les calculs en tâche de fond ne sont pas comptés.
+Streamlit n'est importé que par les fonctions d'affichage, pour que les modules
+de calcul puissent utiliser les crochets sans en dépendre.
+"""
+import contextvars
+import datetime
+import functools
+import json
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+
+ENREGISTREUR_COURANT = contextvars.ContextVar('enregistreur_performance', default=None)
+SEPARATEUR_SECTIONS = ' › '
+
+
+def cache_statistics():
+    """Compteurs (succès, échecs) des caches lru_cache des modules spectraux et du cache disque"""
+    from spectral_cache import CACHE_SPECTRES
+    from spectral_physics import load_oscillator_table, load_stark_tables, stark_interpolation_weights
+    from spectral_synthesis import log_lambda_grid, wavelength_grid
+
+    statistiques = {}
+    for fonction in (wavelength_grid, log_lambda_grid, load_stark_tables, stark_interpolation_weights,
+                     load_oscillator_table):
+        informations = fonction.cache_info()
+        statistiques[fonction.__name__] = (informations.hits, informations.misses)
+    informations = CACHE_SPECTRES.cache_info()
+    statistiques['cache_disque_spectres'] = (informations.hits, informations.misses)
+    return statistiques
+
+
+class PerformanceRecorder:
+    """Mesures d'une réexécution, agrégées par chemin de sections imbriquées"""
+
+    def __init__(self):
+        self.sections = {}
+        self.pile = []
+        self.debut = time.perf_counter()
+        self.caches_debut = cache_statistics()
+        self.caches = {}
+        self.figures = []
+        self.duree_totale_ms = None
+
+    def _statistiques(self, chemin):
+        if chemin not in self.sections:
+            self.sections[chemin] = {'section': chemin, 'niveau': chemin.count(SEPARATEUR_SECTIONS),
+                                     'duree_ms': 0.0, 'appels': 0, 'lignes_parcourues': 0,
+                                     'figures': 0, 'octets_figures': 0}
+        return self.sections[chemin]
+
+    def add(self, mesure, valeur):
+        """Ajoute une quantité à la section la plus intérieure en cours"""
+        if self.pile:
+            self._statistiques(self.pile[-1])[mesure] += valeur
+
+    @contextmanager
+    def section(self, nom):
+        chemin = SEPARATEUR_SECTIONS.join([self.pile[-1], nom]) if self.pile else nom
+        statistiques = self._statistiques(chemin)
+        self.pile.append(chemin)
+        debut = time.perf_counter()
+        try:
+            yield
+        finally:
+            statistiques['duree_ms'] += (time.perf_counter() - debut) * 1000
+            statistiques['appels'] += 1
+            self.pile.pop()
+
+    @contextmanager
+    def activate(self):
+        """Rend l'enregistreur courant pour le fil d'exécution, le temps du bloc"""
+        jeton = ENREGISTREUR_COURANT.set(self)
+        try:
+            yield self
+        finally:
+            ENREGISTREUR_COURANT.reset(jeton)
+            self.finish()
+
+    def finish(self):
+        self.duree_totale_ms = (time.perf_counter() - self.debut) * 1000
+        fin = cache_statistics()
+        self.caches = {nom: {'succes': fin[nom][0] - self.caches_debut[nom][0],
+                             'echecs': fin[nom][1] - self.caches_debut[nom][1]} for nom in fin}
+
+    def to_frame(self):
+        """Tableau des sections dans l'ordre de première entrée"""
+        return pd.DataFrame(list(self.sections.values()))
+
+    def to_record(self):
+        """Enregistrement sérialisable d'une réexécution (une ligne de l'export JSON)"""
+        return {
+            'date': datetime.datetime.now().isoformat(timespec='milliseconds'),
+            'duree_totale_ms': self.duree_totale_ms,
+            'sections': list(self.sections.values()),
+            'caches': self.caches,
+            'figures': self.figures
+        }
+
+
+@contextmanager
+def section(nom):
+    """Chronomètre un bloc comme sous-section de la section courante (sans effet hors enregistrement)"""
+    enregistreur = ENREGISTREUR_COURANT.get()
+    if enregistreur is None:
+        yield
+        return
+    with enregistreur.section(nom):
+        yield
+
+
+def timed(fonction):
+    """Décorateur : chronomètre chaque appel comme une section nommée d'après la fonction"""
+    @functools.wraps(fonction)
+    def chronometree(*args, **kwargs):
+        enregistreur = ENREGISTREUR_COURANT.get()
+        if enregistreur is None:
+            return fonction(*args, **kwargs)
+        with enregistreur.section(fonction.__name__):
+            return fonction(*args, **kwargs)
+    return chronometree
+
+
+def count_rows(n_lignes):
+    """Compte les lignes de catalogue parcourues par la section courante"""
+    enregistreur = ENREGISTREUR_COURANT.get()
+    if enregistreur is not None:
+        enregistreur.add('lignes_parcourues', int(n_lignes))
+
+
+def record_figure(figure, rapport=None):
+    """Compte une figure affichée et la taille de sa sérialisation ; conserve son rapport de budget"""
+    enregistreur = ENREGISTREUR_COURANT.get()
+    if enregistreur is not None:
+        octets = len(figure.to_json())
+        enregistreur.add('figures', 1)
+        enregistreur.add('octets_figures', octets)
+        if rapport is not None:
+            enregistreur.figures.append({'section': enregistreur.pile[-1] if enregistreur.pile else '',
+                                         **rapport, 'octets_rendus': octets})
+
+
+def to_json_lines(enregistrements):
+    """Export des enregistrements successifs, un objet JSON par ligne"""
+    return '\n'.join(json.dumps(enregistrement, ensure_ascii=False) for enregistrement in enregistrements) + '\n'
+
+
+def display_performance_panel(conteneur, enregistreur, historique):
+    """Panneau de performance : sections de la réexécution, caches et export JSON lines"""
+    import streamlit as st
+
+    with conteneur:
+        st.markdown("### ⏱️ Performance")
+        st.metric("Durée de la réexécution", f"{enregistreur.duree_totale_ms:.0f} ms")
+
+        tableau = enregistreur.to_frame()
+        if not tableau.empty:
+            tableau['section'] = ['  ' * niveau + chemin.split(SEPARATEUR_SECTIONS)[-1]
+                                  for chemin, niveau in zip(tableau['section'], tableau['niveau'])]
+            st.dataframe(tableau.drop(columns='niveau').rename(columns={
+                'section': 'Section', 'duree_ms': 'ms', 'appels': 'Appels', 'lignes_parcourues': 'Lignes',
+                'figures': 'Figures', 'octets_figures': 'Octets'
+            }).round(1), hide_index=True, use_container_width=True)
+
+        caches = pd.DataFrame([{'Cache': nom, 'Succès': valeurs['succes'], 'Échecs': valeurs['echecs']}
+                               for nom, valeurs in enregistreur.caches.items()])
+        appels = caches['Succès'] + caches['Échecs']
+        caches['Taux de succès'] = (caches['Succès'] / appels.where(appels > 0)).map(
+            lambda taux: '-' if pd.isna(taux) else f"{taux:.0%}")
+        st.dataframe(caches, hide_index=True, use_container_width=True)
+
+        if enregistreur.figures:
+            figures = pd.DataFrame(enregistreur.figures)
+            st.markdown(f"**Figures** ({int(figures['degradee'].sum())} allégée(s) sur {len(figures)})")
+            st.dataframe(figures[['figure', 'points_initiaux', 'points_rendus', 'octets_rendus', 'traces_decimees',
+                                  'traces_webgl']].rename(columns={
+                'figure': 'Figure', 'points_initiaux': 'Points', 'points_rendus': 'Rendus',
+                'octets_rendus': 'Octets', 'traces_decimees': 'Décimées', 'traces_webgl': 'WebGL'
+            }), hide_index=True, use_container_width=True)
+
+        st.download_button("📥 Export JSON lines", to_json_lines(historique),
+                           file_name="performance.jsonl", mime="application/x-ndjson")
+        st.caption(f"{len(historique)} réexécution(s) enregistrée(s) dans cette session")
@@ -0,0 +1,280 @@
+"""Synthèse vectorisée de spectres sur une grille de longueurs d'onde partagée"""
+from functools import lru_cache
+
+import numpy as np
+from scipy import constants
+from scipy.signal import fftconvolve
+from scipy.special import voigt_profile
+
+from spectral_profiling import count_rows, timed
+
+# Nombre de lignes traitées par bloc, réduit sur les grandes grilles pour borner la mémoire (raies × points)
+TAILLE_BLOC_RAIES = 256
+TAILLE_BLOC_ELEMENTS = 2 ** 22
+
+# Modèle de plasma : largeurs du catalogue données à 300 K, populations relatives à 5000 K
+CONSTANTE_BOLTZMANN_EV = constants.k / constants.e
+TEMPERATURE_LARGEURS = 300.0
+TEMPERATURE_REFERENCE = 5000.0
+
+# Profils instrumentaux disponibles pour la convolution par FFT
+PROFILS_INSTRUMENTAUX = ('gauss', 'sinc', 'mesure')
+FWHM_SUR_SIGMA = 2 * np.sqrt(2 * np.log(2))
+
+
+@lru_cache(maxsize=32)
+def wavelength_grid(lambda_min, lambda_max, n_points):
+    """Retourne la grille de longueurs d'onde partagée (lecture seule) pour une plage donnée"""
+    grille = np.linspace(lambda_min, lambda_max, n_points)
+    grille.setflags(write=False)
+    return grille
+
+
+@lru_cache(maxsize=32)
+def log_lambda_grid(lambda_min, lambda_max, pouvoir_resolution, echantillonnage=3.0):
+    """Grille uniforme en ln λ : pas constant 1/(R·échantillonnage), soit R constant sur toute la plage"""
+    pas_log = 1.0 / (pouvoir_resolution * echantillonnage)
+    n_points = int(np.ceil(np.log(lambda_max / lambda_min) / pas_log)) + 1
+    grille = lambda_min * np.exp(pas_log * np.arange(n_points))
+    grille.setflags(write=False)
+    return grille
+
+
+@timed
+def synthesize_lines(grille, centres, intensites, largeurs, n_sigma=8.0, gammas=None, progression=None):
+    """Somme des profils de toutes les raies sur la grille
+
+    Les profils sont gaussiens (écart-type `largeurs`, amplitude `intensites`) ou,
+    si des demi-largeurs lorentziennes `gammas` sont fournies, de Voigt à aire
+    égale à celle de la gaussienne seule. Les raies sont évaluées par blocs de
+    tableaux (raies × points) ; seules celles dont le profil recoupe la grille
+    sont conservées. `progression`, s'il est fourni, est appelé avec la fraction
+    accomplie après chaque bloc (et peut lever une exception pour interrompre).
+    """
+    grille = np.asarray(grille, dtype=float)
+    centres = np.atleast_1d(np.asarray(centres, dtype=float))
+    intensites = np.broadcast_to(np.asarray(intensites, dtype=float), centres.shape)
+    largeurs = np.broadcast_to(np.asarray(largeurs, dtype=float), centres.shape)
+    gammas = np.zeros_like(centres) if gammas is None else np.broadcast_to(np.asarray(gammas, dtype=float), centres.shape)
+    spectre = np.zeros_like(grille)
+    count_rows(len(centres))
+
+    portee = n_sigma * largeurs + 50 * gammas
+    visibles = (centres + portee >= grille[0]) & (centres - portee <= grille[-1])
+    centres, intensites, largeurs, gammas = centres[visibles], intensites[visibles], largeurs[visibles], gammas[visibles]
+
+    taille_bloc = max(1, min(TAILLE_BLOC_RAIES, TAILLE_BLOC_ELEMENTS // len(grille)))
+    for debut in range(0, len(centres), taille_bloc):
+        bloc = slice(debut, debut + taille_bloc)
+        if np.any(gammas[bloc] > 0):
+            ecarts = grille[None, :] - centres[bloc, None]
+            profils = (voigt_profile(ecarts, largeurs[bloc, None], gammas[bloc, None]) *
+                       largeurs[bloc, None] * np.sqrt(2 * np.pi))
+        else:
+            ecarts = (grille[None, :] - centres[bloc, None]) / largeurs[bloc, None]
+            profils = np.exp(-0.5 * ecarts ** 2)
+        spectre += intensites[bloc] @ profils
+        if progression is not None:
+            progression(min(debut + taille_bloc, len(centres)) / len(centres))
+    return spectre
+
+
+@timed
+def synthesize_window(lambda_min, lambda_max, n_points, index, intensites, largeurs, n_sigma=8.0):
+    """Spectre de la seule fenêtre [λ min, λ max], à pleine résolution
+
+    Les raies sont tirées de l'index trié des longueurs d'onde (valeurs triées,
+    ordre des raies ; voir `build_wavelength_index`) par recherche dichotomique :
+    seules celles dont le profil peut recouper la fenêtre sont évaluées, quelle
+    que soit la taille du catalogue. Retourne la grille, le spectre et les
+    indices (ordre du catalogue) des raies retenues.
+    """
+    lambdas_tries, ordre = index
+    largeurs = np.broadcast_to(np.asarray(largeurs, dtype=float), ordre.shape)
+    marge = n_sigma * largeurs.max() if len(largeurs) else 0.0
+    debut, fin = np.searchsorted(lambdas_tries, [lambda_min - marge, lambda_max + marge], side='left')
+    retenues = ordre[debut:fin]
+
+    grille = wavelength_grid(float(lambda_min), float(lambda_max), int(n_points))
+    spectre = synthesize_lines(grille, lambdas_tries[debut:fin],
+                               np.broadcast_to(np.asarray(intensites, dtype=float), ordre.shape)[retenues],
+                               largeurs[retenues], n_sigma=n_sigma)
+    return grille, spectre, retenues
+
+
+def doppler_scale(temperature):
+    """Facteur d'élargissement Doppler des largeurs du catalogue à la température T"""
+    return np.sqrt(temperature / TEMPERATURE_LARGEURS)
+
+
+def boltzmann_factors(energies_eV, temperature, temperature_reference=TEMPERATURE_REFERENCE):
+    """Facteurs de population de Boltzmann relatifs à la température de référence"""
+    return np.exp(-np.asarray(energies_eV, dtype=float) / CONSTANTE_BOLTZMANN_EV *
+                  (1 / temperature - 1 / temperature_reference))
+
+
+def line_profile_matrix(grille, centres, largeurs, avec_derivee=False):
+    """Matrice (raies × points) des profils gaussiens d'amplitude unité
+
+    Avec `avec_derivee`, renvoie aussi w·∂G/∂w, la dérivée des profils par
+    rapport à un facteur d'échelle w appliqué à toutes les largeurs, évaluée en
+    w = 1 (à diviser par w pour un facteur quelconque).
+    """
+    ecarts_reduits = ((np.asarray(grille, dtype=float)[None, :] - np.asarray(centres, dtype=float)[:, None]) /
+                      np.asarray(largeurs, dtype=float)[:, None]) ** 2
+    profils = np.exp(-0.5 * ecarts_reduits)
+    if avec_derivee:
+        return profils, profils * ecarts_reduits
+    return profils
+
+
+def element_membership(raies, elements):
+    """Matrice d'appartenance (éléments × raies) des raies du catalogue"""
+    return (np.asarray(elements)[:, None] == raies['element'].to_numpy()[None, :]).astype(float)
+
+
+def stick_spectrum(grille, centres, intensites, log_lambda=False):
+    """Dépose les intensités des raies sur la grille (partage linéaire entre les deux points voisins)
+
+    La grille doit être uniforme en λ, ou en ln λ si `log_lambda` est vrai.
+    """
+    grille = np.asarray(grille, dtype=float)
+    centres = np.asarray(centres, dtype=float)
+    intensites = np.broadcast_to(np.asarray(intensites, dtype=float), centres.shape)
+    axe, positions = (np.log(grille), np.log(centres)) if log_lambda else (grille, centres)
+
+    position = (positions - axe[0]) / (axe[1] - axe[0])
+    dedans = (position >= 0) & (position <= len(grille) - 1)
+    position, intensites = position[dedans], intensites[dedans]
+    gauche = np.minimum(np.floor(position).astype(int), len(grille) - 2)
+    fraction = position - gauche
+    return (np.bincount(gauche, weights=intensites * (1 - fraction), minlength=len(grille)) +
+            np.bincount(gauche + 1, weights=intensites * fraction, minlength=len(grille)))
+
+
+def instrument_kernel(profil, largeur_pixels, noyau_mesure=None):
+    """Noyau instrumental échantillonné en pixels, de maximum unité
+
+    `largeur_pixels` est la largeur à mi-hauteur en pixels de grille. Le profil
+    'sinc' est celui d'un spectromètre à transformée de Fourier (sinc, lobes
+    négatifs compris) ; le profil 'mesure' rééchantillonne un tableau
+    (décalage en pixels, réponse) fourni par l'utilisateur.
+    """
+    if profil == 'gauss':
+        sigma = largeur_pixels / FWHM_SUR_SIGMA
+        x = np.arange(-int(np.ceil(5 * sigma)), int(np.ceil(5 * sigma)) + 1)
+        noyau = np.exp(-0.5 * (x / max(sigma, 1e-12)) ** 2)
+    elif profil == 'sinc':
+        # sinc(x/a) a une largeur à mi-hauteur de 1.2067·a
+        echelle = largeur_pixels / 1.2067
+        x = np.arange(-int(np.ceil(20 * echelle)), int(np.ceil(20 * echelle)) + 1)
+        noyau = np.sinc(x / max(echelle, 1e-12))
+    elif profil == 'mesure':
+        if noyau_mesure is None:
+            raise ValueError("Profil instrumental 'mesure' : noyau mesuré (décalages, réponse) manquant")
+        decalages, reponse = np.asarray(noyau_mesure[0], dtype=float), np.asarray(noyau_mesure[1], dtype=float)
+        # Échantillonnage symétrique : fftconvolve(mode='same') place le décalage nul au centre du noyau
+        demi_etendue = int(np.ceil(np.abs(decalages).max()))
+        x = np.arange(-demi_etendue, demi_etendue + 1)
+        noyau = np.interp(x, decalages, reponse, left=0.0, right=0.0)
+    else:
+        raise ValueError(f"Profil instrumental inconnu: {profil}")
+    return noyau / noyau.max()
+
+
+def grid_instrument_kernel(grille, profil='gauss', largeur_nm=None, pouvoir_resolution=None, noyau_mesure_nm=None,
+                           log_lambda=False):
+    """Noyau instrumental en pixels de la grille (voir `convolve_instrument` pour la largeur)"""
+    grille = np.asarray(grille, dtype=float)
+    if log_lambda:
+        pas = np.log(grille[1] / grille[0])
+        conversion = grille.mean() * pas
+    else:
+        pas = grille[1] - grille[0]
+        conversion = pas
+
+    if profil == 'mesure':
+        if noyau_mesure_nm is None:
+            raise ValueError("Profil instrumental 'mesure' : noyau mesuré (décalages en nm, réponse) manquant")
+        return instrument_kernel(profil, None, (np.asarray(noyau_mesure_nm[0], dtype=float) / conversion,
+                                                noyau_mesure_nm[1]))
+    if log_lambda and pouvoir_resolution:
+        largeur_pixels = 1.0 / (pouvoir_resolution * pas)
+    else:
+        largeur = largeur_nm if largeur_nm is not None else grille.mean() / pouvoir_resolution
+        largeur_pixels = largeur / conversion
+    return instrument_kernel(profil, largeur_pixels)
+
+
+@timed
+def convolve_instrument(grille, centres, intensites, profil='gauss', largeur_nm=None,
+                        pouvoir_resolution=None, noyau_mesure_nm=None, log_lambda=False):
+    """Spectre en bâtons convolué une seule fois par le profil instrumental (FFT)
+
+    Le coût est O(N log N) en nombre de points quel que soit le nombre de raies.
+    Sur une grille en ln λ, la largeur est donnée par le pouvoir de résolution R
+    (FWHM = λ/R constante en ln λ) ; sur une grille linéaire, par `largeur_nm`
+    ou, à défaut, par R au centre de la plage. Un noyau mesuré est fourni comme
+    (décalages en nm, réponse) et converti en pixels.
+    """
+    noyau = grid_instrument_kernel(grille, profil, largeur_nm, pouvoir_resolution, noyau_mesure_nm, log_lambda)
+    batons = stick_spectrum(grille, centres, intensites, log_lambda)
+    count_rows(len(batons))
+    return fftconvolve(batons, noyau, mode='same')
+
+
+def convolve_spectrum(grille, spectre, profil='gauss', largeur_nm=None, pouvoir_resolution=None,
+                      noyau_mesure_nm=None, log_lambda=False):
+    """Spectre échantillonné convolué par le profil instrumental, d'aire conservée"""
+    noyau = grid_instrument_kernel(grille, profil, largeur_nm, pouvoir_resolution, noyau_mesure_nm, log_lambda)
+    return fftconvolve(spectre, noyau / noyau.sum(), mode='same')
+
+
+# Transfert radiatif dans une couche homogène (ETL) : profondeur optique, continuum, émission auto-absorbée, transmission
+RAYON_CLASSIQUE_ELECTRON_CM = constants.physical_constants['classical electron radius'][0] * 100
+
+
+def lower_level_fractions(energies_bas_eV, g_bas, g_fondamental, temperature):
+    """Fraction des atomes dans le niveau inférieur (Boltzmann, fonction de partition réduite au fondamental)"""
+    return (np.asarray(g_bas, dtype=float) / np.asarray(g_fondamental, dtype=float) *
+            np.exp(-np.asarray(energies_bas_eV, dtype=float) / (CONSTANTE_BOLTZMANN_EV * temperature)))
+
+
+def line_centre_cross_sections(longueurs_onde, forces, largeurs):
+    """Section efficace d'absorption au centre de raie (cm²) pour des profils gaussiens d'écart-type `largeurs` (nm)
+
+    La section intégrée en longueur d'onde π·rₑ·f·λ² est répartie sur le profil
+    gaussien, d'aire √(2π)·σ pour un maximum unité.
+    """
+    longueurs_onde_cm = np.asarray(longueurs_onde, dtype=float) * 1e-7
+    largeurs_cm = np.asarray(largeurs, dtype=float) * 1e-7
+    return (np.pi * RAYON_CLASSIQUE_ELECTRON_CM * np.asarray(forces, dtype=float) * longueurs_onde_cm ** 2 /
+            (np.sqrt(2 * np.pi) * largeurs_cm))
+
+
+def planck_radiance(grille, temperature):
+    """Luminance spectrale du corps noir B_λ(T) en W·m⁻²·sr⁻¹·nm⁻¹ (grille en nm)"""
+    longueurs_onde_m = np.asarray(grille, dtype=float) * 1e-9
+    exposant = constants.h * constants.c / (longueurs_onde_m * constants.k * temperature)
+    return 2 * constants.h * constants.c ** 2 / longueurs_onde_m ** 5 / np.expm1(exposant) * 1e-9
+
+
+def bremsstrahlung_emissivity(grille, temperature):
+    """Émissivité libre-libre par unité de longueur d'onde (unités arbitraires, facteur de Gaunt unité)
+
+    ε_λ ∝ T^(−1/2) · λ^(−2) · exp(−hc/λkT) : pour une densité électronique donnée,
+    le continuum de freinage décroît vers le bleu sous hc/kT et s'étale en λ⁻² vers le rouge.
+    """
+    longueurs_onde_m = np.asarray(grille, dtype=float) * 1e-9
+    exposant = constants.h * constants.c / (longueurs_onde_m * constants.k * temperature)
+    return np.exp(-exposant) / (np.sqrt(temperature) * (longueurs_onde_m * 1e9) ** 2)
+
+
+def slab_emission(profondeur_optique, source):
+    """Luminance émergente d'une couche homogène de fonction source S : S·(1 − e^(−τ))"""
+    return source * -np.expm1(-np.asarray(profondeur_optique, dtype=float))
+
+
+def slab_transmission(profondeur_optique):
+    """Transmission e^(−τ) d'une couche éclairée par l'arrière"""
+    return np.exp(-np.asarray(profondeur_optique, dtype=float))
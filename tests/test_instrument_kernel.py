@@ -0,0 +1,35 @@
+"""Noyaux instrumentaux mesurés : la convolution ne doit pas déplacer les raies"""
+import numpy as np
+import pytest
+
+from spectral_synthesis import convolve_instrument, grid_instrument_kernel, wavelength_grid
+
+# Noyau de démonstration du simulateur (décalages en nm, réponse), asymétrique
+NOYAU_DEMONSTRATION = (np.array([-0.3, 0.0, 0.6]), np.array([0.0, 1.0, 0.0]))
+
+
+def centroid(grille, spectre):
+    return np.sum(grille * spectre) / np.sum(spectre)
+
+
+@pytest.mark.parametrize('grille', [np.round(np.arange(500.0, 510.0, 0.01), 10),
+                                    wavelength_grid(200.0, 800.0, 20000),
+                                    wavelength_grid(200.0, 800.0, 200000)])
+def test_asymmetric_kernel_keeps_peak_and_shifts_centroid_by_kernel_mean(grille):
+    spectre = convolve_instrument(grille, [505.0], [1.0], 'mesure', noyau_mesure_nm=NOYAU_DEMONSTRATION)
+    pas = grille[1] - grille[0]
+    # Le maximum reste à la raie ; le barycentre se décale du premier moment du noyau (+0.1 nm)
+    assert abs(grille[np.argmax(spectre)] - 505.0) <= pas
+    assert centroid(grille, spectre) == pytest.approx(505.1, abs=pas)
+
+
+def test_symmetric_measured_kernel_preserves_centroid():
+    grille = np.round(np.arange(500.0, 510.0, 0.01), 10)
+    noyau = (np.array([-0.2, 0.0, 0.2]), np.array([0.0, 1.0, 0.0]))
+    spectre = convolve_instrument(grille, [505.004], [1.0], 'mesure', noyau_mesure_nm=noyau)
+    assert centroid(grille, spectre) == pytest.approx(505.004, abs=1e-9)
+
+
+def test_missing_measured_kernel_raises_value_error():
+    with pytest.raises(ValueError, match="manquant"):
+        grid_instrument_kernel(wavelength_grid(200.0, 800.0, 2000), 'mesure')
@@ -0,0 +1,44 @@
+"""Acquisition en direct : la déconnexion de l'émetteur doit être signalée, pas ignorée"""
+import socket
+import time
+
+import numpy as np
+import pytest
+
+from spectral_live import LiveFeed, SpectrumRingBuffer, UnixSocketSource
+
+
+@pytest.fixture
+def emetteur(tmp_path):
+    chemin = str(tmp_path / 'spectrometre.sock')
+    serveur = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    serveur.bind(chemin)
+    serveur.listen(1)
+    source = UnixSocketSource(chemin, 4)
+    connexion, _ = serveur.accept()
+    yield source, connexion
+    source.close()
+    serveur.close()
+
+
+def test_socket_close_returns_pending_frames_then_raises(emetteur):
+    source, connexion = emetteur
+    connexion.sendall(np.arange(8, dtype='<f4').tobytes() + b'\x00\x00')
+    connexion.close()
+    time.sleep(0.05)
+    trames = source.read_frames()
+    assert [list(t) for t in trames] == [[0, 1, 2, 3], [4, 5, 6, 7]]
+    with pytest.raises(ConnectionError):
+        source.read_frames()
+
+
+def test_live_feed_reports_disconnect(emetteur):
+    source, connexion = emetteur
+    tampon = SpectrumRingBuffer(10, 4)
+    flux = LiveFeed(source, tampon).start()
+    connexion.sendall(np.ones(4, dtype='<f4').tobytes())
+    connexion.close()
+    flux.fil.join(timeout=2.0)
+    assert flux.state == 'erreur'
+    assert 'fermé' in flux.erreur
+    assert tampon.latest()[1] == 1
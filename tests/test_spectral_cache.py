@@ -0,0 +1,39 @@
+"""Cache disque des spectres : aller-retour projeté en mémoire, éviction LRU, clés de contenu"""
+import os
+
+import numpy as np
+
+from spectral_cache import DiskSpectrumCache, content_key
+
+
+def test_put_get_round_trip_is_read_only_memory_map(tmp_path):
+    cache = DiskSpectrumCache(str(tmp_path))
+    spectre = np.linspace(0.0, 1.0, 100, dtype=np.float32)
+    cache.put('cle', spectre)
+    relu = cache.get('cle')
+    assert isinstance(relu, np.memmap) and not relu.flags.writeable
+    assert relu.dtype == np.float32
+    np.testing.assert_array_equal(relu, spectre)
+    assert 'cle' in cache and cache.get('absente') is None
+    assert tuple(cache.cache_info()) == (1, 1)
+
+
+def test_evict_removes_least_recently_used_entries(tmp_path):
+    # Entrées de 928 octets (en-tête .npy compris) : trois tiennent sous 3000 octets
+    cache = DiskSpectrumCache(str(tmp_path), taille_max_octets=3000)
+    for date, cle in enumerate(['a', 'b', 'c']):
+        cache.put(cle, np.zeros(100))
+        os.utime(cache.path(cle), (date, date))
+    cache.get('a')  # lecture : 'a' devient la plus récente
+    cache.put('d', np.zeros(100))
+    assert [cle for cle in 'abcd' if cle in cache] == ['a', 'c', 'd']
+    assert cache.size() == (3, 3 * os.path.getsize(cache.path('a')))
+
+
+def test_content_key_depends_on_values_dtype_and_shape():
+    tableau = np.arange(6, dtype=float)
+    assert content_key(t=tableau, n=3) == content_key(n=3, t=tableau.copy())
+    assert content_key(t=tableau) != content_key(t=tableau.astype(np.float32))
+    assert content_key(t=tableau) != content_key(t=tableau.reshape(2, 3))
+    assert content_key(t=tableau) != content_key(t=tableau + 1)
+    assert content_key(t=np.zeros(2)) != content_key(t=np.zeros(4, dtype=np.float32))
@@ -0,0 +1,43 @@
+"""Cubes hyperspectraux : contenu identique aux piles en température, éviction du dossier des cubes"""
+import os
+
+import numpy as np
+
+from spectral_basis import TEMPERATURES_BASES, temperature_stack
+from spectral_cache import DiskSpectrumCache, content_key
+from spectral_cube import HyperspectralCube, build_cube, evict_cubes, hot_spot_map
+
+
+def test_cube_matches_temperature_stack(tmp_path):
+    cache = DiskSpectrumCache(str(tmp_path / 'spectres'))
+    longueurs_onde = np.linspace(500.0, 510.0, 40)
+    generateur = np.random.default_rng(0)
+    cles_noeuds = []
+    for element in ('Na', 'Hg'):
+        cles = [content_key(element=element, temperature=t) for t in TEMPERATURES_BASES]
+        for cle in cles:
+            cache.put(cle, generateur.random(len(longueurs_onde)))
+        cles_noeuds.append(cles)
+    temperatures, abondances = hot_spot_map(5, 3, 9000.0, 3000.0, [1.0, 0.5])
+
+    dossier = build_cube(str(tmp_path / 'cubes' / 'cube'), longueurs_onde, temperatures, abondances, cles_noeuds,
+                         cache=cache, n_processus=1)
+    cube = HyperspectralCube(dossier)
+
+    attendu = sum(temperature_stack([cles], [1.0], temperatures.ravel(), abondances[..., e].ravel(), cache=cache)
+                  for e, cles in enumerate(cles_noeuds)).reshape(5, 3, len(longueurs_onde))
+    assert cube.shape == (5, 3, len(longueurs_onde))
+    np.testing.assert_allclose(cube.pixel(2, 1), attendu[2, 1], rtol=1e-6)
+    bande = (longueurs_onde >= 502.0) & (longueurs_onde <= 505.0)
+    np.testing.assert_allclose(cube.band_image(502.0, 505.0), attendu[..., bande].mean(axis=2), rtol=1e-5)
+
+
+def test_evict_cubes_keeps_built_cube_and_removes_oldest_first(tmp_path):
+    for date, nom in enumerate(['ancien', 'conserve', 'moyen', 'recent']):
+        dossier = tmp_path / nom
+        dossier.mkdir()
+        np.save(dossier / 'cube.npy', np.zeros(1000, dtype=np.float32))
+        os.utime(dossier, (date, date))
+    # 4 cubes de ~4 ko pour 9 ko autorisés : deux suppressions, jamais celle du cube conservé
+    evict_cubes(str(tmp_path), 9000, conserver=str(tmp_path / 'conserve'))
+    assert sorted(os.listdir(tmp_path)) == ['conserve', 'recent']